@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 端到端求解器基准测试 (End-to-End Solver Benchmark)
+# ============================================================
+# 在相同的层厚 / 网格密度 / 种子集合上运行仓库中的各条优化路线：
+#   pyaugmecon   : main.py + Pyomo 模型 (PyAugmecon + Gurobi)
+#   de_bypass    : main_new.py 的 DE 旁路跳跃循环
+#   slsqp_grid   : test_demo.AugmeconRSolver 的 SLSQP 网格
+#   hde_augmecon : new_model 的 HybridSolver + AugmeconRGamsStyle
+#   interval_bnb : new_model 的 IntervalBBSolver (区间分支定界，确定性) + AugmeconRGamsStyle
+#   nsga2        : NSGA-II 对照组 (algorithm improvement.md，需要 pymoo)
+# 每次运行放在独立子进程中 (根目录与 new_model 各有一套 config/模型，互不干扰)，
+# 所有路线的解都用 new_model/physics_model 重新评估，保证超体积/TOPSIS 在同一把尺子下比较。
+#
+# 用法:
+#   python benchmark.py --grid 5 10 --seeds 0 1 2               # 跑全部可用路线
+#   python benchmark.py --paths hde_augmecon --save-baseline     # 记录基线 (覆盖已有基线)
+#   python benchmark.py --paths hde_augmecon                     # 与基线比较，有回退时退出码为 1
+#
+# 基线 benchmarks/baseline.json 只在本机有效 (墙钟时间与机器相关)，不随仓库提交。
+# 基线文件不存在时，第一次运行的汇总自动写成基线，这一次不做回退判定；
+# 基线里没有的 (路线, 网格) 组合同样不判定，运行结束时会列出来。
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NEW_MODEL = os.path.join(ROOT, 'new_model')
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+BOUNDS = [(385, 460), (700, 1150), (90, 115)]
+RD_MIN, ED_MIN, ED_MAX = 99.5, 30.0, 80.0
+TOPSIS_WEIGHTS = [0.4, 0.2, 0.4]      # 与 new_model/post_process.TOPSIS_WEIGHTS 一致 (Cost, Carbon, Efficiency)
+
+# 回退判定阈值 (相对基线的中位数)
+TIME_TOL = 0.25    # 墙钟时间增加超过 25%
+TIME_FLOOR = 0.5   # 且绝对增加超过 0.5 s (短任务的计时噪声不算回退)
+EVALS_TOL = 0.10   # 函数评估次数增加超过 10%
+HV_TOL = 0.01      # 归一化超体积下降超过 0.01
+
+# ============================================================
+# 各路线的运行函数 (在子进程中执行，返回 (含 LT_um/P_W/V_mm_s/H_um 的 DataFrame, 统计))
+# ============================================================
+def _run_pyaugmecon(lt_levels, grid_points, seed):
+    from pyomo.environ import SolverFactory
+    if not SolverFactory('gurobi').available(exception_flag=False):
+        raise ImportError("gurobi solver not available")
+    import main
+    df = pd.DataFrame(main.run_optimization(lt_levels, grid_points, save=False))
+    return df, {}
+
+def _run_de_bypass(lt_levels, grid_points, seed):
+    import main_new
+    df = main_new.run_optimization(lt_levels, grid_points, seed=seed, save=False)
+    return df, df.attrs['stats']
+
+def _run_slsqp_grid(lt_levels, grid_points, seed):
+    import test_demo
+    config = test_demo.LPBFConfig()
+    config.LT_options = list(lt_levels)
+    solver = test_demo.AugmeconRSolver(config, test_demo.ProcessModel(config))
+    df = solver.solve(grid_points=grid_points)
+    df = df.rename(columns={'LayerThickness': 'LT_um', 'Power': 'P_W', 'Velocity': 'V_mm_s', 'HatchSpacing': 'H_um'})
+    return df, {'n_solves': solver.n_solves, 'n_evals': solver.nfev, 'n_infeasible': solver.n_infeasible}
+
+def _run_new_model(make_solver, lt_levels, grid_points, seed):
+    from augmecon_r import AugmeconRGamsStyle
+    objective_config = {'Cost': {'type': 'min'}, 'Carbon': {'type': 'min'}, 'Efficiency': {'type': 'max'}}
+    frames, stats = [], {'n_solves': 0, 'n_evals': 0, 'n_infeasible': 0}
+    for lt in lt_levels:
+        solver = make_solver(lt)
+        controller = AugmeconRGamsStyle(solver, objective_config, grid_points=grid_points, seed=seed)
+        df = controller.run()
+        df['LT_um'] = lt
+        frames.append(df)
+        n_solves = controller.n_solves + len(objective_config)   # 网格 + 支付表
+        stats['n_solves'] += n_solves
+        stats['n_evals'] += solver.n_evals
+        stats['n_infeasible'] += controller.n_solves - controller.n_feasible
+    return pd.concat(frames, ignore_index=True), stats
+
+def _run_hde_augmecon(lt_levels, grid_points, seed):
+    from hybrid_solver import HybridSolver
+    return _run_new_model(lambda lt: HybridSolver(lt_val=lt, vectorized=True), lt_levels, grid_points, seed)
+
+def _run_interval_bnb(lt_levels, grid_points, seed):
+    from interval_solver import IntervalBBSolver
+    return _run_new_model(lambda lt: IntervalBBSolver(lt_val=lt), lt_levels, grid_points, seed)
+
+def _run_nsga2(lt_levels, grid_points, seed):
+    from pymoo.core.problem import Problem
+    from pymoo.algorithms.moo.nsga2 import NSGA2
+    from pymoo.optimize import minimize
+    import physics_model
+
+    class LPBFProblem(Problem):
+        def __init__(self, lt):
+            super().__init__(n_var=3, n_obj=3, n_ieq_constr=3,
+                             xl=np.array([b[0] for b in BOUNDS]), xu=np.array([b[1] for b in BOUNDS]))
+            self.lt = lt
+
+        def _evaluate(self, X, out, *args, **kwargs):
+            Cost, Carbon, RD, ED, eff = physics_model.predict_performance_batch(X, self.lt)
+            out['F'] = np.column_stack([Cost, Carbon, -eff])
+            out['G'] = np.column_stack([RD_MIN - RD, ED_MIN - ED, ED - ED_MAX])
+
+    # 种群规模与网格点数相当，代数固定，使评估预算随 grid_points 同步增长
+    pop_size = max(20, (grid_points + 1) ** 2)
+    frames, stats = [], {'n_solves': 0, 'n_evals': 0, 'n_infeasible': 0}
+    for lt in lt_levels:
+        res = minimize(LPBFProblem(lt), NSGA2(pop_size=pop_size), ('n_gen', 100), seed=seed, verbose=False)
+        stats['n_solves'] += 1
+        stats['n_evals'] += res.algorithm.evaluator.n_eval
+        if res.X is None:
+            stats['n_infeasible'] += 1
+            continue
+        X = np.atleast_2d(res.X)
+        frames.append(pd.DataFrame({'LT_um': lt, 'P_W': X[:, 0], 'V_mm_s': X[:, 1], 'H_um': X[:, 2]}))
+    return (pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()), stats
+
+# 路线注册表: 代码目录 / 依赖的可选包 / 是否随种子变化 / 运行函数
+PATHS = {
+    'pyaugmecon':   {'dir': ROOT,      'requires': ['pyomo', 'pyaugmecon'], 'stochastic': False, 'run': _run_pyaugmecon},
+    'de_bypass':    {'dir': ROOT,      'requires': [],                      'stochastic': True,  'run': _run_de_bypass},
+    'slsqp_grid':   {'dir': ROOT,      'requires': [],                      'stochastic': False, 'run': _run_slsqp_grid},
+    'hde_augmecon': {'dir': NEW_MODEL, 'requires': [],                      'stochastic': True,  'run': _run_hde_augmecon},
+    'interval_bnb': {'dir': NEW_MODEL, 'requires': [],                      'stochastic': False, 'run': _run_interval_bnb},
+    'nsga2':        {'dir': NEW_MODEL, 'requires': ['pymoo'],               'stochastic': True,  'run': _run_nsga2},
+}
+
+def path_available(name):
+    """可选依赖是否齐全 (不导入包本身，只查找)"""
+    return all(importlib.util.find_spec(pkg) is not None for pkg in PATHS[name]['requires'])
+
+# ============================================================
+# 子进程入口
+# ============================================================
+def _worker(spec_path):
+    with open(spec_path) as f:
+        spec = json.load(f)
+    path = PATHS[spec['path']]
+    sys.path.insert(0, path['dir'])
+    out = {'status': 'ok'}
+    try:
+        start = time.perf_counter()
+        df, stats = path['run'](spec['lt_levels'], spec['grid_points'], spec['seed'])
+        out['wall_time_s'] = time.perf_counter() - start
+        out.update(stats)
+        cols = ['LT_um', 'P_W', 'V_mm_s', 'H_um']
+        out['solutions'] = df[cols].astype(float).values.tolist() if not df.empty else []
+    except ImportError as e:
+        out = {'status': 'unavailable', 'error': str(e)}
+    except Exception as e:
+        out = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    with open(spec['output'], 'w') as f:
+        json.dump(out, f)
+
+def run_case(path, lt_levels, grid_points, seed, verbose=False):
+    """在独立子进程 (临时工作目录) 中运行一个 (路线, 网格, 种子) 组合，返回子进程的结果 dict"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = {'path': path, 'lt_levels': list(lt_levels), 'grid_points': grid_points, 'seed': seed,
+                'output': os.path.join(tmp, 'result.json')}
+        spec_path = os.path.join(tmp, 'spec.json')
+        with open(spec_path, 'w') as f:
+            json.dump(spec, f)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', spec_path],
+                              cwd=tmp, capture_output=not verbose, text=True)
+        if not os.path.exists(spec['output']):
+            tail = (proc.stderr or '').strip().splitlines()[-3:]
+            return {'status': 'error', 'error': ' | '.join(tail) or f"exit code {proc.returncode}"}
+        with open(spec['output']) as f:
+            return json.load(f)
+
+# ============================================================
+# 统一评估 (父进程，new_model 的物理模型)
+# ============================================================
+_REFERENCE_BOX = {}
+
+def reference_box(lt, n=41):
+    """
+    某层厚可行域 (RD/ED 约束) 在目标空间中的 ideal / nadir (最小化形式：Cost, Carbon, -Efficiency)，
+    由参数空间的 n^3 稠密网格得到。与参加比较的路线无关，因此超体积在不同次运行之间可直接比较。
+    """
+    if lt not in _REFERENCE_BOX:
+        import physics_model
+        axes = [np.linspace(lo, hi, n) for lo, hi in BOUNDS]
+        X = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        Cost, Carbon, RD, ED, eff = physics_model.predict_performance_batch(X, lt)
+        ok = (RD >= RD_MIN) & (ED >= ED_MIN) & (ED <= ED_MAX)
+        F = np.column_stack([Cost, Carbon, -eff])[ok]
+        _REFERENCE_BOX[lt] = (F.min(axis=0), F.max(axis=0))
+    return _REFERENCE_BOX[lt]
+
+def evaluate_solutions(solutions, lt_levels):
+    """
+    用参考物理模型重新评估一组解：合法性 (RD/ED，含 1e-6 容差)、每个层厚的归一化超体积 (取平均)、
+    以及全部合法解上的 TOPSIS 最佳折衷解。
+    """
+    import physics_model
+    from pareto_metrics import hypervolume
+    from topsis import topsis_closeness
+
+    S = np.asarray(solutions, dtype=float).reshape(-1, 4)
+    Cost, Carbon, RD, ED, eff = physics_model.predict_performance_batch(S[:, 1:], S[:, 0])
+    valid = (RD >= RD_MIN - 1e-6) & (ED >= ED_MIN - 1e-6) & (ED <= ED_MAX + 1e-6)
+    F = np.column_stack([Cost, Carbon, -eff])
+
+    hv = []
+    for lt in lt_levels:
+        ideal, nadir = reference_box(lt)
+        scale = np.where(nadir - ideal > 1e-12, nadir - ideal, 1.0)
+        pts = F[valid & (S[:, 0] == lt)]
+        hv.append(hypervolume((pts - ideal) / scale, np.full(3, 1.1)) if len(pts) else 0.0)
+
+    out = {'n_solutions': int(len(S)), 'n_invalid': int((~valid).sum()), 'hypervolume': float(np.mean(hv))}
+    if valid.any():
+        scores = topsis_closeness(np.column_stack([Cost, Carbon, eff])[valid], TOPSIS_WEIGHTS,
+                                  [False, False, True])[0]
+        best = np.flatnonzero(valid)[int(np.argmax(scores))]
+        out['topsis_pick'] = {'LT_um': S[best, 0], 'P_W': S[best, 1], 'V_mm_s': S[best, 2], 'H_um': S[best, 3],
+                              'Cost': Cost[best], 'Carbon': Carbon[best], 'Efficiency': eff[best],
+                              'score': float(scores.max())}
+    return out
+
+# ============================================================
+# 汇总与回退检测
+# ============================================================
+def summarize(runs):
+    """按 (路线, 网格) 取各种子的中位数"""
+    df = pd.DataFrame([r for r in runs if r['status'] == 'ok'])
+    if df.empty:
+        return {}
+    summary = {}
+    for (path, grid), g in df.groupby(['path', 'grid_points']):
+        summary[f"{path}/grid{grid}"] = {
+            'runs': len(g),
+            **{k: float(g[k].median()) for k in ['wall_time_s', 'n_evals', 'n_solves', 'n_infeasible',
+                                                 'n_solutions', 'n_invalid', 'hypervolume'] if k in g and g[k].notna().any()}
+        }
+    return summary
+
+def find_regressions(summary, baseline, time_tol=TIME_TOL, evals_tol=EVALS_TOL, hv_tol=HV_TOL, time_floor=TIME_FLOOR):
+    """与基线的同名条目比较，返回回退描述列表"""
+    issues = []
+    for key, cur in summary.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if 'wall_time_s' in base and cur['wall_time_s'] > max(base['wall_time_s'] * (1 + time_tol),
+                                                              base['wall_time_s'] + time_floor):
+            issues.append(f"{key}: wall time {cur['wall_time_s']:.2f}s vs baseline {base['wall_time_s']:.2f}s")
+        if 'n_evals' in base and 'n_evals' in cur and cur['n_evals'] > base['n_evals'] * (1 + evals_tol):
+            issues.append(f"{key}: evaluations {cur['n_evals']:.0f} vs baseline {base['n_evals']:.0f}")
+        if 'hypervolume' in base and cur['hypervolume'] < base['hypervolume'] - hv_tol:
+            issues.append(f"{key}: hypervolume {cur['hypervolume']:.4f} vs baseline {base['hypervolume']:.4f}")
+    return issues
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_benchmark(paths, grids, seeds, lt_levels, verbose=False):
+    """运行全部组合，返回 run 记录列表 (每个 (路线, 网格, 种子) 一条)"""
+    runs = []
+    for path in paths:
+        if not path_available(path):
+            print(f"⏭️  {path}: 缺少依赖 {PATHS[path]['requires']}，跳过")
+            runs.append({'path': path, 'status': 'unavailable'})
+            continue
+        path_seeds = seeds if PATHS[path]['stochastic'] else seeds[:1]   # 确定性路线只跑一次
+        for grid in grids:
+            for seed in path_seeds:
+                print(f"▶️  {path} grid={grid} seed={seed} ...", end="", flush=True)
+                res = run_case(path, lt_levels, grid, seed, verbose)
+                record = {'path': path, 'grid_points': grid, 'seed': seed, 'lt_levels': list(lt_levels),
+                          'status': res['status']}
+                if res['status'] == 'ok':
+                    solutions = res.pop('solutions')
+                    record.update({k: v for k, v in res.items() if k != 'status'})
+                    record.update(evaluate_solutions(solutions, lt_levels) if solutions else
+                                  {'n_solutions': 0, 'n_invalid': 0, 'hypervolume': 0.0})
+                    print(f" {record['wall_time_s']:.2f}s, HV={record['hypervolume']:.4f}, "
+                          f"{record['n_solutions']} solutions ({record['n_invalid']} invalid)")
+                else:
+                    record['error'] = res.get('error')
+                    print(f" {res['status']}: {res.get('error')}")
+                runs.append(record)
+                if res['status'] == 'unavailable':
+                    break
+            if runs[-1]['status'] == 'unavailable':
+                break
+    return runs
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端求解器基准测试")
+    parser.add_argument('--paths', nargs='+', default=list(PATHS), choices=list(PATHS))
+    parser.add_argument('--grid', nargs='+', type=int, default=[5, 10], help="网格点数 (可多个)")
+    parser.add_argument('--seeds', nargs='+', type=int, default=[42, 43, 44], help="种子集合 (确定性路线只用第一个)")
+    parser.add_argument('--lt', nargs='+', type=int, default=[80, 100, 120], help="层厚 (um)")
+    parser.add_argument('--baseline', default=BASELINE, help="基线文件")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次汇总写入基线文件")
+    parser.add_argument('--output', default=None, help="结果 JSON 路径 (缺省 benchmarks/bench_<时间>.json)")
+    parser.add_argument('--time-tol', type=float, default=TIME_TOL, help="墙钟时间回退阈值 (相对)")
+    parser.add_argument('--hv-tol', type=float, default=HV_TOL, help="超体积回退阈值 (绝对)")
+    parser.add_argument('--verbose', action='store_true', help="显示各路线自身的输出")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker)
+        return 0
+
+    sys.path.insert(0, NEW_MODEL)
+    runs = run_benchmark(args.paths, args.grid, args.seeds, args.lt, args.verbose)
+    summary = summarize(runs)
+    report = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'config': {'paths': args.paths, 'grid_points': args.grid, 'seeds': args.seeds, 'lt_levels': args.lt},
+        'runs': runs,
+        'summary': summary,
+    }
+
+    baseline = {}
+    first_run = not os.path.exists(args.baseline)
+    if not first_run and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('summary', {})
+    report['regressions'] = find_regressions(summary, baseline, time_tol=args.time_tol, hv_tol=args.hv_tol)
+    unchecked = [key for key in summary if key not in baseline]
+
+    out = args.output or os.path.join(BENCH_DIR, f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    print(f"\n📄 结果已保存至: {out}")
+
+    print("\n📊 汇总 (各种子中位数):")
+    if summary:
+        print(pd.DataFrame(summary).T.to_string(float_format=lambda v: f"{v:.4g}"))
+    if first_run:
+        print(f"\n⚠️ 未找到基线 {args.baseline}：本次汇总写为基线，本次不做回退判定")
+    if args.save_baseline or first_run:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({'created': report['created'], 'git_revision': report['git_revision'],
+                       'config': report['config'], 'summary': summary}, f, indent=2)
+        print(f"📌 基线已更新: {args.baseline}")
+    elif report['regressions']:
+        print("\n❌ 相对基线的回退:")
+        for issue in report['regressions']:
+            print(f"   - {issue}")
+        return 1
+    elif baseline:
+        print("\n✅ 未发现相对基线的回退")
+    if baseline and unchecked:
+        print(f"⚠️ 基线中没有以下条目，未做回退判定 (用 --save-baseline 更新基线): {', '.join(unchecked)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
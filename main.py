@@ -2,12 +2,14 @@ import pandas as pd # for data handling in order to store results and exchange t
 from  pyaugmecon import PyAugmecon
 import config as cfg
 from test import create_lpbf_model
+from new_model.result_io import save_results  # 列式结果文件 (Parquet / .npz)，Excel 只做可选导出
 
-def run_optimization():
+def run_optimization(lt_levels=(80, 100, 120), grid_points=10, save=True):
+    # save=False 时只返回结果不写文件 (benchmark.py 使用)
     all_raw_results = []  # List to store raw Pareto results for all layer thicknesses
   
     print(">>> Start LPBF Multi-objective Optimization <<<")
-    for lt_val in [80, 100, 120]: #Loop over each layer thickness. Each value is sent into the optimization process.
+    for lt_val in lt_levels: #Loop over each layer thickness. Each value is sent into the optimization process.
         print(f"\n[Status] Optimizing for Layer Thickness = {lt_val} um ...")
         
         #1. create Model Factory
@@ -22,7 +24,7 @@ def run_optimization():
         #2. setup PyAugmecon optimizer
         opts = {
             'log_name': f'log_lt_{lt_val}', # log file name
-            'grid_points': 10,               # number of grid points in each objective
+            'grid_points': grid_points,      # number of grid points in each objective
             'solver_name': 'gurobi',        # choose Gurobi as the solver
              # 【关键】传递给 Gurobi 的参数
             'solver_opts': cfg.SOLVER_OPTS  # 包含 {'NonConvex': 2}
@@ -86,8 +88,9 @@ def run_optimization():
     print("\n[Status] Optimization finished. Saving raw results...")
     df_raw = pd.DataFrame(all_raw_results)
 
-    # 保存到 Excel 方便查看 (中间存档)
-    df_raw.to_excel("raw_pareto_results.xlsx", index=False)
+    # 保存为列式文件 (中间存档，post_process 直接读取)；excel=True 额外导出 .xlsx 方便查看
+    if save:
+        save_results(df_raw, "raw_pareto_results", excel=False)
 
     return all_raw_results
 
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from scipy.optimize import differential_evolution
 import config as cfg
+from new_model.result_io import save_results  # 列式结果文件 (Parquet / .npz)
 import test_new  # 确保这里导入的是修改后返回 (Cost, Carbon, RD, ED) 的 test.py
 
 # ==========================================
@@ -35,13 +36,22 @@ def hybrid_objective_function(x, lt_val, eps_carbon):
 # ==========================================
 # 移植部分 B: 求解流程控制 (对应 pyaugmecon/solver_process.py)
 # ==========================================
-def run_optimization():
+def run_optimization(lt_levels=(80, 100, 120), grid_points=20, seed=42, save=True):
+    """
+    :param grid_points: Carbon 网格点数
+    :param seed: DE 随机种子
+    :param save: False 时只返回结果不写文件 (benchmark.py 使用)
+    :return: 结果 DataFrame，df.attrs['stats'] 为求解统计 (n_solves / n_evals / n_infeasible)
+    """
+    if grid_points < 1:
+        raise ValueError(f"grid_points must be >= 1, got {grid_points}")
     print(">>> 启动 DE-AUGMECON-R (逻辑移植版) <<<")
     
     all_results = []
     bounds = [(385, 460), (700, 1150), (90, 115)]
+    stats = {'n_solves': 0, 'n_evals': 0, 'n_infeasible': 0}
     
-    for lt_val in [80, 100, 120]:
+    for lt_val in lt_levels:
         print(f"\n{'='*40}")
         print(f"正在优化层厚: {lt_val} um")
         print(f"{'='*40}")
@@ -49,8 +59,8 @@ def run_optimization():
         # --- 1. 网格初始化 (对应 model.py 的 find_obj_range) ---
         # 设定 Carbon 的搜索范围 (Payoff Table 的上下界)
         min_c, max_c = 5.0, 15.0  
-        grid_points = 20
-        step = (max_c - min_c) / (grid_points - 1) # 计算步长
+        # 计算步长；只有一个网格点时只求最宽松的约束 (步长无穷大，主循环执行一次即结束)
+        step = (max_c - min_c) / (grid_points - 1) if grid_points > 1 else np.inf
         
         print(f"  网格范围: [{min_c}, {max_c}], 步长: {step:.4f}")
         
@@ -70,8 +80,10 @@ def run_optimization():
                 maxiter=100,
                 popsize=15,
                 tol=0.01,
-                seed=42 # 保证复现性
+                seed=seed # 保证复现性
             )
+            stats['n_solves'] += 1
+            stats['n_evals'] += result.nfev
             
             # 提取真实物理值
             if result.success:
@@ -119,6 +131,7 @@ def run_optimization():
             else:
                 # [核心移植] 早退机制 (Early Exit)
                 # 原库逻辑：if early_exit and is_infeasible: break/continue
+                stats['n_infeasible'] += 1
                 print(f" 失败 (RD={real_rd:.2f}%). [Early Exit] 停止当前层厚搜索.")
                 break # 直接退出 while 循环，不再尝试更严格的约束
 
@@ -128,11 +141,14 @@ def run_optimization():
     if all_results:
         df = pd.DataFrame(all_results)
         df = df.drop_duplicates(subset=['Obj_Cost', 'Obj_Carbon'])
-        output_file = "hybrid_pareto_results.xlsx"
-        df.to_excel(output_file, index=False)
-        print(f"\n>>> 优化完成！共找到 {len(df)} 个有效解。结果已保存至 {output_file}")
+        if save:
+            output_file = save_results(df, "hybrid_pareto_results", excel=False)
+            print(f"\n>>> 优化完成！共找到 {len(df)} 个有效解。结果已保存至 {output_file}")
     else:
+        df = pd.DataFrame()
         print("\n>>> 警告：未找到任何可行解。")
+    df.attrs['stats'] = stats
+    return df
 
 if __name__ == "__main__":
     run_optimization()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from pyomo.environ import *
 from pyaugmecon import PyAugmecon
 import pandas as pd
+from new_model.response_surface import get_surface  # 回归方程 (系数表 new_model/response_surfaces.csv)
 
 # ==========================================
 # the first part: define the LPBF-Sustainability-Optimization model
@@ -57,19 +58,11 @@ def create_lpbf_model():
     # --------------------------------------------------
     # 4. 定义约束 (致密度 > 99%)
     # --------------------------------------------------
-    # 使用你提供的线性回归系数 (Linear Main Effects) [Source: 193 & Table 4]
-    # Density = Intercept + c1*P + c2*V + c3*H + c4*LT + c5*ED
-    # 注意：这里包含了 ED，这会引入非线性。如果想纯线性，可以暂时忽略 ED 项，
-    # 但根据你的公式，ED 影响很大，所以我们保留它，交给 Gurobi 处理。
+    # 完整的 Design-Expert 回归方程 (主效应 + 二次项 + 交叉项) [Source: 193 & Table 4]，
+    # 由响应面引擎直接生成 Pyomo 表达式。
+    # 注意：这里包含了 ED，这会引入非线性，交给 Gurobi 处理。
     def density_constraint_rule(m):
-        predicted_RD = (
-            136.59848 
-            + 0.094923 * m.P 
-            - 0.028654 * m.V 
-            - 0.201185 * m.H 
-            - 0.108546 * LT_val 
-            - 0.524864 * m.ED  # 非线性项
-        )
+        predicted_RD = get_surface('RD').pyomo_expression(P=m.P, V=m.V, H=m.H, LT=LT_val, ED=m.ED)
         return predicted_RD >= 99.5
     model.C_Density = Constraint(rule=density_constraint_rule)
 
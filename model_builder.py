@@ -1,7 +1,9 @@
 from pyomo.environ import *
 import config as cfg
+from new_model.response_surface import get_surface  # 回归方程 (系数表 new_model/response_surfaces.csv)
 
-def create_lpbf_model(lt_val_um): # 输入参数是（layer thickness）lt_val_um: 层厚 (单位: um)，例如 80, 100, 120
+def create_lpbf_model(lt_val_um, rd_min=None): # 输入参数是（layer thickness）lt_val_um: 层厚 (单位: um)，例如 80, 100, 120
+ # rd_min: 致密度下限 (%)，给定时加入 RD >= rd_min 约束；None = 只定义 m.RD 表达式
  # 1.Initialize the model
  m = ConcreteModel()
  # ==========================
@@ -88,4 +90,9 @@ def create_lpbf_model(lt_val_um): # 输入参数是（layer thickness）lt_val_u
  m.con_ed_min = Constraint(expr= m.P >= cfg.ED_MIN * m.BuildRate)
  m.con_ed_max = Constraint(expr= m.P <= cfg.ED_MAX * m.BuildRate)
 
+ # 致密度 RD：响应面引擎直接生成 Pyomo 多项式，ED = P * InvRate (J/mm^3)
+ m.RD = Expression(expr= get_surface('RD').pyomo_expression(P=m.P, V=m.V, H=m.H, LT=lt_val_um, ED=m.P * m.InvRate))
+ if rd_min is not None:
+     m.con_rd_min = Constraint(expr= m.RD >= rd_min)
+
  return m
\ No newline at end of file
@@ -1,6 +1,79 @@
 import numpy as np
 import pandas as pd
 import time
+import itertools
+import os
+import pickle
+import copy
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pareto_metrics import hypervolume, to_minimization  # 前沿质量指标 (实时超体积)
+from pareto_archive import ParetoArchive                 # 在线非支配存档 (ND-tree)
+from topsis import IncrementalTopsis                     # 运行中实时 TOPSIS 排序
+from telemetry import PhaseCollector, peak_rss_mb        # 求解阶段遥测
+
+# ============================================================
+# 并行工作进程 (Worker) 辅助函数
+# ============================================================
+# 求解器在每个工作进程启动时只反序列化一次 (initializer)，之后每个网格任务只传约束和种子。
+_WORKER_SOLVER = None
+
+def _init_worker(solver_handler):
+    global _WORKER_SOLVER
+    _WORKER_SOLVER = solver_handler
+
+def _solve_cell_task(flat_idx, primary_obj, constraints, seed, augmentation, warm_starts, collect=False):
+    """
+    :param collect: True 时在 worker 内收集求解器阶段事件，连同耗时与峰值内存一起返回 (遥测开启时)
+    :return: (flat_idx, 结果, 遥测 dict 或 None)
+    """
+    if not collect:
+        return flat_idx, _WORKER_SOLVER.solve(primary_obj, constraints, seed=seed, augmentation=augmentation,
+                                              warm_starts=warm_starts), None
+    collector = PhaseCollector()
+    _WORKER_SOLVER.telemetry = collector
+    t0 = time.perf_counter()
+    res = _WORKER_SOLVER.solve(primary_obj, constraints, seed=seed, augmentation=augmentation,
+                               warm_starts=warm_starts)
+    trace = {'phases': collector.phases, 'seconds': time.perf_counter() - t0, 'peak_rss_mb': peak_rss_mb()}
+    return flat_idx, res, trace
+
+class _FlagMap:
+    """
+    稀疏的标记数组 (flag)：bypass/early exit 的标记都是 "外层维度上的一个盒子 x 最内层的一个索引"，
+    按盒子保存而不是逐点写进稠密数组；串行遍历已越过的标记随时丢弃 (prune)，内存只随仍会被遍历到的标记数增长。
+    get 与稠密数组语义相同：取覆盖该点的最大跳跃步长，步长相同时先写入的标记决定原因。
+    """
+    def __init__(self):
+        self.columns = {}  # {最内层索引: [(外层下界, 外层上界, 跳跃步长, 原因, 最后一个点的串行序号)]}，按写入顺序
+
+    def mark(self, inner, lo, hi, jump, kind, end):
+        lo, hi = tuple(lo), tuple(hi)
+        marks = self.columns.setdefault(inner, [])
+        for o_lo, o_hi, o_jump, _, _ in marks:
+            # 已有标记覆盖整个盒子且步长不小：新标记不会改变任何点的结果
+            if o_jump >= jump and all(a <= b and c <= d for a, b, c, d in zip(o_lo, lo, hi, o_hi)):
+                return
+        marks.append((lo, hi, jump, kind, end))
+
+    def get(self, cell):
+        """:return: (跳跃步长, 原因)，未被标记时为 (0, None)"""
+        outer = cell[:-1]
+        jump, kind = 0, None
+        for lo, hi, j, k, _ in self.columns.get(cell[-1], ()):
+            if j > jump and all(a <= p <= b for a, p, b in zip(lo, outer, hi)):
+                jump, kind = j, k
+        return jump, kind
+
+    def prune(self, flat_now):
+        """丢弃最后一个点在串行序号 flat_now 之前的标记 (遍历不会再到达)"""
+        for inner in list(self.columns):
+            kept = [m for m in self.columns[inner] if m[4] >= flat_now]
+            if kept:
+                self.columns[inner] = kept
+            else:
+                del self.columns[inner]
 
 class AugmeconRGamsStyle:
     """
@@ -8,12 +81,54 @@ class AugmeconRGamsStyle:
     创新改进: 
     1. 引入代理回退策略 (Surrogate Fallback Strategy) 处理极端物理约束下的边界计算。
     2. 引入容错跳过机制 (Fault-Tolerant Skipping) 处理网格中的无解点。
+    3. AUGMECON-R 加速：增广松弛目标 + 旁路跳跃 (bypass) + 标记数组 (flag) + 不可行提前退出 (early exit)。
+    4. 热启动图 (Warm-Start Graph)：相邻网格点/上一层厚同位置的解作为求解器初值。
+    5. 断点续算 (Checkpoint/Resume)：周期性保存支付表、网格索引、已得解，中断后从断点继续。
+    6. 自适应网格细化 (Adaptive Grid Refinement)：粗扫后只在前沿弯曲/稀疏的区间插入新的 epsilon 值。
+    7. 帕累托存档 (Pareto Archive)：可行解在线插入 ND-tree，run() 只返回非支配 (去重) 的解。
+    8. 实时 TOPSIS：存档每次变化时增量更新排序，运行中即可看到当前最佳折衷解。
+    9. 流式接口 (stream)：每个网格点求解完立即产出一个事件，写盘/存档/进度等消费者与求解同步进行。
+    10. 遥测钩子 (telemetry)：阶段开始/结束、每个网格点的 DE/SLSQP 耗时与评估数、回退、峰值内存。
+    11. 派发前筛查 (prefilter)：更宽松的网格点已不可行、或区间二分证明不可行的网格点不再求解，并记录原因。
     """
     
-    def __init__(self, solver_handler, objective_config, grid_points=20):
+    def __init__(self, solver_handler, objective_config, grid_points=20, n_workers=1, seed=42,
+                 bypass=True, aug_eps=1e-3, warm_start=True, warm_start_from=None,
+                 checkpoint_path=None, checkpoint_every=10, resume=False,
+                 adaptive=False, solve_budget=None, refine_rounds=3, track_quality=False,
+                 archive_eps=None, topsis_weights=None, keep_history=True, telemetry=None,
+                 prefilter=True, prefilter_boxes=4096):
         self.solver = solver_handler
         self.obj_config = objective_config
         self.grid_points = grid_points
+        self.n_workers = n_workers  # >1 时网格点预先提交到进程池并行求解 (见 _grid_loop)
+        self.seed = seed            # 基础种子：支付表用 seed，网格点 k 用 seed + 1 + k
+        self.bypass = bypass        # 启用 bypass/flag/early-exit (串行遍历，跳过冗余网格点)
+        self.aug_eps = aug_eps      # 增广项系数 eps，松弛权重 = eps / range
+        self.warm_start = warm_start              # 是否用相邻网格点的解做热启动
+        self.warm_start_from = warm_start_from or {}  # 上一层厚的 cell_solutions {网格坐标: x}
+        self.checkpoint_path = checkpoint_path    # None = 不保存断点
+        self.checkpoint_every = checkpoint_every  # 每求解多少个网格点保存一次
+        self.resume = resume                      # True: 若断点文件存在则从断点继续
+        self.adaptive = adaptive          # True: 粗扫 (grid_points) 之后做自适应细化
+        self.solve_budget = solve_budget  # 网格阶段 + 细化阶段的求解总次数上限 (None = 粗扫次数的 1.5 倍)
+        self.refine_rounds = refine_rounds
+        self.track_quality = track_quality  # True: 每得到一个新解就记录一次归一化超体积
+        self.archive_eps = archive_eps      # 存档的 ε-支配容差 {目标名: 容差}，None = 精确支配 + 去重
+        self.topsis_weights = topsis_weights  # 按 obj_names 顺序的 TOPSIS 权重，None = 不做实时排序
+        # False: 不在内存中保留全部可行解/已求解网格点 (结果交给流式消费者落盘)，热启动图只保留串行遍历
+        # 还会回看的最近两片 (外层第 0 维)，内存随前沿大小与单片网格点数增长，而不是随网格点总数增长；
+        # 因此导出给下一层厚的 cell_solutions 也只剩最后两片。
+        # 自适应细化需要完整历史，因此 adaptive=True 时强制保留。
+        self.keep_history = keep_history or adaptive
+        # 遥测钩子 (telemetry.SolverHooks，如 TraceRecorder)；None = 关闭。
+        # 求解器没有自己的钩子时共用同一个，网格点内的 DE/SLSQP 事件因此落在对应的网格点记录里。
+        self.telemetry = telemetry
+        if telemetry is not None and getattr(solver_handler, 'telemetry', None) is None:
+            solver_handler.telemetry = telemetry
+        # 派发前筛查：证明不可行的网格点不调用求解器 (区间证明需要求解器提供 certify_infeasible)
+        self.prefilter = prefilter
+        self.prefilter_boxes = prefilter_boxes  # 每个网格点区间二分的盒子数上限
         
         self.obj_names = list(objective_config.keys())
         self.primary_obj = self.obj_names[0]       # e.g., 'Cost'
@@ -23,6 +138,20 @@ class AugmeconRGamsStyle:
         self.payoff_table = pd.DataFrame(index=self.obj_names, columns=self.obj_names)
         self.ranges = {} 
         self.grids = {} 
+        self.augmentation = {}  # {约束名: eps / range}，传给求解器的增广权重
+        self.cell_solutions = {}  # {网格坐标: x}，已求解/已被覆盖网格点的最优解 (热启动图的节点)
+        self._cover_boxes = []    # [(盒子下角, 盒子上角, x)]，keep_history=False 时被覆盖的网格点按盒子登记，不逐点展开
+        self.evaluated_cells = [] # [(约束字典, 结果或 None)]，真正调用过求解器的网格点
+        self.n_solves = 0         # 网格阶段 + 细化阶段调用求解器的次数
+        self.n_feasible = 0       # 得到的可行解总数 (含被支配的解)
+        self.hv_history = []      # [(n_solves, 归一化超体积)]，track_quality=True 时记录收敛过程
+        self.archive = self._new_archive()  # 当前非支配解集
+        self.ranker = None                  # 存档上的增量 TOPSIS (topsis_weights 给定时)
+        self._live_best = None              # 当前最佳折衷解在存档中的编号
+        self.payoff_solutions = []          # 支付表各行的解 (筛查时作为已知可行点)
+        self.infeasible_cells = []          # [约束字典]，已不可行 (被筛掉，或 bypass 时求解返回 None) 的最宽松网格点 (见 _add_infeasible)
+        self.prefilter_counts = {'neighbour': 0, 'interval': 0}  # 各原因筛掉的网格点数
+        self._resume_refine = None          # 断点中的细化阶段状态 (见 _refine_adaptive)
 
     def calculate_payoff_table(self):
         """
@@ -34,6 +163,7 @@ class AugmeconRGamsStyle:
         原理：Cost 和 Carbon 高度正相关，Cost 的最优参数通常也是 Carbon 在可行域内的最优参数。
         """
         print(f"\n  [AUGMECON-R] Constructing Payoff Table (Robust Mode)...")
+        self._phase('payoff', 'start')
         
         # 用于存储每个目标优化后的最佳解，作为“解库”
         best_solutions = {} 
@@ -43,7 +173,7 @@ class AugmeconRGamsStyle:
             print(f"    -> Optimizing {primary}...", end="")
             
             # 尝试调用求解器 (Layer 3)
-            res = self.solver.solve(primary, {})
+            res = self._solve_cell(primary, {}, primary, seed=self.seed)
             
             if res is not None:
                 # ✅ 情况 A: 成功找到解 (标准情况)
@@ -93,6 +223,8 @@ class AugmeconRGamsStyle:
                     print(" Failed!")
                     raise RuntimeError(f"Critical Error: No feasible region found even for {primary} (and no proxy available).")
 
+        self.payoff_solutions = list(best_solutions.values())
+
         # 2. 计算 Nadir (最差值) 和 Ideal (理想值)
         self.nadir_point = {}
         self.ideal_point = {}
@@ -108,6 +240,7 @@ class AugmeconRGamsStyle:
                 
         # 3. 设置网格范围
         self.setup_grid_ranges()
+        self._phase('payoff', 'end')
 
     def setup_grid_ranges(self):
         """生成网格切分点"""
@@ -136,56 +269,438 @@ class AugmeconRGamsStyle:
                 self.grids[obj] = [mn + k * step for k in range(self.grid_points + 1)]
             
             self.ranges[obj]['step'] = step
+            self.augmentation[obj] = self.aug_eps / r
             # print(f"    -> Grid {obj}: [{self.grids[obj][0]:.4f} ... {self.grids[obj][-1]:.4f}] (Step={step:.4f})")
 
+    def _flat_index(self, posg):
+        """网格坐标 posg -> 串行遍历顺序中的序号 (最内层维度变化最快)"""
+        idx = 0
+        for p in posg:
+            idx = idx * (self.grid_points + 1) + p
+        return idx
+
+    def _cell_at(self, flat_idx):
+        """串行遍历序号 -> 网格坐标 (_flat_index 的逆)"""
+        cell = []
+        for _ in range(self.n_constr):
+            flat_idx, p = divmod(flat_idx, self.grid_points + 1)
+            cell.append(p)
+        return tuple(reversed(cell))
+
+    def _cell_seed(self, posg):
+        """每个网格点的独立 DE 种子：只取决于网格坐标，与执行顺序/进程无关"""
+        return self.seed + 1 + self._flat_index(posg)
+
+    def _cell_constraints(self, posg):
+        """构建网格点 posg 的约束条件 (RHS: Right Hand Side)"""
+        return {obj: self.grids[obj][posg[i]] for i, obj in enumerate(self.constrained_objs)}
+
+    def _warm_starts_for(self, posg, neighbours=True):
+        """
+        收集网格点 posg 的热启动候选：
+        - 各维度上前一个网格点 (串行遍历中已处理过) 的解；
+        - 上一层厚同一网格坐标的解 (warm_start_from)。
+        """
+        if not self.warm_start:
+            return []
+        candidates = []
+        if neighbours:
+            for k in range(self.n_constr):
+                if posg[k] > 0:
+                    prev = list(posg)
+                    prev[k] -= 1
+                    x = self._cell_solution(tuple(prev))
+                    if x is not None:
+                        candidates.append(x)
+        if tuple(posg) in self.warm_start_from:
+            candidates.append(self.warm_start_from[tuple(posg)])
+        return candidates
+
+    def _cell_solution(self, cell):
+        """热启动图中网格点 cell 的解：先查已求解的点，再查覆盖它的盒子 (先登记的优先)，没有时返回 None"""
+        if cell in self.cell_solutions:
+            return self.cell_solutions[cell]
+        for lo, hi, x in self._cover_boxes:
+            if all(a <= p <= b for a, p, b in zip(lo, cell, hi)):
+                return x
+        return None
+
     def run(self):
         """
-        Phase 2: 执行 AUGMECON-R 主循环
+        Phase 2: 执行 AUGMECON-R 主循环 (adaptive=True 时再做自适应细化)
         
         【算法创新点 2：容错跳过机制】
         在传统的 GAMS 逻辑中，如果网格点无解会中断。
         这里我们允许部分网格点无解（物理不可行），并自动跳过，确保程序能遍历完所有物理上存在的解。
         """
+        for _ in self.stream():
+            pass
+        return self.front()
+
+    def stream(self):
+        """
+        流式版 run()：生成器，每个网格点处理完立即产出一个事件 (dict)：
+            {'event': 'solution' | 'infeasible' | 'skipped', 'lt': 层厚, 'cell': 网格坐标 (细化阶段为 None),
+             'constraints': 约束字典, 'result': 结果 dict 或 None (skipped 恒为 None),
+             'reason': 跳过原因 (仅 skipped): 'bypass' (被已有解覆盖) | 'early_exit' (更宽松的点不可行)
+                       | 'neighbour' / 'interval' (派发前筛查，见 _prefilter)
+                       | 'covered' (细化阶段：更宽松的已求解点的最优解同样满足新约束，直接复用),
+             'n_solves': 已求解次数, 'progress': 网格阶段完成比例 (0~1)}
+        网格中的每个点都恰好产出一个事件 (断点续算时已处理过的点除外)。
+        消费者 (见 result_stream.py) 在两次求解之间处理事件；遍历结束后用 front() 取最终前沿。
+        """
+        self._phase('run', 'start')
+        all_solutions = yield from self._run_grid()
+        self._phase('grid', 'end', solves=self.n_solves)
+        if self.adaptive and all_solutions:
+            yield from self._refine_adaptive(all_solutions)
+        if self.telemetry is not None:
+            self._phase('run', 'end', solves=self.n_solves, solutions=self.n_feasible, pareto=len(self.archive),
+                        hypervolume=self.hv_history[-1][1] if self.hv_history else None)
+
+    def front(self):
+        """当前存档中的非支配解 (run()/stream() 结束后即为最终前沿)"""
+        front = pd.DataFrame(self.archive.items())
+        print(f"  [AUGMECON-R] Pareto archive: {len(front)} non-dominated solutions")
+        if self.ranker is not None and len(front):
+            # 结束时用精确列范数重算，得分与批量 TOPSIS (按层厚分组) 逐位一致
+            keys, scores = self.ranker.scores(exact=True)
+            front['TOPSIS_Score'] = scores
+        return front
+
+    def _new_archive(self):
+        eps = None
+        if self.archive_eps:
+            eps = [self.archive_eps.get(o, 0.0) for o in self.obj_names]
+        return ParetoArchive([self.obj_config[o]['type'] for o in self.obj_names], eps=eps)
+
+    def _record_solution(self, all_solutions, res):
+        """登记一个可行解：加入完整解列表 (keep_history 时，供断点/细化使用) 与非支配存档"""
+        res['is_feasible'] = True
+        self.n_feasible += 1
+        if self.keep_history:
+            all_solutions.append(res)
+        self._archive_add(res)
+        self._track_hypervolume()
+        self._report_live_best()
+
+    def _archive_add(self, res):
+        """插入存档，并把存档的增删同步给增量 TOPSIS (每次 O(新增/删除点数))"""
+        f = [res[o] for o in self.obj_names]
+        if not self.archive.add(f, res):
+            return
+        if self.topsis_weights is not None:
+            if self.ranker is None:
+                self.ranker = IncrementalTopsis(self.topsis_weights,
+                                                [self.obj_config[o]['type'] == 'max' for o in self.obj_names])
+            for pid, _ in self.archive.last_removed:
+                self.ranker.remove(pid)
+            self.ranker.add(self.archive.last_id, f)
+
+    def _report_live_best(self):
+        """当前最佳折衷解变化时打印一行"""
+        if self.ranker is None or len(self.ranker) < 2:
+            return
+        key, score = self.ranker.best()
+        if key is None or key == self._live_best:
+            return
+        self._live_best = key
+        best = self.archive.get(key)
+        print(f"    [TOPSIS] Current best: P={best['P_W']:.1f}W, V={best['V_mm_s']:.1f}mm/s, "
+              f"H={best['H_um']:.1f}um (score {score:.4f}, {len(self.ranker)} Pareto solutions)")
+
+    def _record_evaluation(self, constraints, res):
+        # 求解器返回 None 不是严格证明：只有启用 bypass (本来就按它提前退出) 时才用于筛查，
+        # 关闭 bypass 时串行与并行网格 (并行无法使用同一轮的结果) 的筛查结果相同
+        if res is None and self.bypass:
+            self._add_infeasible(constraints)
+        if self.keep_history:
+            self.evaluated_cells.append((constraints, res))
+
+    def _history(self, all_solutions):
+        """写入断点的解列表：不保留历史时只存存档中的非支配解 (重放后得到同一个存档)"""
+        return all_solutions if self.keep_history else self.archive.items()
+
+    def _event(self, kind, cell, constraints, res, progress, reason=None):
+        return {'event': kind, 'lt': getattr(self.solver, 'lt', None), 'cell': cell,
+                'constraints': constraints, 'result': res, 'reason': reason,
+                'n_solves': self.n_solves, 'progress': progress}
+
+    def _skipped_events(self, posg, start, stop, reason, n_cells):
+        """最内层维度上 [start, stop) 范围内被跳过的网格点 (不超出网格) 各产出一个 'skipped' 事件"""
+        for i in range(start, min(stop, self.grid_points + 1)):
+            cell = tuple(posg[:-1]) + (i,)
+            yield self._event('skipped', cell, self._cell_constraints(cell), None,
+                              min(1.0, (self._flat_index(cell) + 1) / n_cells), reason)
+
+    def _phase(self, name, status, **info):
+        """向遥测钩子报告控制器阶段的开始/结束"""
+        if self.telemetry is not None:
+            self.telemetry.on_phase(name, status=status, lt=getattr(self.solver, 'lt', None), **info)
+
+    def _solve_cell(self, cell, constraints, primary_obj, **solve_kwargs):
+        """调用求解器 (Layer 3)；遥测开启时在前后触发 on_cell_start / on_cell_end"""
+        if self.telemetry is None:
+            return self.solver.solve(primary_obj, constraints, **solve_kwargs)
+        self.telemetry.on_cell_start(cell, constraints)
+        res = self.solver.solve(primary_obj, constraints, **solve_kwargs)
+        self.telemetry.on_cell_end(cell, res)
+        return res
+
+    def _replay_cell(self, cell, constraints, res, trace):
+        """把并行 worker 收集的遥测 (阶段事件、耗时、峰值内存) 重放给主进程的钩子"""
+        self.telemetry.on_cell_start(cell, constraints)
+        for phase, info in trace['phases']:
+            self.telemetry.on_phase(phase, **info)
+        self.telemetry.on_cell_end(cell, res, seconds=trace['seconds'], peak_rss_mb=trace['peak_rss_mb'])
+
+    def _prefilter(self, constraints):
+        """
+        派发前筛查：能证明网格点不可行时返回原因，否则返回 None (需要真正求解)。
+        - 'neighbour': 各约束都不比它紧的网格点已不可行 (已被筛掉，或 bypass 时求解返回 None)；
+        - 'interval' : 支付表与存档中没有满足该约束的已知解，且求解器的区间二分证明不可行。
+        有已知解满足约束时网格点必然可行，直接跳过区间证明。
+        只证明不可行，不做支配剪枝：能支配该网格点全部可能解的存档点本身必然满足该点的约束，
+        且要在每个目标上都达到区间下界，区间界几乎不可能这么紧，这类检查实际上不会触发。
+        """
+        if not self.prefilter:
+            return None
+        for old in self.infeasible_cells:
+            if all(self._is_tighter(o, constraints[o], old[o]) for o in self.constrained_objs):
+                return 'neighbour'
+        for res in itertools.chain(self.payoff_solutions, self.archive.items()):
+            if all(self._is_tighter(o, res[o], constraints[o]) for o in self.constrained_objs):
+                return None
+        certify = getattr(self.solver, 'certify_infeasible', None)
+        if certify is not None and certify(constraints, max_boxes=self.prefilter_boxes):
+            return 'interval'
+        return None
+
+    def _add_infeasible(self, constraints):
+        """
+        登记不可行网格点。筛查只问 "有没有不比它紧的不可行点"，因此只保留最宽松的一组：
+        已被更宽松的不可行点覆盖的新点不再登记，被新点覆盖的旧点删掉。
+        """
+        objs = self.constrained_objs
+        if any(all(self._is_tighter(o, constraints[o], old[o]) for o in objs) for old in self.infeasible_cells):
+            return
+        self.infeasible_cells = [old for old in self.infeasible_cells
+                                 if not all(self._is_tighter(o, old[o], constraints[o]) for o in objs)]
+        self.infeasible_cells.append(constraints)
+
+    def _try_skip(self, cell, constraints):
+        """筛查网格点，证明不可行时登记跳过并返回原因，否则返回 None"""
+        reason = self._prefilter(constraints)
+        if reason is not None:
+            self._skip_cell(cell, constraints, reason)
+        return reason
+
+    def _skip_cell(self, cell, constraints, reason):
+        """登记一个被筛掉的网格点 (不调用求解器)，并报告给遥测钩子"""
+        self.prefilter_counts[reason] += 1
+        self._add_infeasible(constraints)
+        if self.telemetry is not None:
+            self.telemetry.on_phase('prefilter', cell=cell, constraints=constraints, reason=reason)
+
+    def _rebuild_archive(self, all_solutions):
+        """断点续算：按原顺序重放已得解，重建与中断前一致的存档"""
+        self.archive = self._new_archive()
+        self.ranker = None
+        for res in all_solutions:
+            self._archive_add(res)
+
+    def _track_hypervolume(self):
+        """
+        以支付表的 ideal/nadir 归一化，参考点取 nadir 外扩 10%，记录当前前沿的超体积。
+        (只对存档中的非支配解计算；3 目标为期望 O(n log n) 的精确扫描 (pareto_metrics.hypervolume)，足够在每个网格点之后调用)
+        """
+        if not self.track_quality or len(self.archive) == 0:
+            return
+        senses = [self.obj_config[o]['type'] for o in self.obj_names]
+        F = to_minimization(self.archive.objectives(), senses)
+        ideal = to_minimization([[self.ideal_point[o] for o in self.obj_names]], senses)[0]
+        nadir = to_minimization([[self.nadir_point[o] for o in self.obj_names]], senses)[0]
+        scale = np.where(nadir - ideal > 1e-12, nadir - ideal, 1.0)
+        hv = hypervolume((F - ideal) / scale, np.full(len(self.obj_names), 1.1))
+        self.hv_history.append((self.n_solves, hv))
+
+    def _run_grid(self):
+        """
+        等间距网格主循环 (串行 bypass 版或并行版)，支持断点续算。
+        生成器：逐个产出网格点事件，结束时返回可行解列表 (keep_history=False 时为存档中的解)。
+        """
+        # 0. 断点续算：恢复支付表与网格，跳过已完成的部分
+        state = self._load_checkpoint() if self.resume else None
+        if state is not None and state['finished']:
+            print(f"\n  [AUGMECON-R] Checkpoint already finished. Solutions: {len(state['all_solutions'])}")
+            self._rebuild_archive(state['all_solutions'])
+            self.n_feasible = state.get('n_feasible', len(state['all_solutions']))
+            self._resume_refine = state.get('refine')
+            return state['all_solutions']
+
         # 1. 先计算边界
-        self.calculate_payoff_table()
-        
-        print(f"\n  [AUGMECON-R] Starting Main Loop (Robust Search)...")
-        
+        if state is None:
+            self.calculate_payoff_table()
+            self._save_checkpoint()  # 支付表可能很耗时，先存一次
+            state = {}
+
+        self._phase('grid', 'start')
+        if self._parallel_grid():
+            print(f"\n  [AUGMECON-R] Starting Main Loop (Robust Search, {self.n_workers} workers)...")
+            pool = self._open_pool()
+        else:
+            print(f"\n  [AUGMECON-R] Starting Main Loop (Robust Search)...")
+            pool = None
+        try:
+            return (yield from self._grid_loop(state, pool))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _open_pool(self):
+        """网格并行用的进程池；主进程的钩子 (可能持有打开的轨迹文件) 不发给 worker"""
+        worker_solver = self.solver
+        if getattr(worker_solver, 'telemetry', None) is not None:
+            worker_solver = copy.copy(worker_solver)
+            worker_solver.telemetry = None
+        return ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker, initargs=(worker_solver,))
+
+    def _grid_loop(self, state, pool=None):
+        """
+        网格主循环：按串行顺序遍历，bypass/flag/early exit 与筛查都在遍历时决定。
+        pool 不为 None 时 (n_workers > 1) 做预先求解 (speculative lookahead)：
+        - 沿串行顺序提前把后面尚未被 flag 覆盖的网格点提交到进程池，同时在途的最多 2 * n_workers 个；
+        - 遍历到某个网格点时取它的结果 (还没提交的就地提交并等待)，登记、跳跃、事件都与串行完全相同；
+        - 遍历越过的网格点 (被后来的解覆盖/提前退出/筛掉) 的预先求解结果直接丢弃，不计入求解次数。
+        结果只按串行顺序登记，与完成先后无关，因此并行运行是确定的。并行时热启动只用上一层厚的解
+        (warm_start_from)：相邻网格点的解在提交时可能还没登记，用它会使结果依赖调度。
+        因此只有 warm_start=False 时并行与串行的存档逐位一致；开启热启动时两者的前沿可能略有差异。
+        """
         # 初始化网格计数器
         posg = [0] * self.n_constr 
         maxg = [self.grid_points] * self.n_constr
+        innermost_idx = self.n_constr - 1
+
+        # 标记数组 (flag)：flag.get(cell) 的步长 k > 0 表示该网格点已被某个解覆盖/已证明不可行，
+        # 到达时直接沿最内层维度跳过 k 个点，不再调用求解器。
+        flag = _FlagMap()
         
         all_solutions = []
         infeas_count = 0
+        bypass_count = 0  # 因 flag 而免于求解的网格点数
         iter_count = 0
+        n_cells = (self.grid_points + 1) ** self.n_constr
+
+        # 预先求解 (仅 pool 不为 None 时)：{串行序号: future}，spec_next 为下一个考虑提交的序号
+        inflight = {}
+        spec_next = 0
+        discarded = 0      # 被遍历越过而丢弃的预先求解数
+        collect = self.telemetry is not None   # worker 收集求解器阶段事件，随结果传回
+
+        def submit(flat):
+            cell = self._cell_at(flat)
+            return pool.submit(_solve_cell_task, flat, self.primary_obj, self._cell_constraints(cell),
+                               self._cell_seed(cell), self.augmentation,
+                               self._warm_starts_for(cell, neighbours=False), collect)
+
+        def lookahead(flat, flag):
+            """丢弃已越过网格点的结果，并把在途任务补满 (跳过已被 flag 覆盖、必然不会求解的点)"""
+            nonlocal spec_next, discarded
+            for idx in [i for i in inflight if i < flat]:
+                if not inflight.pop(idx).cancel():
+                    discarded += 1
+            spec_next = max(spec_next, flat + 1)
+            while len(inflight) < 2 * self.n_workers and spec_next < n_cells:
+                if spec_next not in inflight and not (self.bypass and flag.get(self._cell_at(spec_next))[0] > 0):
+                    inflight[spec_next] = submit(spec_next)
+                spec_next += 1
+
+        if 'posg' in state:
+            posg, flag = list(state['posg']), state['flag']
+            all_solutions, infeas_count = state['all_solutions'], state['infeas_count']
+            bypass_count, iter_count = state['bypass_count'], state['iter_count']
+            self._rebuild_archive(all_solutions)
+            self.n_feasible = state.get('n_feasible', len(all_solutions))
+            print(f"  [AUGMECON-R] Resuming at grid {posg} ({self.n_feasible} solutions so far)")
+        solves_since_checkpoint = 0
+        slab = posg[0]
         
         while True:
+            if posg[0] != slab:
+                # 进入外层第 0 维的下一片：丢掉遍历不会再用到的标记与热启动解
+                slab = posg[0]
+                self._forget_passed(flag, posg)
+
+            # 周期性保存断点 (posg 指向下一个尚未处理的网格点)
+            if solves_since_checkpoint >= self.checkpoint_every:
+                self._save_checkpoint(posg=list(posg), flag=flag,
+                                      all_solutions=self._history(all_solutions),
+                                      infeas_count=infeas_count, bypass_count=bypass_count,
+                                      iter_count=iter_count, n_feasible=self.n_feasible)
+                solves_since_checkpoint = 0
+
             iter_count += 1
-            
-            # 1. 构建当前的约束条件 (RHS: Right Hand Side)
-            current_constraints = {}
-            for i, obj in enumerate(self.constrained_objs):
-                idx = posg[i]
-                val = self.grids[obj][idx]
-                current_constraints[obj] = val
-            
-            # 2. 调用 Layer 3 求解
-            res = self.solver.solve(self.primary_obj, current_constraints)
-            
-            if res is not None:
-                # ✅ 找到可行解
-                res['is_feasible'] = True
-                all_solutions.append(res)
-                active_jump = 1 # 步进 1
-                
+            cell = tuple(posg)
+
+            active_jump, kind = flag.get(cell) if self.bypass else (0, None)
+            flagged = active_jump > 0
+            reason = None if flagged else self._try_skip(cell, self._cell_constraints(posg))
+            if flagged:
+                # ⏩ 已被覆盖：按标记跳跃，不求解
+                bypass_count += 1
+                yield from self._skipped_events(posg, posg[-1], posg[-1] + active_jump, kind, n_cells)
+            elif reason is not None:
+                # 🚫 派发前已证明不可行：不求解，与不可行网格点一样提前退出
+                active_jump = self._mark_infeasible(flag, posg) if self.bypass else 1
+                yield from self._skipped_events(posg, posg[-1], posg[-1] + 1, reason, n_cells)
+                yield from self._skipped_events(posg, posg[-1] + 1, posg[-1] + active_jump, 'early_exit', n_cells)
             else:
-                # ❌ 未找到解 (Skip)
-                # 这不是错误，而是探索到了物理不可行区域 (Infeasible Region)
-                infeas_count += 1
-                active_jump = 1 # 跳过当前点，继续探索下一个
+                # 1. 构建当前的约束条件 (RHS: Right Hand Side)
+                current_constraints = self._cell_constraints(posg)
+                
+                # 2. 调用 Layer 3 求解 (增广目标返回松弛量)
+                if pool is None:
+                    res = self._solve_cell(cell, current_constraints, self.primary_obj, seed=self._cell_seed(posg),
+                                           augmentation=self.augmentation,
+                                           warm_starts=self._warm_starts_for(posg))
+                else:
+                    flat = self._flat_index(posg)
+                    fut = inflight.pop(flat, None)
+                    if fut is None:
+                        # 需要的点不在途：撤下还没开始的预先求解，让它不用排队 (撤下的点之后重新考虑)
+                        for idx in [i for i, f in inflight.items() if f.cancel()]:
+                            del inflight[idx]
+                        spec_next = flat + 1
+                        fut = submit(flat)
+                    lookahead(flat, flag)
+                    _, res, trace = fut.result()
+                    if trace is not None:
+                        self._replay_cell(cell, current_constraints, res, trace)
+                solves_since_checkpoint += 1
+                self.n_solves += 1
+                self._record_evaluation(current_constraints, res)
+                
+                if res is not None:
+                    # ✅ 找到可行解
+                    self._record_solution(all_solutions, res)
+                    self.cell_solutions[cell] = res['x']
+                    active_jump = self._mark_covered(flag, posg, res) if self.bypass else 1
+                    
+                else:
+                    # ❌ 未找到解 (Skip)
+                    # 这不是错误，而是探索到了物理不可行区域 (Infeasible Region)
+                    infeas_count += 1
+                    active_jump = self._mark_infeasible(flag, posg) if self.bypass else 1
+
+                # 立即交给消费者 (跳过的网格点计入进度)
+                progress = min(1.0, (self._flat_index(posg) + active_jump) / n_cells)
+                yield self._event('solution' if res is not None else 'infeasible',
+                                  cell, current_constraints, res, progress)
+                # 本次跳跃越过的网格点
+                yield from self._skipped_events(posg, posg[-1] + 1, posg[-1] + active_jump,
+                                                'bypass' if res is not None else 'early_exit', n_cells)
             
             # 3. 递归更新网格索引 (Nested Loop Logic)
-            innermost_idx = self.n_constr - 1
             current_dim = innermost_idx
             
             posg[current_dim] += active_jump
@@ -196,12 +711,345 @@ class AugmeconRGamsStyle:
                     # 当前维度跑完了
                     if current_dim == 0:
                         # 最外层也跑完了 -> 彻底结束
-                        print(f"\n  [AUGMECON-R] Loop Finished. Solutions: {len(all_solutions)}, Infeas: {infeas_count}")
-                        return pd.DataFrame(all_solutions)
+                        lookahead(n_cells, flag)
+                        note = f", Speculative discarded: {discarded}" if pool is not None else ""
+                        print(f"\n  [AUGMECON-R] Loop Finished. Solutions: {self.n_feasible}, "
+                              f"Infeas: {infeas_count}, Bypassed: {bypass_count}{self._prefilter_note()}{note}")
+                        if self.hv_history:
+                            print(f"  [AUGMECON-R] Hypervolume (normalized): {self.hv_history[-1][1]:.6f}")
+                        all_solutions = self._history(all_solutions)
+                        self._save_checkpoint(finished=True, all_solutions=all_solutions,
+                                              n_feasible=self.n_feasible)
+                        return all_solutions
                     
                     # 进位：当前层归零，上一层 +1
                     posg[current_dim] = 0
                     current_dim -= 1
                     posg[current_dim] += 1
                 else:
-                    break
\ No newline at end of file
+                    break
+
+    def _prefilter_note(self):
+        """循环结束日志中的筛查统计 (没有跳过任何网格点时为空)"""
+        skipped = {k: v for k, v in self.prefilter_counts.items() if v}
+        if not skipped:
+            return ""
+        return f", Prefiltered: {sum(skipped.values())} (" + ", ".join(f"{k} {v}" for k, v in skipped.items()) + ")"
+
+    def _mark_covered(self, flag, posg, res):
+        """
+        旁路跳跃 (Bypass)：解 res 在约束 k 上还有松弛 s_k，说明把约束 k 再收紧
+        b_k = floor(s_k / step_k) 格，该解依然可行且最优 —— 这些网格点无需再求解。
+        - 外层维度：把 [posg_k, posg_k + b_k] 张成的盒子里的点标记为 flag = b_inner + 1
+        - 最内层维度：直接返回跳跃步长 b_inner + 1
+        """
+        b = [int(np.floor(res['slacks'][obj] / self.ranges[obj]['step'] + 1e-9))
+             for obj in self.constrained_objs]
+        jump = b[-1] + 1
+        inner = posg[-1]
+        hi = [min(posg[k] + b[k], self.grid_points) for k in range(self.n_constr)]
+        flag.mark(inner, posg[:-1], hi[:-1], jump, 'bypass', self._flat_index(hi[:-1] + [inner]))
+        # 被覆盖的网格点共享同一个最优解，登记到热启动图 (keep_history=False 时只记盒子，不逐点展开)
+        if self.keep_history:
+            for cell in itertools.product(*[range(posg[k], hi[k] + 1) for k in range(self.n_constr)]):
+                self.cell_solutions.setdefault(cell, res['x'])
+        else:
+            self._cover_boxes.append((tuple(posg), tuple(hi), res['x']))
+        return jump
+
+    def _mark_infeasible(self, flag, posg):
+        """
+        提前退出 (Early Exit)：当前网格点不可行，则所有约束更紧的点
+        (各维度索引都 >= 当前索引) 也不可行 —— 沿最内层维度直接跳到末尾。
+        """
+        inner = posg[-1]
+        jump = self.grid_points - inner + 1
+        hi = [self.grid_points] * (self.n_constr - 1)
+        flag.mark(inner, posg[:-1], hi, jump, 'early_exit', self._flat_index(hi + [inner]))
+        return jump
+
+    def _forget_passed(self, flag, posg):
+        """
+        进入外层第 0 维的下一片时调用：丢掉遍历已越过的 flag 标记；keep_history=False 时
+        再丢掉前一片之前的热启动解 (相邻点最远只回看到前一片)。
+        """
+        flag.prune(self._flat_index(posg))
+        if self.keep_history:
+            return
+        first = posg[0] - 1
+        self.cell_solutions = {c: x for c, x in self.cell_solutions.items() if c[0] >= first}
+        self._cover_boxes = [box for box in self._cover_boxes if box[1][0] >= first]
+
+    def _save_checkpoint(self, finished=False, **loop_state):
+        """
+        保存断点：支付表/网格 (无需重算) + 热启动图 + 主循环状态。
+        先写临时文件再原子替换，保证中途被打断也不会留下损坏的断点。
+        """
+        if not self.checkpoint_path:
+            return
+        state = {
+            'lt': getattr(self.solver, 'lt', None),
+            'config': self._run_config(),
+            'obj_names': self.obj_names,
+            'grid_points': self.grid_points,
+            'payoff_table': self.payoff_table,
+            'nadir_point': self.nadir_point,
+            'ideal_point': self.ideal_point,
+            'ranges': self.ranges,
+            'grids': self.grids,
+            'augmentation': self.augmentation,
+            'cell_solutions': self.cell_solutions,
+            'cover_boxes': self._cover_boxes,
+            'evaluated_cells': self.evaluated_cells,
+            'payoff_solutions': self.payoff_solutions,
+            'infeasible_cells': self.infeasible_cells,
+            'prefilter_counts': self.prefilter_counts,
+            'n_solves': self.n_solves,
+            'hv_history': self.hv_history,
+            'finished': finished,
+            **loop_state
+        }
+        folder = os.path.dirname(self.checkpoint_path)
+        if folder and not os.path.exists(folder): os.makedirs(folder)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _parallel_grid(self):
+        """网格是否用进程池预先求解 (见 _grid_loop)"""
+        return self.n_workers > 1
+
+    def _run_config(self):
+        """
+        影响结果的全部配置 (写入断点，续算时必须逐项一致)。
+        并行结果与 worker 数无关，因此 n_workers 只记录串行/并行两种遍历方式；
+        上一层厚的热启动解只记录摘要。经 JSON 往返，元组/numpy 值统一成可比较的形式。
+        """
+        settings = getattr(self.solver, 'settings', None)
+        warm_from = json.dumps({str(k): np.round(np.asarray(x, dtype=float), 8).tolist()
+                                for k, x in self.warm_start_from.items()}, sort_keys=True)
+        config = {
+            'lt': getattr(self.solver, 'lt', None),
+            'solver': type(self.solver).__name__,
+            'solver_settings': settings() if settings is not None else None,
+            'objectives': self.obj_config,
+            'grid_points': self.grid_points,
+            'seed': self.seed,
+            'mode': 'parallel' if self._parallel_grid() else 'serial',
+            'bypass': self.bypass,
+            'aug_eps': self.aug_eps,
+            'warm_start': self.warm_start,
+            'warm_start_from': hashlib.sha256(warm_from.encode('utf-8')).hexdigest(),
+            'adaptive': self.adaptive,
+            'solve_budget': self.solve_budget,
+            'refine_rounds': self.refine_rounds,
+            'track_quality': self.track_quality,
+            'archive_eps': self.archive_eps,
+            'keep_history': self.keep_history,
+            'prefilter': self.prefilter,
+            'prefilter_boxes': self.prefilter_boxes,
+        }
+        return json.loads(json.dumps(config, sort_keys=True, default=str))
+
+    def _load_checkpoint(self):
+        """
+        读取断点并恢复支付表/网格/热启动图；断点不存在或与当前配置不符时返回 None (从头开始)。
+        """
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'rb') as f:
+            state = pickle.load(f)
+        config = self._run_config()
+        saved = state.get('config')
+        if saved != config:
+            changed = sorted(k for k in config if saved is None or saved.get(k) != config[k])
+            print(f"  [AUGMECON-R] Checkpoint {self.checkpoint_path} does not match current setup "
+                  f"(changed: {', '.join(changed) if saved is not None else 'no config recorded'}), starting over.")
+            return None
+
+        self.payoff_table = state['payoff_table']
+        self.nadir_point = state['nadir_point']
+        self.ideal_point = state['ideal_point']
+        self.ranges = state['ranges']
+        self.grids = state['grids']
+        self.augmentation = state['augmentation']
+        self.cell_solutions = state['cell_solutions']
+        self._cover_boxes = state.get('cover_boxes', [])
+        self.evaluated_cells = state['evaluated_cells']
+        self.payoff_solutions = state.get('payoff_solutions', [])
+        self.infeasible_cells = state.get('infeasible_cells', [])
+        self.prefilter_counts = state.get('prefilter_counts', self.prefilter_counts)
+        self.n_solves = state.get('n_solves', 0)
+        self.hv_history = state.get('hv_history', [])
+        return state
+
+    # ============================================================
+    # 自适应网格细化 (Adaptive Grid Refinement)
+    # ============================================================
+    def _is_tighter(self, obj, a, b):
+        """约束值 a 是否不比 b 宽松 (Min 目标: a <= b；Max 目标: a >= b)"""
+        return a <= b + 1e-12 if self.obj_config[obj]['type'] == 'min' else a >= b - 1e-12
+
+    def _covered_result(self, constraints):
+        """
+        判断新网格点能否直接复用已有结果 (与 bypass 同理，无需求解)：
+        - 某个约束更宽松的已求解点，其解也满足新约束 -> 该解在新点上同样最优；
+        - 某个约束更宽松的点已不可行 -> 新点必然不可行。
+        返回 (是否覆盖, 结果或 None)
+        """
+        for old_cons, res in self.evaluated_cells:
+            if not all(self._is_tighter(o, constraints[o], old_cons[o]) for o in self.constrained_objs):
+                continue
+            if res is None:
+                return True, None
+            if all(self._is_tighter(o, res[o], constraints[o]) for o in self.constrained_objs):
+                return True, res
+        return False, None
+
+    def _knee_segments(self, solutions):
+        """
+        在当前前沿上寻找值得加密的区间。
+        对每个约束目标 k：按 k 排序已有解，在归一化目标空间中计算相邻解的间距 (稀疏度，
+        近似超体积贡献) 与折线转角 (曲率)，评分 = 间距 * (1 + 两端转角)。
+        返回 [(评分, 约束名, 新 epsilon 值)]，按评分降序。
+        """
+        F = np.array([[s[o] for o in self.obj_names] for s in solutions], dtype=float)
+        for j, obj in enumerate(self.obj_names):
+            if self.obj_config[obj]['type'] == 'max':
+                F[:, j] = -F[:, j]   # 统一成“越小越好”
+        lo, hi = F.min(axis=0), F.max(axis=0)
+        Z = (F - lo) / np.where(hi - lo > 1e-12, hi - lo, 1.0)
+
+        segments = []
+        for obj in self.constrained_objs:
+            j = self.obj_names.index(obj)
+            raw = np.array([s[obj] for s in solutions], dtype=float)
+            order = np.argsort(raw, kind='stable')
+            pts, vals = Z[order], raw[order]
+            keep = np.r_[True, np.linalg.norm(np.diff(pts, axis=0), axis=1) > 1e-9]  # 去掉重复解
+            pts, vals = pts[keep], vals[keep]
+            if len(pts) < 2:
+                continue
+
+            d = np.diff(pts, axis=0)
+            gap = np.linalg.norm(d, axis=1)
+            # 顶点处的转角 (1 - cos)，端点记 0
+            unit = d / gap[:, None]
+            turn = np.r_[0.0, 1.0 - np.sum(unit[:-1] * unit[1:], axis=1), 0.0]
+            score = gap * (1.0 + turn[:-1] + turn[1:])
+
+            min_gap = self.ranges[obj]['step'] / 8.0  # 细化下限，防止无限加密
+            for i in range(len(gap)):
+                mid = 0.5 * (vals[i] + vals[i + 1])
+                if min(abs(g - mid) for g in self.grids[obj]) < min_gap:
+                    continue
+                segments.append((score[i], obj, mid))
+
+        segments.sort(key=lambda s: -s[0])
+        return segments
+
+    def _refine_adaptive(self, all_solutions):
+        """
+        自适应细化主流程 (生成器，每次求解产出一个事件，cell 为 None)：
+        1. 粗扫结果 -> _knee_segments 找出高曲率/高稀疏度区间；
+        2. 在这些区间插入新的 epsilon 值，与其他维度现有网格值组合成新网格点；
+        3. 已被覆盖的新网格点直接复用结果，其余按区间评分依次求解，直到求解预算用完。
+        断点：每求解 checkpoint_every 次保存一次 (粗扫结束时的状态 + 细化阶段已求解的结果)。
+        续算时从粗扫结束时的状态重放细化过程，已求解过的子问题直接取保存的结果 (不调用求解器、不重复产出事件)，
+        种子与遍历顺序不变，因此结果与不中断的运行一致。
+        """
+        resume = self._resume_refine or {}
+        self._resume_refine = None
+        if resume:
+            base = resume['base']
+            self.grids = copy.deepcopy(base['grids'])
+            self.evaluated_cells = list(base['evaluated_cells'])
+            self.infeasible_cells = list(base['infeasible_cells'])
+            self.prefilter_counts = dict(base['prefilter_counts'])
+            self.n_solves = base['n_solves']
+            self.hv_history = list(base['hv_history'])
+            self.n_feasible = base['n_feasible']
+        base = {'grids': copy.deepcopy(self.grids), 'evaluated_cells': list(self.evaluated_cells),
+                'infeasible_cells': list(self.infeasible_cells), 'prefilter_counts': dict(self.prefilter_counts),
+                'n_solves': self.n_solves, 'hv_history': list(self.hv_history), 'n_feasible': self.n_feasible}
+        base_solutions = list(all_solutions)
+        results = dict(resume.get('results', {}))   # {约束键: 结果或 None}，细化阶段已求解的子问题
+        to_replay = len(results)
+        solves_since_checkpoint = 0
+        n_covered = 0
+
+        budget = self.solve_budget if self.solve_budget is not None else int(np.ceil(1.5 * self.n_solves))
+        all_solutions = list(all_solutions)
+        print(f"\n  [AUGMECON-R] Adaptive refinement (solves so far: {self.n_solves}, budget: {budget})...")
+        self._phase('refine', 'start')
+
+        for round_idx in range(self.refine_rounds):
+            if self.n_solves >= budget:
+                break
+            segments = self._knee_segments(all_solutions)[:max(1, self.grid_points // 2)]
+            if not segments:
+                break
+
+            new_found = 0
+            for _, obj, eps_val in segments:
+                if self.n_solves >= budget:
+                    break
+                # 插入新 epsilon 值 (保持网格遍历方向：Min 降序，Max 升序)
+                self.grids[obj] = sorted(self.grids[obj] + [eps_val],
+                                         reverse=self.obj_config[obj]['type'] == 'min')
+                others = [o for o in self.constrained_objs if o != obj]
+                for combo in itertools.product(*[self.grids[o] for o in others]):
+                    if self.n_solves >= budget:
+                        break
+                    constraints = dict(zip(others, combo))
+                    constraints[obj] = eps_val
+                    covered, res = self._covered_result(constraints)
+                    if covered and res is not None:
+                        reason = 'covered'      # 复用已有最优解，不是筛查结论，不计入 prefilter_counts
+                        n_covered += 1
+                    elif covered:
+                        reason = 'neighbour'
+                        self._skip_cell(None, constraints, reason)
+                    else:
+                        reason = self._try_skip(None, constraints)
+                    if reason is not None:
+                        if to_replay <= 0:
+                            yield self._event('skipped', None, constraints, None, 1.0, reason)
+                        continue
+                    key = tuple(sorted(constraints.items()))
+                    replayed = key in results
+                    if replayed:
+                        res = results[key]
+                        to_replay -= 1
+                    else:
+                        res = self._solve_cell(None, constraints, self.primary_obj,
+                                               seed=self.seed + 1 + len(self.evaluated_cells),
+                                               augmentation=self.augmentation,
+                                               warm_starts=[s['x'] for s in all_solutions[-3:]])
+                        results[key] = res
+                        solves_since_checkpoint += 1
+                    self.n_solves += 1
+                    self._record_evaluation(constraints, res)
+                    if res is not None:
+                        self._record_solution(all_solutions, res)
+                        new_found += 1
+                    if not replayed:
+                        yield self._event('solution' if res is not None else 'infeasible',
+                                          None, constraints, res, 1.0)
+                    if solves_since_checkpoint >= self.checkpoint_every:
+                        self._save_refine_checkpoint(base_solutions, base, results)
+                        solves_since_checkpoint = 0
+            print(f"    -> Round {round_idx + 1}: {len(segments)} segments refined, "
+                  f"{new_found} new solutions, solves used: {self.n_solves}")
+
+        print(f"  [AUGMECON-R] Refinement Finished. Solutions: {len(all_solutions)}, Solves: {self.n_solves}, "
+              f"Reused: {n_covered}")
+        self._save_refine_checkpoint(base_solutions, base, results)
+        self._phase('refine', 'end', solves=self.n_solves)
+        return all_solutions
+
+    def _save_refine_checkpoint(self, base_solutions, base, results):
+        """细化阶段断点：粗扫已完成 (finished)，附带粗扫结束时的状态与细化阶段已求解的结果"""
+        self._save_checkpoint(finished=True, all_solutions=base_solutions, n_feasible=base['n_feasible'],
+                              refine={'base': base, 'results': results})
@@ -14,10 +14,14 @@ def check_physical_limits():
         def obj_func(x):
             _, _, rd, _ = test.predict_performance(x, lt)
             return -rd
+
+        # 解析梯度 (RD 是 P/V/H/ED 的显式二次多项式)
+        def obj_jac(x):
+            return -test.performance_gradients(x, lt)['RD']
             
         # 换用 SLSQP 强力爬山
         # 初始点选一个中间值，或者多试几个初始点
-        res = minimize(obj_func, x0=[420, 900, 100], bounds=bounds, method='SLSQP')
+        res = minimize(obj_func, x0=[420, 900, 100], jac=obj_jac, bounds=bounds, method='SLSQP')
         
         max_rd = -res.fun
         print(f"Layer {lt} um:")
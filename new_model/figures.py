@@ -0,0 +1,226 @@
+import os
+import json
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')                         # 无界面后端：服务器/工作进程中直接渲染到文件
+import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d import Axes3D       # noqa: F401 (注册 3D 投影)
+from concurrent.futures import ProcessPoolExecutor
+
+# ============================================================
+# 图表渲染流水线 (Headless Figure Pipeline)
+# ============================================================
+# 每张图是一个任务 (输出路径, 渲染函数, 参数)：
+#   - 稠密前沿先在归一化目标空间里做体素稀疏化 (downsample_front)，再交给渲染函数；
+#   - 输入数据 + 渲染函数源码的哈希记在清单文件里，未变化且图片仍在时直接跳过；
+#   - 需要重画的图分发到进程池并行渲染 (单核或单张图时在当前进程渲染)。
+
+MAX_POINTS = 3000   # 每张图每组最多绘制的点数
+DPI = 300
+MANIFEST = 'results/.figure_hashes.json'
+
+LT_COLORS = {80: '#1f77b4', 100: '#2ca02c', 120: '#d62728'}
+LT_MARKERS = {80: 'o', 100: '^', 120: 's'}
+OBJ_COLS = ['Obj_Cost', 'Obj_Carbon', 'Obj_Efficiency']
+OBJ_LABELS = {'Obj_Cost': 'Cost (CNY)', 'Obj_Carbon': 'Carbon ($kg CO_2$)', 'Obj_Efficiency': 'Efficiency ($mm^3/s$)'}
+
+def downsample_front(df, cols=OBJ_COLS, max_points=MAX_POINTS, by='LT_um'):
+    """
+    体素稀疏化：把目标空间归一化到 [0, 1]，每个体素只保留一个点 (各目标的极值点始终保留)，
+    体素逐步加粗直到每组不超过 max_points 个点。分布形状保持不变，稠密区域被均匀抽稀。
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    if by is not None and by in df.columns:
+        return pd.concat([downsample_front(g, cols, max_points, None) for _, g in df.groupby(by)])
+
+    F = df[cols].to_numpy(dtype=float)
+    lo, hi = F.min(axis=0), F.max(axis=0)
+    Z = (F - lo) / np.where(hi - lo > 0, hi - lo, 1.0)
+    extremes = np.r_[np.argmin(F, axis=0), np.argmax(F, axis=0)]
+    bins = int(np.ceil(max_points ** (1.0 / len(cols)))) * 4
+    while True:
+        keys = np.minimum((Z * bins).astype(np.int64), bins - 1)
+        _, first = np.unique(np.ravel_multi_index(keys.T, (bins,) * len(cols)), return_index=True)
+        keep = np.union1d(first, extremes)
+        if len(keep) <= max_points or bins <= 2:
+            return df.iloc[keep]
+        bins = max(2, int(bins * 0.8))
+
+def _feed(h, obj):
+    """把任务参数按内容写入哈希 (DataFrame / 数组按数值，dict 按键排序)"""
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            h.update(repr(k).encode())
+            _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _feed(h, v)
+    else:
+        h.update(repr(obj).encode())
+
+def job_hash(func, kwargs):
+    """任务指纹：渲染函数源码 + 全部输入数据；改数据或改画法都会触发重画"""
+    h = hashlib.sha1(inspect.getsource(func).encode())
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+def _load_manifest(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def _render_job(job):
+    path, func, kwargs = job
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    func(path=path, **kwargs)
+    plt.close('all')
+    return path
+
+def render_figures(jobs, n_workers=None, manifest=MANIFEST, force=False):
+    """
+    渲染一批图表任务。
+    :param jobs: [(输出路径, 渲染函数, 参数 dict)]，渲染函数须为模块级函数 (可被子进程导入)
+    :param n_workers: 进程数，缺省为 CPU 核数
+    :param force: True 时忽略哈希清单全部重画
+    :return: {输出路径: 'rendered' | 'skipped'}
+    """
+    hashes = _load_manifest(manifest)
+    status, todo = {}, []
+    for job in jobs:
+        path, func, kwargs = job
+        digest = job_hash(func, kwargs)
+        if not force and hashes.get(path) == digest and os.path.exists(path):
+            status[path] = 'skipped'
+        else:
+            todo.append(job)
+            hashes[path] = digest
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(todo))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            for path in pool.map(_render_job, todo):
+                status[path] = 'rendered'
+    else:
+        for job in todo:
+            status[_render_job(job)] = 'rendered'
+
+    os.makedirs(os.path.dirname(manifest) or '.', exist_ok=True)
+    with open(manifest, 'w') as f:
+        json.dump(hashes, f, indent=1, sort_keys=True)
+    return status
+
+# ============================================================
+# 渲染函数 (在工作进程中执行；输入均为已稀疏化的数据)
+# ============================================================
+def _mark_best(ax, best, cols):
+    if best is not None and not best.empty:
+        ax.scatter(*[best[c].to_numpy(dtype=float) for c in cols],
+                   c='gold', s=200, marker='*', edgecolors='black', label='Best Solution', zorder=10)
+
+def render_pareto_3d(path, df, best=None, dpi=DPI):
+    """三维帕累托图 (各层厚不同颜色/标记，TOPSIS 最优解高亮)"""
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    cols = ['Obj_Cost', 'Obj_Efficiency', 'Obj_Carbon']
+    for lt, sub in df.groupby('LT_um'):
+        ax.scatter(*[sub[c].to_numpy(dtype=float) for c in cols],
+                   c=LT_COLORS.get(lt, 'b'), marker=LT_MARKERS.get(lt, 'o'),
+                   label=rf'LT {lt:g} $\mu m$', s=40, alpha=0.6)
+    _mark_best(ax, best, cols)
+    ax.set_xlabel(OBJ_LABELS['Obj_Cost'])
+    ax.set_ylabel(OBJ_LABELS['Obj_Efficiency'])
+    ax.set_zlabel(OBJ_LABELS['Obj_Carbon'])
+    ax.legend()
+    fig.savefig(path, dpi=dpi)
+
+def render_projections(path, df, best=None, dpi=DPI):
+    """单个层厚的二维投影：Cost-Carbon / Cost-Efficiency / Carbon-Efficiency"""
+    pairs = [('Obj_Cost', 'Obj_Carbon'), ('Obj_Cost', 'Obj_Efficiency'), ('Obj_Carbon', 'Obj_Efficiency')]
+    lt = df['LT_um'].iloc[0]
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4.5))
+    for ax, (x, y) in zip(axes, pairs):
+        ax.scatter(df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float),
+                   c=LT_COLORS.get(lt, 'b'), marker=LT_MARKERS.get(lt, 'o'), s=20, alpha=0.6, rasterized=True)
+        _mark_best(ax, best, [x, y])
+        ax.set_xlabel(OBJ_LABELS[x]); ax.set_ylabel(OBJ_LABELS[y])
+        ax.grid(alpha=0.3)
+    fig.suptitle(rf'Pareto projections, LT {lt:g} $\mu m$')
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+
+def render_score_map(path, df, best=None, score_col='Score', dpi=DPI):
+    """TOPSIS 得分图：每个层厚一个子图，Cost-Efficiency 平面上按得分着色"""
+    groups = list(df.groupby('LT_um'))
+    fig, axes = plt.subplots(1, len(groups), figsize=(5 * len(groups), 4.5), squeeze=False)
+    vmin, vmax = df[score_col].min(), df[score_col].max()
+    for ax, (lt, sub) in zip(axes[0], groups):
+        sc = ax.scatter(sub['Obj_Cost'].to_numpy(dtype=float), sub['Obj_Efficiency'].to_numpy(dtype=float),
+                        c=sub[score_col].to_numpy(dtype=float), cmap='viridis', vmin=vmin, vmax=vmax,
+                        s=25, rasterized=True)
+        if best is not None and not best.empty:
+            _mark_best(ax, best[best['LT_um'] == lt], ['Obj_Cost', 'Obj_Efficiency'])
+        ax.set_title(rf'LT {lt:g} $\mu m$')
+        ax.set_xlabel(OBJ_LABELS['Obj_Cost']); ax.set_ylabel(OBJ_LABELS['Obj_Efficiency'])
+    fig.colorbar(sc, ax=axes[0].tolist(), label='TOPSIS score')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+def render_weight_map(path, W, win_rows, base_weights, dpi=200):
+    """
+    三元图：单纯形上每个权重点按“该权重下的最佳解”着色，每个分组一个子图，星号为默认权重。
+    顶点: 左下 = 只看 Cost，右下 = 只看 Carbon，顶部 = 只看 Efficiency。
+    """
+    def to_xy(w):
+        w = np.atleast_2d(w)
+        return w[:, 1] + 0.5 * w[:, 2], np.sqrt(3) / 2 * w[:, 2]
+
+    base = np.asarray(base_weights, dtype=float) / np.sum(base_weights)
+    fig, axes = plt.subplots(1, len(win_rows), figsize=(5 * len(win_rows), 4.6), squeeze=False)
+    x, y = to_xy(W)
+    for ax, (key, pos) in zip(axes[0], win_rows.items()):
+        _, colour = np.unique(pos, return_inverse=True)
+        ax.scatter(x, y, c=colour, cmap='tab20', s=1, marker='.', linewidths=0, rasterized=True)
+        bx, by_ = to_xy(base)
+        ax.scatter(bx, by_, c='gold', s=200, marker='*', edgecolors='black', zorder=10)
+        ax.plot([0, 1, 0.5, 0], [0, 0, np.sqrt(3) / 2, 0], 'k-', lw=0.8)
+        ax.text(0, -0.06, 'Cost', ha='center'); ax.text(1, -0.06, 'Carbon', ha='center')
+        ax.text(0.5, np.sqrt(3) / 2 + 0.03, 'Efficiency', ha='center')
+        ax.set_title(f'{key}: {len(np.unique(pos[pos >= 0]))} winners', pad=18)
+        ax.set_aspect('equal'); ax.axis('off')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+# ============================================================
+# 后处理的标准图表集
+# ============================================================
+def figure_jobs(df, best=None, score_col='Score', weight_map=None, out_dir='results', max_points=MAX_POINTS):
+    """
+    构建后处理的图表任务：3D 前沿、每个层厚的二维投影、TOPSIS 得分图，以及可选的权重稳定性三元图。
+    :param weight_map: (W, win_rows, base_weights) 或 None
+    """
+    cols = [c for c in ['LT_um'] + OBJ_COLS + [score_col] if c in df.columns]
+    data = downsample_front(df[cols], max_points=max_points)
+    best = best[[c for c in cols if c in best.columns]] if best is not None and not best.empty else None
+
+    jobs = [(os.path.join(out_dir, 'pareto_front_3d.png'), render_pareto_3d, {'df': data, 'best': best})]
+    for lt, sub in data.groupby('LT_um'):
+        best_lt = best[best['LT_um'] == lt] if best is not None else None
+        jobs.append((os.path.join(out_dir, f'pareto_projections_LT{lt:g}.png'), render_projections,
+                     {'df': sub, 'best': best_lt}))
+    if score_col in data.columns:
+        jobs.append((os.path.join(out_dir, 'topsis_score_map.png'), render_score_map,
+                     {'df': data, 'best': best, 'score_col': score_col}))
+    if weight_map is not None:
+        W, win_rows, base_weights = weight_map
+        jobs.append((os.path.join(out_dir, 'topsis_weight_map.png'), render_weight_map,
+                     {'W': W, 'win_rows': win_rows, 'base_weights': list(base_weights)}))
+    return jobs
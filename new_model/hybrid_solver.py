@@ -1,6 +1,10 @@
 import numpy as np          # in order to handle numerical arrays
+import time                 # 遥测计时 (仅在 telemetry 开启时使用)
+from collections import OrderedDict  # LRU 缓存 (按插入/访问顺序淘汰)
+from scipy.stats import qmc   # 拉丁超立方采样，用于构造带热启动个体的 DE 初始种群
 from scipy.optimize import differential_evolution, minimize     #导入两个优化器   differential_evolution：全局随机搜索（不需要梯度）minimize：局部优化器接口（用 SLSQP 支持约束）
 import physics_model   # from layer 1 my physics engine evaluating Cost/Carbon/Efficiency/RD/ED
+from interval_model import BoxPresolver, hull, sample_boxes, prove_infeasible   # 区间算术预处理：按约束收缩 P/V/H 搜索区域
 
 class HybridSolver:
     """
@@ -13,20 +17,103 @@ class HybridSolver:
        - Phase 2 (Local Refinement): 使用梯度算法 (SLSQP) 进行精确修整，确保满足硬约束。
     3. 返回最终的物理结果给 Layer 2。
     """
+
+    # DE 参数 (同时是持久化求解缓存键的一部分，修改后旧缓存自动失效)
+    DE_OPTIONS = {
+        'strategy': 'best1bin', # 经典稳健策略
+        'maxiter': 200,         # 粗搜阶段不需要太久，主要找 basin
+        'popsize': 50,          # 种群大一点提高全局探索能力（更稳，但慢）
+        'tol': 0.01,            # 新增: 容差，防止过早收敛
+    }
+    # SLSQP 参数: ftol 控制收敛精度
+    SLSQP_OPTIONS = {'ftol': 1e-4, 'disp': False}
     
-    def __init__(self,lt_val):
+    def __init__(self,lt_val, vectorized=False, cache_size=4096, solve_cache=None, telemetry=None, presolve=True):
         """
         初始化求解器，绑定当前的工艺层厚。
+
+        :param vectorized: True 时 DE 阶段整代种群一次性批量评估 (vectorized=True)，
+                           罚函数全部写成数组运算，速度比逐个体调用快一个数量级。
+        :param cache_size: 逐点指标缓存的最大条目数 (0 = 关闭缓存)
+        :param solve_cache: 持久化求解缓存 (solve_cache.SolveCache)，命中时 solve 直接返回已存结果
+        :param telemetry: 遥测钩子 (telemetry.SolverHooks)，接收 DE/SLSQP/回退等阶段事件；None = 关闭
+        :param presolve: True 时每个子问题先用区间算术收缩 P/V/H 边界 (剔除必然违反 RD/ED/epsilon 约束的区域)，
+                         DE 只在剩余盒子里采样；证明子问题不可行时直接返回 None，不再跑 DE
         """
         self.lt = lt_val  #保存当前层厚，后续每次评估性能都用这个 LT。
+        self.vectorized = vectorized
+        self.solve_cache = solve_cache
+        self.telemetry = telemetry
+        self.presolve = presolve
+        self._presolver = None   # 本层厚的 BoxPresolver (首次求解时构造，之后每个子问题复用)
+
+        # 逐点指标缓存：SLSQP 的目标函数和 3+k 个约束在同一个 x 上各调一次 _get_all_metrics，
+        # 用 x 的原始字节做键，让它们共享同一次物理模型评估。
+        self.cache_size = cache_size
+        self._metrics_cache = OrderedDict()
+        self._grad_cache = OrderedDict()    # 解析梯度同样按 x 缓存 (SLSQP 的 jac 回调)
+        # 命中统计按缓存分开记 ({'metrics' | 'gradients': {'hits', 'misses'}})，梯度命中不混入指标缓存的命中率
+        self.cache_counts = {name: {'hits': 0, 'misses': 0} for name in ('metrics', 'gradients')}
+        self.n_evals = 0    # 物理模型的实际评估次数 (逐点 + 批量，缓存命中不计)，供基准测试统计
         # 工艺参数边界: Power (W)-P, Speed (mm/s)-V, Hatch (um)-H
         self.bounds = [(385, 460), (700, 1150), (90, 115)]
         # 为什么必须有 bounds：1.DE 需要边界才能采样种群  2.SLSQP 用 bounds 限制变量可行域（物理/设备范围）
 
     def _get_all_metrics(self, x):
         """
-        辅助函数：调用 Layer 1 的物理模型，计算所有指标。
+        辅助函数：调用 Layer 1 的物理模型，计算所有指标 (带 LRU 缓存)。
+        """
+        return self._cached(self._metrics_cache, x, self._compute_metrics, self.cache_counts['metrics'])
+
+    def _get_all_gradients(self, x):
+        """
+        辅助函数：调用 Layer 1 的解析梯度，返回 {指标名: [d/dP, d/dV, d/dH]} (带 LRU 缓存)。
+        """
+        return self._cached(self._grad_cache, x,
+                            lambda x: physics_model.performance_gradients(x, self.lt),
+                            self.cache_counts['gradients'])
+
+    def _cached(self, cache, x, compute, counts):
+        """
+        通用 LRU 查表：命中直接返回，未命中则计算并写入，超过 cache_size 时淘汰最旧条目。
+        :param counts: 该缓存的命中统计 {'hits', 'misses'}
+        """
+        if self.cache_size <= 0:
+            return compute(x)
+
+        key = np.asarray(x, dtype=float).tobytes()  # 精确匹配：只有完全相同的 x 才命中
+        cached = cache.get(key)
+        if cached is not None:
+            counts['hits'] += 1
+            cache.move_to_end(key)
+            return cached
+
+        counts['misses'] += 1
+        value = compute(x)
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)  # 淘汰最久未使用的条目
+        return value
+
+    def cache_stats(self, name='metrics'):
+        """
+        返回某个逐点缓存的命中统计: hits / misses / hit_rate / size
+        :param name: 'metrics' (指标缓存) 或 'gradients' (梯度缓存)
         """
+        counts = self.cache_counts[name]
+        total = counts['hits'] + counts['misses']
+        return {
+            'hits': counts['hits'],
+            'misses': counts['misses'],
+            'hit_rate': counts['hits'] / total if total else 0.0,
+            'size': len(self._metrics_cache if name == 'metrics' else self._grad_cache)
+        }
+
+    def _compute_metrics(self, x):
+        """
+        无缓存的实际计算。
+        """
+        self.n_evals += 1
         Cost, Carbon, RD, ED = physics_model.predict_performance(x, self.lt)
         
         # 计算效率 (Volumetric Build Rate)
@@ -40,18 +127,189 @@ class HybridSolver:
             'RD': RD,
             'ED': ED
         }
+
+    def _get_all_metrics_batch(self, X):
+        """
+        批量版 _get_all_metrics：X 为 (N, 3)，每个指标返回长度 N 的数组。
+        """
+        self.n_evals += len(X)
+        Cost, Carbon, RD, ED, efficiency = physics_model.predict_performance_batch(X, self.lt)
+        return {
+            'Cost': Cost,
+            'Carbon': Carbon,
+            'Efficiency': efficiency,
+            'RD': RD,
+            'ED': ED
+        }
+
+    @staticmethod
+    def _slack(c_name, val, c_limit):
+        """
+        AUGMECON 松弛量 (slack)：约束目标比 epsilon 限值“好”多少。
+        Min 目标 (Cost/Carbon): s = limit - val；Max 目标 (Efficiency): s = val - limit
+        (对标量和数组都成立)
+        """
+        return c_limit - val if c_name in ['Cost', 'Carbon'] else val - c_limit
+
+    def _is_feasible(self, metrics, constraint_map, strict=False):
+        """
+        可行性检查。
+        strict=False: 最终验收 (允许微小数值误差: RD >= 99.45, Cost/Carbon +0.05, Efficiency -0.001)
+        strict=True : 热启动判定 (不留容差，保证 SLSQP 从真正可行的点出发)
+        """
+        rd_min = 99.5 if strict else 99.45
+        tol_min = 0.0 if strict else 0.05
+        tol_max = 0.0 if strict else 0.001
+
+        # 检查物理约束
+        if metrics['RD'] < rd_min:
+           return False
+        if not (30.00 <= metrics['ED'] <= 80.0):
+           return False
+
+        #检查 AUGMECON 约束
+        for c_name, c_limit in constraint_map.items():
+           val = metrics[c_name]                          #对每条约束做严格检查：Cost/Carbon（min 型）：必须 val <= limit     Efficiency（max 型）：必须 val >= limit
+           if c_name in ['Cost', 'Carbon']:
+              if val > c_limit + tol_min: return False     # 容差            
+           elif c_name == 'Efficiency': 
+              if val < c_limit - tol_max: return False
+        return True
+
+    def settings(self):
+        """
+        影响求解结果的全部求解器设置 (用于持久化缓存键)。
+        """
+        return {
+            'bounds': self.bounds,
+            'presolve': self.presolve,
+            'vectorized': self.vectorized,
+            'de': self.DE_OPTIONS,
+            'slsqp': self.SLSQP_OPTIONS,
+        }
+
+    def search_region(self, constraint_map=None):
+        """
+        子问题的搜索区域 (presolve)。
+        :return: (bounds, boxes)
+                 bounds: 可行子盒子的包络 [(lo, hi), ...]，证明子问题不可行时为 None；
+                 boxes: 可行子盒子 (下界数组, 上界数组)，DE 初始种群只在其中采样；presolve 关闭时为 None
+        """
+        if not self.presolve:
+            return self.bounds, None
+        boxes = self._get_presolver().viable(constraint_map)
+        return hull(*boxes), boxes
+
+    def _get_presolver(self):
+        if self._presolver is None:
+            self._presolver = BoxPresolver(self.bounds, self.lt)
+        return self._presolver
+
+    def certify_infeasible(self, constraint_map, max_boxes=4096):
+        """
+        比 presolve 更进一步的不可行证明 (供 Layer 2 在派发网格点之前筛查)：
+        从 presolve 的可行子盒子出发做有预算的区间二分 (interval_model.prove_infeasible)。
+        与 presolve 开关无关；按最终验收的容差判定，返回 True 时 solve 必然返回 None。
+        :param max_boxes: 二分盒子数上限，超过后放弃证明
+        :return: True = 证明不可行；False = 未能证明
+        """
+        lo, hi = self._get_presolver().viable(constraint_map)
+        scale = np.array([b[1] - b[0] for b in self.bounds], dtype=float)
+        return prove_infeasible(lo, hi, self.lt, constraint_map, scale, max_boxes=max_boxes)
+
+    def _initial_population(self, warm_starts, seed, bounds, boxes=None):
+        """
+        构造 DE 初始种群：拉丁超立方采样铺满边界 (有 presolve 的可行子盒子时只在子盒子内采样)，
+        再用热启动点替换前几个个体。
+        """
+        n_dim = len(bounds)
+        n_pop = self.DE_OPTIONS['popsize'] * n_dim
+        if boxes is not None:
+            population = sample_boxes(boxes[0], boxes[1], n_pop, seed=seed)
+        else:
+            lower = np.array([b[0] for b in bounds])
+            upper = np.array([b[1] for b in bounds])
+            sample = qmc.LatinHypercube(d=n_dim, seed=seed).random(n_pop)
+            population = lower + sample * (upper - lower)
+        population[:len(warm_starts)] = warm_starts[:len(population)]
+        return population
+
+    def _relaxed_objective_batch(self, X, primary_obj_name, constraint_map, augmentation=None):
+        """
+        relaxed_objective 的数组版本：一次评估整个种群 X (N, 3)，返回 (N,) 罚分。
+        罚分规则与逐点版本完全一致：RD -> ED 窗口 -> 主目标(含松弛奖励) + epsilon 软约束。
+        """
+        metrics = self._get_all_metrics_batch(X)
+        RD, ED = metrics['RD'], metrics['ED']
+
+        # 主目标 + AUGMECON 软约束罚分
+        score = metrics[primary_obj_name]
+        if primary_obj_name == 'Efficiency':
+            score = -score
+        for c_name, weight in (augmentation or {}).items():
+            score = score - weight * self._slack(c_name, metrics[c_name], constraint_map[c_name])
+        PENALTY = 1e6
+        for c_name, c_limit in constraint_map.items():
+            val = metrics[c_name]
+            if c_name in ['Cost', 'Carbon']:   # Min 目标
+                score = score + PENALTY * np.maximum(val - c_limit, 0.0)**2
+            elif c_name == 'Efficiency':       # Max 目标
+                score = score + PENALTY * np.maximum(c_limit - val, 0.0)**2
+
+        # 硬约束按优先级覆盖：RD 最优先，其次 ED 下限、ED 上限
+        return np.where(RD < 99.5, 1e8 + (99.5 - RD) * 1e6,
+               np.where(ED < 30.0, 1e8 + (30.0 - ED) * 1e6,
+               np.where(ED > 80.0, 1e8 + (ED - 80.0) * 1e6, score)))
     
-    def solve(self, primary_obj_name, constraint_map):
+    def solve(self, primary_obj_name, constraint_map, seed=42, augmentation=None, warm_starts=None):
         """
         执行混合求解的核心接口。
         
         :param primary_obj_name: 当前优化的主目标 (e.g., 'Cost')
         :param constraint_map: 当前的约束条件字典 (e.g., {'Carbon': 10.0})
-        :return: 结果字典 或 None
+        :param seed: DE 随机种子 (Layer 2 为每个网格点分配独立种子，保证并行/串行结果一致)
+        :param augmentation: AUGMECON 增广权重 {约束名: eps / range}。
+                             目标变为 f1 - sum(w_k * s_k)，s_k 为约束 k 的松弛量，
+                             避免返回弱帕累托解；None 表示不增广。
+        :param warm_starts: 热启动点列表 [[P, V, H], ...] (如相邻网格点或上一层厚的解)。
+                            若其中已有严格可行点，则跳过 DE 直接从最优的那个点开始 SLSQP；
+                            否则把它们注入 DE 初始种群。
+        :return: 结果字典 (含 'slacks': {约束名: 松弛量}) 或 None
         """
-        # ==========================================================
-        # Phase 1: Global Exploration (DE with Relaxed Constraints)
-        # ==========================================================
+        if self.solve_cache is None:
+            return self._solve(primary_obj_name, constraint_map, seed, augmentation, warm_starts)
+
+        key = self.solve_cache.make_key(self, primary_obj_name, constraint_map, seed, augmentation, warm_starts)
+        hit, result = self.solve_cache.get(key)
+        if hit:
+            if self.telemetry is not None:
+                self.telemetry.on_phase('cache_hit')
+            return result
+        result = self._solve(primary_obj_name, constraint_map, seed, augmentation, warm_starts)
+        self.solve_cache.put(key, result)
+        return result
+
+    def _solve(self, primary_obj_name, constraint_map, seed, augmentation, warm_starts):
+        """
+        solve 的实际求解过程 (不经过持久化缓存)。
+        """
+        augmentation = augmentation or {}
+        # Phase -1: Presolve (收缩搜索盒子；证明不可行则直接返回)
+        t0 = time.perf_counter() if self.telemetry is not None else None
+        bounds, boxes = self.search_region(constraint_map)
+        if t0 is not None:
+            self.telemetry.on_phase('presolve', seconds=time.perf_counter() - t0, infeasible=bounds is None)
+        if bounds is None:
+            return None
+
+        # 热启动点裁剪到搜索盒子内
+        warm = np.empty((0, len(self.bounds)))
+        if warm_starts is not None and len(warm_starts):
+            lower = [b[0] for b in bounds]
+            upper = [b[1] for b in bounds]
+            warm = np.clip(np.asarray(warm_starts, dtype=float).reshape(-1, len(self.bounds)), lower, upper)
+
+        # DE 阶段的“目标+罚函数” (逐点版)
         def relaxed_objective(x):
             metrics = self._get_all_metrics(x)
 
@@ -67,7 +325,7 @@ class HybridSolver:
             # ED 约束 (30-80)
             if metrics['ED'] < 30.0: 
                return 1e8 + (30.0 - metrics['ED']) * 1e6
-            elif metrics['ED'] < 80.0:
+            elif metrics['ED'] > 80.0:
                return 1e8 + (metrics['ED'] - 80.0) * 1e6
             
             # --- 优化模式：活下来了，才开始算分 ---
@@ -76,6 +334,9 @@ class HybridSolver:
             score = metrics[primary_obj_name]
             if primary_obj_name == 'Efficiency':
                score = -score
+            # AUGMECON 增广项：松弛越大奖励越多 (s 是 x 的函数，因此无需额外决策变量)
+            for c_name, weight in augmentation.items():
+               score -= weight * self._slack(c_name, metrics[c_name], constraint_map[c_name])
 
             # 4. 处理 AUGMECON 的软约束 (如 Carbon <= epsilon)
             # 这些是优化层面的约束，违反了只加适量罚分
@@ -91,96 +352,163 @@ class HybridSolver:
             
             return score
 
+        # 批量模式：scipy 传入的种群形状为 (3, S)，转置成 (S, 3) 一次算完
+        def relaxed_objective_batch(xs):
+            return self._relaxed_objective_batch(xs.T, primary_obj_name, constraint_map, augmentation)
+
+        # ==========================================================
+        # Phase 0: Warm Start (已可行的热启动点直接跳过 DE)
+        # ==========================================================
+        feasible_warm = [x for x in warm
+                         if self._is_feasible(self._get_all_metrics(x), constraint_map, strict=True)]
+        if feasible_warm:
+            x_start = min(feasible_warm, key=relaxed_objective)  # 可行点的罚分即增广目标值
+            if self.telemetry is not None:
+                self.telemetry.on_phase('warm_start', n_feasible=len(feasible_warm))
+            return self._refine(x_start, primary_obj_name, constraint_map, augmentation, bounds)
+
+        # ==========================================================
+        # Phase 1: Global Exploration (DE with Relaxed Constraints)
+        # ==========================================================
+        x_start = self._run_de(relaxed_objective, relaxed_objective_batch, warm, seed, bounds, boxes)
+        result = None
+        if x_start is not None:
+            result = self._refine(x_start, primary_obj_name, constraint_map, augmentation, bounds)
+
+        # 热启动点不可行时可能把种群拉向约束边界外侧；失败则回退到冷启动 DE 再试一次
+        if result is None and len(warm):
+            if self.telemetry is not None:
+                self.telemetry.on_phase('fallback', reason='cold_de')
+            x_start = self._run_de(relaxed_objective, relaxed_objective_batch, warm[:0], seed, bounds, boxes)
+            if x_start is not None:
+                result = self._refine(x_start, primary_obj_name, constraint_map, augmentation, bounds)
+        return result  # DE 都失败了则为 None
+
+    def _run_de(self, relaxed_objective, relaxed_objective_batch, warm, seed, bounds, boxes=None):
+        """
+        Phase 1 的 DE 调用：返回 DE 最优点，失败时返回 None。
+        有热启动点或 presolve 子盒子时自建初始种群，否则使用默认的拉丁超立方初始化。
+        """
         # 运行 DE
+        if self.vectorized:
+            de_kwargs = {'vectorized': True, 'updating': 'deferred'}  # vectorized 要求整代同步更新
+            de_func = relaxed_objective_batch
+        else:
+            de_kwargs = {}
+            de_func = relaxed_objective
+
+        t0 = time.perf_counter() if self.telemetry is not None else None
+        evals0 = self.n_evals   # vectorized 模式下 nfev 按整代计数，评估数改用物理模型实际评估次数之差
         de_res = differential_evolution(
-           relaxed_objective, # 我的“目标+罚函数”
-           self.bounds,       # 变量范围
-           strategy= 'best1bin', # 经典稳健策略
-           maxiter=200,         # 粗搜阶段不需要太久，主要找 basin
-           popsize=50,         # 种群大一点提高全局探索能力（更稳，但慢）
-           tol=0.01,         # 新增: 容差，防止过早收敛
-           seed= 42            # 保证可复现（论文必须强调 reproducibility）
+           de_func,           # 我的“目标+罚函数”
+           bounds,            # 变量范围 (presolve 收缩后的搜索盒子)
+           seed= seed,         # 保证可复现（论文必须强调 reproducibility）
+           init= self._initial_population(warm, seed, bounds, boxes) if len(warm) or boxes is not None
+                 else 'latinhypercube',
+           **self.DE_OPTIONS,   # strategy / maxiter / popsize / tol
+           **de_kwargs
         )
+        if t0 is not None:
+            self.telemetry.on_phase('de', seconds=time.perf_counter() - t0, evals=self.n_evals - evals0,
+                                    success=bool(de_res.success), warm_starts=len(warm))
         
         if not de_res.success:
-           return None  # DE 都失败了，直接放弃
-        
+           return None
+        return de_res.x
+
+    def _refine(self, x_start, primary_obj_name, constraint_map, augmentation, bounds=None):
+        """
+        Phase 2 + 3: 从 x_start 出发做 SLSQP 精修，并完成最终可行性验收与结果打包。
+        """
         # ==========================================================
         # Phase 2: Local Refinement (SLSQP with Strict Constraints)
         # ==========================================================
 
-        # 1. 定义 SLSQP 目标函数 (纯净版，无罚函数)
+        # 1. 定义 SLSQP 目标函数 (纯净版，无罚函数，仅保留增广松弛项) 及其解析梯度
+        sign = -1.0 if primary_obj_name == 'Efficiency' else 1.0
         def exact_objective(x):
            metrics = self._get_all_metrics(x)
-           val = metrics[primary_obj_name]
-           return -val if primary_obj_name == 'Efficiency' else val
+           val = sign * metrics[primary_obj_name]
+           for c_name, weight in augmentation.items():
+              val -= weight * self._slack(c_name, metrics[c_name], constraint_map[c_name])
+           return val
+
+        def exact_objective_jac(x):
+           grads = self._get_all_gradients(x)
+           jac = sign * grads[primary_obj_name]
+           for c_name, weight in augmentation.items():
+              # ds/dx = -grad (Min 目标) 或 +grad (Max 目标)
+              jac = jac - weight * self._slack(c_name, grads[c_name], 0.0)
+           return jac
         
         # 2. 定义严格约束 (Constraints for SLSQP)
-        # 格式: fun(x) >= 0
+        # 格式: fun(x) >= 0；jac 为解析梯度，不再让 SLSQP 做有限差分
         cons = []
 
         # [A] 物理硬约束 (严格恢复到 99.5%)
-        cons.append({'type':'ineq', 'fun': lambda x: self._get_all_metrics(x)['RD'] - 99.5})  #RD ≥ 99.5
-        cons.append({'type': 'ineq', 'fun': lambda x: self._get_all_metrics(x)['ED'] - 30.0})  #ED ≥ 30
-        cons.append({'type': 'ineq', 'fun': lambda x: 80.0 - self._get_all_metrics(x)['ED']})  #ED ≤ 80
+        cons.append({'type':'ineq', 'fun': lambda x: self._get_all_metrics(x)['RD'] - 99.5,
+                     'jac': lambda x: self._get_all_gradients(x)['RD']})   #RD ≥ 99.5
+        cons.append({'type': 'ineq', 'fun': lambda x: self._get_all_metrics(x)['ED'] - 30.0,
+                     'jac': lambda x: self._get_all_gradients(x)['ED']})   #ED ≥ 30
+        cons.append({'type': 'ineq', 'fun': lambda x: 80.0 - self._get_all_metrics(x)['ED'],
+                     'jac': lambda x: -self._get_all_gradients(x)['ED']})  #ED ≤ 80
 
         # [B] AUGMECON 动态约束
         for c_name, c_limit in constraint_map.items():
            if c_name in ['Cost', 'Carbon']:
               # limit - val >= 0 (即 val <= limit)
-              cons.append({'type': 'ineq', 'fun': lambda x, n=c_name, l=c_limit: l - self._get_all_metrics(x)[n]})
+              cons.append({'type': 'ineq', 'fun': lambda x, n=c_name, l=c_limit: l - self._get_all_metrics(x)[n],
+                           'jac': lambda x, n=c_name: -self._get_all_gradients(x)[n]})
            elif c_name == 'Efficiency':
               # val - limit >= 0 (即 val >= limit)
-              cons.append({'type': 'ineq', 'fun': lambda x, n=c_name, l=c_limit: self._get_all_metrics(x)[n] - l})
+              cons.append({'type': 'ineq', 'fun': lambda x, n=c_name, l=c_limit: self._get_all_metrics(x)[n] - l,
+                           'jac': lambda x, n=c_name: self._get_all_gradients(x)[n]})
 
         #运行 SLSQP (从 DE 的结果出发) 
+        t0 = time.perf_counter() if self.telemetry is not None else None
         slsqp_res = minimize(       #SLSQP 是局部算法，需要初值；DE 给了一个“已经在好区域”的点
            exact_objective,
-           x0=de_res.x,                # SLSQP 是 局部优化算法,它不能像 DE 那样全局乱试,它需要一个 起点        de_res 是 differential_evolution() 返回的“结果对象”   .x 是这个对象里已经帮你算好的“最优解变量”
-           bounds=self.bounds,         #bounds 保证不出物理范围
+           x0=x_start,                 # SLSQP 是 局部优化算法,它不能像 DE 那样全局乱试,它需要一个 起点        x_start 是 DE 的最优解 (或已严格可行的热启动点)
+           jac=exact_objective_jac,    # 解析梯度 (见 physics_model.performance_gradients)
+           bounds=bounds or self.bounds,   #bounds 保证不出物理范围 (presolve 后的盒子仍包含全部可行点)
            constraints=cons,           #constraints 强制满足硬约束（RD≥99.5, ED窗口, ε约束）
            method='SLSQP',
-           options={'ftol': 1e-4, 'disp': False}   #ftol 控制收敛精度
+           options=self.SLSQP_OPTIONS   #ftol 控制收敛精度
         )
+        if t0 is not None:
+            self.telemetry.on_phase('slsqp', seconds=time.perf_counter() - t0, iterations=int(slsqp_res.nit),
+                                    success=bool(slsqp_res.success))
+            if not slsqp_res.success:
+                self.telemetry.on_phase('fallback', reason='slsqp_failed')
 
         # ==========================================================
         # 3. 结果验证与打包
         # ==========================================================
 
-        # 优先使用精修后的解，如果精修失败，检查 DE 原解是否碰巧合格
-        # 逻辑就是：如果 SLSQP 精修成功：用 SLSQP 的解（更符合严格约束，成本更优）。 如果 SLSQP 精修失败：退回 DE 的解（有时 DE 本身“碰巧”已经满足 99.5）
-        final_x = slsqp_res.x if slsqp_res.success else de_res.x
+        # 优先使用精修后的解，如果精修失败，检查起点 (DE 解或热启动点) 是否碰巧合格
+        # 逻辑就是：如果 SLSQP 精修成功：用 SLSQP 的解（更符合严格约束，成本更优）。 如果 SLSQP 精修失败：退回起点（有时 DE 本身“碰巧”已经满足 99.5）
+        final_x = slsqp_res.x if slsqp_res.success else x_start
         final_metrics = self._get_all_metrics(final_x)   #用最终选定的 final_x 再跑一次物理模型，拿到 Cost/Carbon/RD/ED/Efficiency 等指标。
 
-        #最终严格检查 (Strict Feasibility Check)
-        is_feasible = True
-
-        # 检查物理约束
-        if final_metrics['RD'] < 99.45:
-           is_feasible = False   # 允许微小误差
-        if not (30.00 <= final_metrics['ED'] <= 80.0):
-           is_feasible = False
-
-        #检查 AUGMECON 约束
-        for c_name, c_limit in constraint_map.items():
-           val = final_metrics[c_name]                          #对每条约束做严格检查：Cost/Carbon（min 型）：必须 val <= limit     Efficiency（max 型）：必须 val >= limit
-           if c_name in ['Cost', 'Carbon']:
-              if val > c_limit + 0.05: is_feasible = False     # 容差            
-           elif c_name == 'Efficiency': 
-              if val < c_limit - 0.001: is_feasible = False
-
-        if is_feasible:
-            # 返回 Layer 2 需要的完整数据包
-            return {
-                'is_feasible': True,
-                'x': final_x,
-                'P_W': final_x[0],      # ✅ 显式保存 P
-                'V_mm_s': final_x[1],   # ✅ 显式保存 V
-                'H_um': final_x[2],     # ✅ 显式保存 H
-                **final_metrics  # 解包所有指标 (Cost, Carbon, etc.)
-            }
+        #最终严格检查 (Strict Feasibility Check)，允许微小误差
+        if self._is_feasible(final_metrics, constraint_map):
+            return self._package(final_x, final_metrics, constraint_map)
         else:
             return None
+
+    def _package(self, x, metrics, constraint_map):
+        """返回 Layer 2 需要的完整数据包"""
+        return {
+            'is_feasible': True,
+            'x': x,
+            'P_W': x[0],      # ✅ 显式保存 P
+            'V_mm_s': x[1],   # ✅ 显式保存 V
+            'H_um': x[2],     # ✅ 显式保存 H
+            **metrics,  # 解包所有指标 (Cost, Carbon, etc.)
+            # 各 epsilon 约束的松弛量 (截断到 >= 0，容差范围内的微小违反视为 0)
+            'slacks': {c_name: max(0.0, float(self._slack(c_name, metrics[c_name], c_limit)))
+                       for c_name, c_limit in constraint_map.items()}
+        }
   
 
 
@@ -0,0 +1,287 @@
+import numpy as np
+import physics_model   # 物理模型内核 (_evaluate / _evaluate_gradients 只用 + - * /，对区间同样成立)
+
+# ============================================================
+# 区间算术 (Interval Arithmetic) 与盒子上的指标界
+# ============================================================
+# 物理模型内核只由 + - * / 组成 (RD 为多项式，Cost/Carbon/ED 为 1/(V*H*LT) 的有理式)，
+# 因此把 P/V/H 换成 Interval 对象，同一份内核直接给出盒子 [lo, hi] 上各指标的包络 (enclosure)。
+# - 所有运算都向外舍入一个 ulp，包络对浮点误差也是严格的；
+# - 向量化：lo/hi 可以是数组，一次评估 N 个盒子；
+# - 单调性加强：先用区间梯度判断指标在某个变量上的单调方向，单调时该变量直接取对应端点再评估，
+#   削弱多项式中同一变量多次出现造成的高估 (依赖问题)；
+# - 中值形式：与自然扩展取交，盒子越小越紧 (二次收敛)，分支定界/预处理的子盒子上效果最明显。
+
+METRICS = ('Cost', 'Carbon', 'Efficiency', 'RD', 'ED')
+# 有变量重复出现 (存在依赖问题) 的指标：RD (多项式) 与 Cost (V 同时出现在时间成本和后处理成本中)。
+# Carbon / Efficiency / ED 中每个变量只出现一次，自然区间扩展已经是精确值域，不需要单调性加强。
+DEPENDENT = ('Cost', 'RD')
+
+# 与 HybridSolver 最终验收一致的约束与容差 (_is_feasible, strict=False)：
+# 只有在容差下也不可能满足的区域才会被剪掉，预处理不会误删任何可被接受的解。
+RD_MIN = 99.45
+ED_MIN, ED_MAX = 30.0, 80.0
+TOL_MIN = 0.05     # Cost / Carbon 的 epsilon 容差
+TOL_MAX = 0.001    # Efficiency 的 epsilon 容差
+
+def _down(x):
+    return np.nextafter(x, -np.inf)
+
+def _up(x):
+    return np.nextafter(x, np.inf)
+
+
+class Interval:
+    """
+    闭区间 [lo, hi] (lo/hi 为同形状的标量或数组)，支持 + - * / 与整数幂，
+    可以直接代入 physics_model 的内核与编译好的响应面。
+    """
+    __slots__ = ('lo', 'hi')
+    __array_ufunc__ = None   # ndarray 与 Interval 的运算交给 Interval 的反射方法处理
+
+    def __init__(self, lo, hi=None):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = self.lo if hi is None else np.asarray(hi, dtype=float)
+
+    @staticmethod
+    def _wrap(other):
+        return other if isinstance(other, Interval) else Interval(other)
+
+    def __repr__(self):
+        return f"Interval({self.lo!r}, {self.hi!r})"
+
+    @property
+    def mid(self):
+        return 0.5 * (self.lo + self.hi)
+
+    @property
+    def width(self):
+        return self.hi - self.lo
+
+    def __add__(self, other):
+        other = self._wrap(other)
+        return Interval(_down(self.lo + other.lo), _up(self.hi + other.hi))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Interval(-self.hi, -self.lo)
+
+    def __sub__(self, other):
+        other = self._wrap(other)
+        return Interval(_down(self.lo - other.hi), _up(self.hi - other.lo))
+
+    def __rsub__(self, other):
+        return self._wrap(other) - self
+
+    def __mul__(self, other):
+        other = self._wrap(other)
+        products = (self.lo * other.lo, self.lo * other.hi, self.hi * other.lo, self.hi * other.hi)
+        return Interval(_down(np.minimum.reduce(products)), _up(np.maximum.reduce(products)))
+
+    __rmul__ = __mul__
+
+    def reciprocal(self):
+        """1 / [lo, hi]；区间含 0 时返回 [-inf, inf]"""
+        with np.errstate(divide='ignore'):
+            lo, hi = _down(1.0 / self.hi), _up(1.0 / self.lo)
+        spans_zero = (self.lo <= 0) & (self.hi >= 0)
+        return Interval(np.where(spans_zero, -np.inf, lo), np.where(spans_zero, np.inf, hi))
+
+    def __truediv__(self, other):
+        return self * self._wrap(other).reciprocal()
+
+    def __rtruediv__(self, other):
+        return self._wrap(other) * self.reciprocal()
+
+    def __pow__(self, n):
+        if not isinstance(n, (int, np.integer)) or n < 0:
+            raise ValueError("Interval only supports non-negative integer powers")
+        a, b = self.lo ** n, self.hi ** n
+        if n % 2:
+            return Interval(_down(a), _up(b))
+        lo = np.where(self.lo >= 0, a, np.where(self.hi <= 0, b, 0.0))
+        return Interval(_down(lo), _up(np.maximum(a, b)))
+
+
+def _kernel(P, V, H, lt):
+    """区间版物理内核：{指标名: Interval}"""
+    Cost, Carbon, RD, ED, efficiency = physics_model._evaluate(
+        P, V, H, lt, physics_model._post_cost_base(lt))
+    return {'Cost': Cost, 'Carbon': Carbon, 'Efficiency': efficiency, 'RD': RD, 'ED': ED}
+
+def _split(lo, hi):
+    lo = np.asarray(lo, dtype=float)
+    hi = np.asarray(hi, dtype=float)
+    return [Interval(lo[..., j], hi[..., j]) for j in range(lo.shape[-1])]
+
+def _enclose(P, V, H, lt_val_um):
+    """
+    自然区间扩展与中值形式 (mean-value form) 取交：
+        f(X) ⊆ f(c) + Σ_j ∂f/∂x_j(X) * (X_j - c_j)，c 为盒子中心。
+    中值形式的高估随盒子宽度二次收敛，弥补多项式自然扩展的依赖问题 (RD 尤其明显)。
+    :return: ({指标名: Interval}, 区间梯度 {指标名: (d/dP, d/dV, d/dH)})
+    """
+    natural = _kernel(P, V, H, lt_val_um)
+    grads = physics_model._evaluate_gradients(P, V, H, lt_val_um, physics_model._post_cost_base(lt_val_um))
+    center = [Interval(var.mid) for var in (P, V, H)]
+    at_center = _kernel(*center, lt_val_um)
+    out = {}
+    for name, iv in natural.items():
+        mv = at_center[name]
+        for var, c, d in zip((P, V, H), center, grads[name]):
+            mv = mv + Interval._wrap(d) * (var - c)
+        out[name] = Interval(np.maximum(iv.lo, mv.lo), np.minimum(iv.hi, mv.hi))
+    return out, grads
+
+def metric_bounds(lo, hi, lt_val_um, monotone=True):
+    """
+    盒子上各指标的严格上下界。
+    :param lo, hi: (..., 3) 数组，盒子的 [P, V, H] 下/上界
+    :param monotone: True 时用区间梯度做单调性加强 (指标在某变量上单调时，该变量固定在对应端点再求界)
+    :return: {指标名: (下界数组, 上界数组)}
+    """
+    P, V, H = _split(lo, hi)
+    enclosure, grads = _enclose(P, V, H, lt_val_um)
+    if not monotone:
+        return {name: (iv.lo, iv.hi) for name, iv in enclosure.items()}
+
+    out = {}
+    for name in METRICS:
+        iv = enclosure[name]
+        if name not in DEPENDENT:
+            out[name] = (iv.lo, iv.hi)
+            continue
+        # 单调递增的变量：下界取 lo 端、上界取 hi 端；递减反之；符号不定则保留整个区间
+        low_box, high_box, reduced = [], [], False
+        for var, d in zip((P, V, H), grads[name]):
+            d = Interval._wrap(d)
+            inc, dec = d.lo >= 0, d.hi <= 0
+            reduced = reduced or bool(np.any(inc | dec))
+            low_box.append(Interval(np.where(inc, var.lo, np.where(dec, var.hi, var.lo)),
+                                    np.where(inc, var.lo, np.where(dec, var.hi, var.hi))))
+            high_box.append(Interval(np.where(inc, var.hi, np.where(dec, var.lo, var.lo)),
+                                     np.where(inc, var.hi, np.where(dec, var.lo, var.hi))))
+        if not reduced:
+            out[name] = (iv.lo, iv.hi)
+            continue
+        low = _enclose(*low_box, lt_val_um)[0][name]
+        high = _enclose(*high_box, lt_val_um)[0][name]
+        out[name] = (np.maximum(iv.lo, low.lo), np.minimum(iv.hi, high.hi))
+    return out
+
+def infeasible_mask(bounds, constraint_map, rd_min=RD_MIN, tol_min=TOL_MIN, tol_max=TOL_MAX):
+    """
+    由指标界判定哪些盒子 *必然* 不可行 (默认按最终验收的容差)。
+    :param bounds: metric_bounds 的返回值
+    :param constraint_map: epsilon 约束 {指标名: 限值}
+    :param rd_min, tol_min, tol_max: RD 下限与 Cost/Carbon、Efficiency 的 epsilon 容差
+    :return: 布尔数组 (True = 盒子内没有任何可接受的点)
+    """
+    mask = (bounds['RD'][1] < rd_min) | (bounds['ED'][1] < ED_MIN) | (bounds['ED'][0] > ED_MAX)
+    for c_name, c_limit in constraint_map.items():
+        if c_name in ('Cost', 'Carbon'):
+            mask = mask | (bounds[c_name][0] > c_limit + tol_min)
+        elif c_name == 'Efficiency':
+            mask = mask | (bounds[c_name][1] < c_limit - tol_max)
+    return mask
+
+def bisect(lo, hi, scale):
+    """把每个盒子沿 (按 scale 归一化后) 最宽的维度一分为二，返回 (2N, 3) 的 lo/hi"""
+    axis = np.argmax((hi - lo) / scale, axis=1)
+    rows = np.arange(len(lo))
+    mid = 0.5 * (lo[rows, axis] + hi[rows, axis])
+    left_hi, right_lo = hi.copy(), lo.copy()
+    left_hi[rows, axis] = mid
+    right_lo[rows, axis] = mid
+    return np.concatenate([lo, right_lo]), np.concatenate([left_hi, hi])
+
+def prove_infeasible(lo, hi, lt_val_um, constraint_map, scale, max_boxes=4096):
+    """
+    有预算的区间二分，尝试证明一组盒子内没有任何可接受点 (按最终验收的容差)。
+    每轮先检查盒子中心点：有中心点可接受即说明子问题可行，立即放弃证明；
+    剩余盒子连续二分 d 次 (每个盒子分成 2^d 个)，减少轮数 (每轮的开销主要是两次 metric_bounds)。
+    :param lo, hi: 起始盒子 (如 BoxPresolver.viable 的结果)，形状 (N, 3)
+    :param scale: 各维度的尺度，二分时按归一化后最宽的维度切
+    :param max_boxes: 二分生成的盒子总数上限，超过后放弃证明
+    :return: True = 证明不可行；False = 找到可接受点或预算耗尽 (不代表可行)
+    """
+    n_boxes = 0
+    while len(lo):
+        mid = 0.5 * (lo + hi)
+        if not infeasible_mask(metric_bounds(mid, mid, lt_val_um, monotone=False), constraint_map).all():
+            return False
+        keep = ~infeasible_mask(metric_bounds(lo, hi, lt_val_um), constraint_map)
+        lo, hi = lo[keep], hi[keep]
+        if not len(lo):
+            break
+        n_boxes += 2 ** lo.shape[1] * len(lo)
+        if n_boxes > max_boxes:
+            return False
+        for _ in range(lo.shape[1]):
+            lo, hi = bisect(lo, hi, scale)
+    return True
+
+def subdivide(bounds, splits):
+    """把盒子 bounds 每维均分 splits 段，返回 splits^3 个子盒子的 (下界, 上界)，形状 (splits^3, 3)"""
+    edges = [np.linspace(b[0], b[1], splits + 1) for b in bounds]
+    idx = np.indices([splits] * len(bounds)).reshape(len(bounds), -1).T
+    sub_lo = np.stack([edges[j][idx[:, j]] for j in range(len(bounds))], axis=1)
+    sub_hi = np.stack([edges[j][idx[:, j] + 1] for j in range(len(bounds))], axis=1)
+    return sub_lo, sub_hi
+
+
+class BoxPresolver:
+    """
+    预处理 (presolve)：把变量盒子收缩到可能含可行点的部分。
+    构造时 (每个层厚一次) 把盒子均分成 splits^3 个子盒子，求出各指标的界并缓存，
+    同时剔除在 RD / ED 窗口上就必然不可行的子盒子；
+    之后每个 epsilon 子问题只需把缓存的界和限值比较 (纯数组比较，亚毫秒级)，
+    剩余子盒子的包络就是收缩后的搜索盒子，没有剩余子盒子则证明该子问题不可行。
+    """
+
+    def __init__(self, bounds, lt_val_um, splits=16):
+        """
+        :param bounds: [(P_lo, P_hi), (V_lo, V_hi), (H_lo, H_hi)]
+        :param splits: 每维的分段数 (越大收缩越精确，构造越慢)
+        """
+        self.bounds = [tuple(map(float, b)) for b in bounds]
+        self.lt = lt_val_um
+        self.splits = splits
+        sub_lo, sub_hi = subdivide(self.bounds, splits)
+        mb = metric_bounds(sub_lo, sub_hi, lt_val_um)
+        keep = ~infeasible_mask(mb, {})
+        self.sub_lo, self.sub_hi = sub_lo[keep], sub_hi[keep]
+        self.sub_bounds = {name: (lo[keep], hi[keep]) for name, (lo, hi) in mb.items()}
+
+    def viable(self, constraint_map=None):
+        """
+        :param constraint_map: epsilon 约束 {指标名: 限值}，None/空 表示只用 RD 与 ED 窗口
+        :return: 可能含可接受点的子盒子 (下界, 上界)，形状 (M, 3)；M = 0 即证明子问题不可行
+        """
+        keep = ~infeasible_mask(self.sub_bounds, constraint_map or {})
+        return self.sub_lo[keep], self.sub_hi[keep]
+
+    def tighten(self, constraint_map=None):
+        """
+        :return: 可行子盒子的包络 bounds (同格式)；证明子问题不可行时返回 None
+        """
+        lo, hi = self.viable(constraint_map)
+        return hull(lo, hi)
+
+
+def hull(lo, hi):
+    """一组盒子的包络 [(lo, hi), ...]；空集返回 None"""
+    if not len(lo):
+        return None
+    return [(float(a), float(b)) for a, b in zip(lo.min(axis=0), hi.max(axis=0))]
+
+def sample_boxes(lo, hi, n, seed=None):
+    """
+    在一组等体积盒子的并集内分层采样 n 个点：拉丁超立方多取一维用来分配盒子，
+    其余维度给出盒内位置 (盒子被选中的次数与点在盒内的位置都是分层的)。
+    """
+    from scipy.stats import qmc
+    u = qmc.LatinHypercube(d=lo.shape[1] + 1, seed=seed).random(n)
+    idx = np.minimum((u[:, 0] * len(lo)).astype(int), len(lo) - 1)
+    return lo[idx] + u[:, 1:] * (hi[idx] - lo[idx])
@@ -0,0 +1,234 @@
+import time
+import numpy as np
+from hybrid_solver import HybridSolver     # 复用指标缓存、SLSQP 精修、结果打包与 presolve
+from interval_model import metric_bounds, infeasible_mask, bisect
+
+class IntervalBBSolver(HybridSolver):
+    """
+    Layer 3 的确定性后端：区间分支定界 (Interval Branch-and-Bound)。
+
+    求解 min f(P, V, H) s.t. RD >= 99.5, 30 <= ED <= 80, epsilon 约束，
+    f 为主目标 (Efficiency 取负) 减去 AUGMECON 增广松弛项，与 HybridSolver 的 SLSQP 目标一致。
+    - 下界：interval_model 在盒子上的严格指标界 (整批盒子向量化评估)；
+    - 上界 (incumbent)：盒子中心点 + 热启动点的逐点评估，再用 SLSQP 从当前最好的点/盒子精修；
+    - 剪枝：必然不可行的盒子、下界不优于 incumbent - 容差的盒子；
+    - 分支：每轮取下界最小的 batch 个盒子沿最宽维二分。
+    返回的解附带 'gap' (incumbent 与全局下界之差) 与 'certified'：gap <= max(abs_gap, rel_gap * |f|)
+    时为 True (证明的最优解)；触达 max_boxes / time_limit 而提前停止时为 False，此时只是当前最好的可行点。
+    返回 None 时看 last_stats['certified']：True = 证明不可行，False = 预算内没找到可行点 (未证明)。
+    可行性容差 feas_tol：incumbent 与剪枝使用同一组放宽 feas_tol 的约束，gap 对这个问题严格成立。
+    接口与 HybridSolver.solve 相同，可直接作为 AugmeconRGamsStyle 的 solver_handler。
+
+    速度 (单核实测)：每个子问题约 0.2–1.5 s，触达 max_boxes 的子问题约 3–6 s；
+    端到端约为 HybridSolver (H-DE) 的 4–6 倍 (3 个层厚、grid_points=2：约 14–21 s 对 3.5 s)。
+    代价换来的是可证明的最优性 gap，适合做基准/校验，不适合替代 H-DE 跑密网格。
+    """
+
+    def __init__(self, lt_val, abs_gap=1e-5, rel_gap=1e-4, feas_tol=1e-6, batch=512, max_boxes=50000,
+                 time_limit=None, cache_size=4096, solve_cache=None, telemetry=None, presolve=True):
+        """
+        :param abs_gap, rel_gap: 终止容差 (绝对 / 相对于 |f|)，满足其一即认为已证明最优
+        :param feas_tol: 约束的可行性容差 (RD、epsilon 约束)
+        :param batch: 每轮二分的盒子数 (向量化批量)
+        :param max_boxes: 生成盒子总数上限，超过后返回当前 incumbent (gap 未达到容差)
+        :param time_limit: 单个子问题的时间上限 (秒)，None = 不限
+        :param presolve: True 时从 BoxPresolver 的可行子盒子出发，而不是整个变量盒子
+        """
+        super().__init__(lt_val, vectorized=True, cache_size=cache_size, solve_cache=solve_cache,
+                         telemetry=telemetry, presolve=presolve)
+        self.abs_gap = abs_gap
+        self.rel_gap = rel_gap
+        self.feas_tol = feas_tol
+        self.batch = batch
+        self.max_boxes = max_boxes
+        self.time_limit = time_limit
+        self.last_stats = {}   # 最近一次求解的 {'boxes', 'gap', 'certified', 'seconds', 'cached'}
+
+    def settings(self):
+        return {
+            'backend': 'interval_bnb',
+            'bounds': self.bounds,
+            'presolve': self.presolve,
+            'bnb': {'abs_gap': self.abs_gap, 'rel_gap': self.rel_gap, 'feas_tol': self.feas_tol,
+                    'max_boxes': self.max_boxes, 'time_limit': self.time_limit},
+            'slsqp': self.SLSQP_OPTIONS,
+        }
+
+    def solve(self, primary_obj_name, constraint_map, seed=42, augmentation=None, warm_starts=None):
+        """
+        同 HybridSolver.solve；命中持久化缓存时 last_stats 由缓存结果重建 (不会沿用上一次求解的统计)。
+        """
+        self.last_stats = {}
+        result = super().solve(primary_obj_name, constraint_map, seed, augmentation, warm_starts)
+        if not self.last_stats:
+            # 缓存命中：没有运行分支定界；不可行结果的证明状态没有缓存，记为 None (未知)
+            self.last_stats = {'boxes': 0, 'seconds': 0.0, 'cached': True,
+                               'gap': result.get('gap') if result is not None else None,
+                               'certified': result.get('certified') if result is not None else None}
+        return result
+
+    # ------------------------------------------------------------
+    # 目标与界
+    # ------------------------------------------------------------
+    def _objective(self, metrics, primary_obj_name, augmentation, constraint_map):
+        """逐点目标 (对标量和数组都成立)：sign * 主目标 - Σ w_k * s_k"""
+        sign = -1.0 if primary_obj_name == 'Efficiency' else 1.0
+        val = sign * metrics[primary_obj_name]
+        for c_name, weight in augmentation.items():
+            val = val - weight * self._slack(c_name, metrics[c_name], constraint_map[c_name])
+        return val
+
+    def _box_lower_bounds(self, lo, hi, primary_obj_name, augmentation, constraint_map):
+        """盒子上目标的严格下界；必然不可行的盒子为 inf"""
+        mb = metric_bounds(lo, hi, self.lt)
+        if primary_obj_name == 'Efficiency':
+            lb = -mb['Efficiency'][1]
+        else:
+            lb = mb[primary_obj_name][0].copy()
+        for c_name, weight in augmentation.items():
+            c_lo, c_hi = mb[c_name]
+            # 松弛量的上界：Min 目标 limit - 下界，Max 目标 上界 - limit
+            lb = lb - weight * self._slack(c_name, c_hi if c_name == 'Efficiency' else c_lo,
+                                           constraint_map[c_name])
+        tol = self.feas_tol
+        infeasible = infeasible_mask(mb, constraint_map, rd_min=99.5 - tol, tol_min=tol, tol_max=tol)
+        return np.where(infeasible, np.inf, lb)
+
+    def _feasible_batch(self, metrics, constraint_map):
+        """逐点可行性 (放宽 feas_tol)，与 _box_lower_bounds 的剪枝条件一致"""
+        tol = self.feas_tol
+        ok = (metrics['RD'] >= 99.5 - tol) & (metrics['ED'] >= 30.0) & (metrics['ED'] <= 80.0)
+        for c_name, c_limit in constraint_map.items():
+            if c_name in ['Cost', 'Carbon']:
+                ok &= metrics[c_name] <= c_limit + tol
+            elif c_name == 'Efficiency':
+                ok &= metrics[c_name] >= c_limit - tol
+        return ok
+
+    # ------------------------------------------------------------
+    # 分支定界主循环
+    # ------------------------------------------------------------
+    def _solve(self, primary_obj_name, constraint_map, seed, augmentation, warm_starts):
+        """
+        分支定界求解 (seed 不影响结果，仅为与 HybridSolver 接口一致)。
+        :return: 结果字典 (含 'gap') 或 None (证明不可行，或预算内没有找到可行点)
+        """
+        augmentation = augmentation or {}
+        t_start = time.perf_counter()
+
+        # 初始盒子：presolve 的可行子盒子 (或整个变量盒子)
+        bounds, boxes = self.search_region(constraint_map)
+        if self.telemetry is not None:
+            self.telemetry.on_phase('presolve', seconds=time.perf_counter() - t_start, infeasible=bounds is None)
+        if bounds is None:
+            self.last_stats = {'boxes': 0, 'gap': None, 'certified': True, 'seconds': time.perf_counter() - t_start,
+                               'cached': False}
+            return None
+        if boxes is None:
+            lo = np.array([[b[0] for b in bounds]], dtype=float)
+            hi = np.array([[b[1] for b in bounds]], dtype=float)
+        else:
+            lo, hi = boxes
+        scale = np.array([b[1] - b[0] for b in self.bounds], dtype=float)
+
+        def box_bounds(lo, hi):
+            return self._box_lower_bounds(lo, hi, primary_obj_name, augmentation, constraint_map)
+
+        best = {'x': None, 'f': np.inf}
+
+        def offer(X):
+            """逐点评估候选点，更新 incumbent；返回是否有改进"""
+            if not len(X):
+                return False
+            metrics = self._get_all_metrics_batch(X)
+            f = np.where(self._feasible_batch(metrics, constraint_map),
+                         self._objective(metrics, primary_obj_name, augmentation, constraint_map), np.inf)
+            k = int(np.argmin(f))
+            if f[k] < best['f']:
+                best['x'], best['f'] = np.array(X[k], dtype=float), float(f[k])
+                return True
+            return False
+
+        def polish(x0):
+            """SLSQP 精修 (HybridSolver._refine)；结果满足放宽约束时作为候选"""
+            res = self._refine(np.asarray(x0, dtype=float), primary_obj_name, constraint_map, augmentation,
+                               self.bounds)
+            return offer(np.asarray([res['x']], dtype=float)) if res is not None else False
+
+        if warm_starts is not None and len(warm_starts):
+            warm = np.clip(np.asarray(warm_starts, dtype=float).reshape(-1, 3),
+                           [b[0] for b in self.bounds], [b[1] for b in self.bounds])
+            offer(warm)
+
+        lb = box_bounds(lo, hi)
+        live = np.isfinite(lb)
+        lo, hi, lb = lo[live], hi[live], lb[live]
+        n_boxes = len(live)
+        pruned_lb = np.inf    # 因界被剪掉的盒子中最小的下界 (用于计算最终 gap)
+        polished = set()
+
+        while len(lo):
+            # 上界：盒子中心点；incumbent 有改进或下界最小的盒子尚未精修过时做一次 SLSQP
+            improved = offer(0.5 * (lo + hi))
+            k = int(np.argmin(lb))
+            key = (tuple(lo[k]), tuple(hi[k]))
+            if key not in polished:
+                polished.add(key)
+                improved = polish(0.5 * (lo[k] + hi[k])) or improved
+            if improved and best['x'] is not None:
+                polish(best['x'])
+
+            # 剪枝：下界不优于 incumbent - 容差的盒子
+            tol = max(self.abs_gap, self.rel_gap * abs(best['f'])) if best['x'] is not None else 0.0
+            keep = lb < best['f'] - tol
+            if not keep.all():
+                pruned_lb = min(pruned_lb, float(lb[~keep].min()))
+                lo, hi, lb = lo[keep], hi[keep], lb[keep]
+            if not len(lo):
+                break
+            if best['x'] is not None and best['f'] - lb.min() <= tol:
+                break
+            if n_boxes >= self.max_boxes or (self.time_limit is not None
+                                             and time.perf_counter() - t_start > self.time_limit):
+                break
+
+            # 分支：下界最小的 batch 个盒子二分
+            if len(lo) > self.batch:
+                sel = np.argpartition(lb, self.batch)[:self.batch]
+                rest = np.ones(len(lo), dtype=bool)
+                rest[sel] = False
+            else:
+                sel, rest = np.arange(len(lo)), np.zeros(len(lo), dtype=bool)
+            c_lo, c_hi = bisect(lo[sel], hi[sel], scale)
+            c_lb = box_bounds(c_lo, c_hi)
+            n_boxes += len(c_lo)
+            live = np.isfinite(c_lb)
+            lo = np.concatenate([lo[rest], c_lo[live]])
+            hi = np.concatenate([hi[rest], c_hi[live]])
+            lb = np.concatenate([lb[rest], c_lb[live]])
+
+        # 全局下界 = 剩余盒子与被剪枝盒子下界的最小值
+        global_lb = min(float(lb.min()) if len(lb) else np.inf, pruned_lb)
+        seconds = time.perf_counter() - t_start
+        if best['x'] is None:
+            # 没有剩余盒子且从未找到可行点 => 证明不可行；否则是预算耗尽
+            self.last_stats = {'boxes': n_boxes, 'gap': None, 'certified': not len(lo), 'seconds': seconds,
+                               'cached': False}
+            if len(lo):
+                print(f"  ⚠️ [IntervalBB] 盒子/时间预算耗尽 ({n_boxes} boxes) 仍未找到可行点：按不可行处理，但未经证明")
+            if self.telemetry is not None:
+                self.telemetry.on_phase('bnb', seconds=seconds, boxes=n_boxes, gap=None, certified=not len(lo))
+            return None
+
+        gap = max(0.0, best['f'] - min(global_lb, best['f']))
+        tol = max(self.abs_gap, self.rel_gap * abs(best['f']))
+        certified = bool(gap <= tol)
+        self.last_stats = {'boxes': n_boxes, 'gap': gap, 'certified': certified, 'seconds': seconds, 'cached': False}
+        if self.telemetry is not None:
+            self.telemetry.on_phase('bnb', seconds=seconds, boxes=n_boxes, gap=gap, certified=certified)
+
+        x = best['x']
+        result = self._package(x, self._get_all_metrics(x), constraint_map)
+        result['gap'] = gap
+        result['certified'] = certified
+        return result
@@ -1,12 +1,20 @@
 import pandas as pd
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 # ============================================================
 # 导入我们刚刚构建的 Layer 2 和 Layer 3
 # ============================================================
 from augmecon_r import AugmeconRGamsStyle  # Layer 2: 总指挥
 from hybrid_solver import HybridSolver     # Layer 3: 特种部队 (H-DE 实现)
+from interval_solver import IntervalBBSolver  # Layer 3 备选: 区间分支定界 (带最优性证明)
+from solve_cache import SolveCache         # 持久化求解缓存 (SQLite)
 import post_process                        # Layer 4: 后处理 (画图/排序)
+from pareto_metrics import front_quality   # 前沿质量指标 (超体积/IGD/间距/分布度)
+from result_io import save_results         # 列式结果文件 (Parquet / .npz)
+from result_stream import consume, SolutionWriter, LiveFront, ProgressReporter  # 流式消费者
+from telemetry import TraceRecorder        # 求解阶段遥测 (JSONL 轨迹 + 汇总)
 
 # ============================================================
 # 配置区域
@@ -23,55 +31,187 @@ OBJECTIVE_CONFIG = {
 # 网格密度 (决定帕累托前沿的精细度)
 GRID_POINTS = 10
 
-def run_pipeline():
+# DE 阶段整代种群批量评估 (见 HybridSolver 的 vectorized 模式)
+VECTORIZED_DE = True
+
+# Layer 3 求解后端:
+#   'hybrid'       : H-DE + SLSQP (启发式，快)
+#   'interval_bnb' : 区间分支定界 (确定性，每个子问题给出带 gap 的最优性证明，不需要商业求解器)
+SOLVER_BACKEND = 'hybrid'
+
+# AUGMECON-R 旁路跳跃/提前退出 (跳过冗余网格点)。
+# 网格级并行与它兼容：遍历仍按串行顺序决定跳跃，进程池提前求解后面的网格点 (见 AugmeconRGamsStyle._grid_loop)。
+AUGMECON_BYPASS = True
+
+# 自适应网格细化：先按 GRID_POINTS 粗扫，再只在前沿拐弯/稀疏处插入 epsilon 值
+# SOLVE_BUDGET 为网格+细化阶段的求解总次数上限 (None = 粗扫次数的 1.5 倍)
+ADAPTIVE_GRID = False
+SOLVE_BUDGET = None
+
+# 帕累托存档的 ε-支配容差 {目标名: 容差 (原始单位)}：相差不到容差的解视为重复，只保留一个
+# None = 精确非支配过滤 (仍会去掉完全重复的解)
+ARCHIVE_EPS = None
+
+# 持久化求解缓存：重复运行时已求过的子问题直接读取 (None = 关闭)
+# 修改 config.py / REG_COEFFS / 求解器参数后缓存自动失效
+SOLVE_CACHE_PATH = "solve_cache.sqlite"
+
+# 断点目录：每个层厚一个断点文件，配合 --resume 在中断后继续 (None = 不保存断点)
+CHECKPOINT_DIR = "checkpoints"
+
+# 结果文件：主格式为列式文件 (有 pyarrow 用 Parquet，否则 .npz)，供 post_process 直接读取
+# EXPORT_EXCEL = True 时额外导出一份 .xlsx 供人工查看
+RESULTS_FILE = "raw_pareto_results"
+EXPORT_EXCEL = False
+
+# 流式输出目录：每个层厚一个分块目录，求解过程中可行解随时落盘 (None = 不写)
+# 稠密网格下控制器不在内存中保留全部解 (自适应细化需要完整历史时除外)
+STREAM_DIR = "results/stream"
+
+# 遥测目录：每个层厚一个 JSONL 轨迹 (每个网格点的 DE/SLSQP 耗时、评估数、回退、可行性、峰值内存)，
+# 层厚结束时打印 PyAugmecon 风格的汇总 (None = 关闭，求解路径上没有额外开销)
+TELEMETRY_DIR = "results/telemetry"
+
+# 待优化的工艺层厚 (um)
+LT_LEVELS = [80, 100, 120]
+
+# 跨层厚热启动：上一层厚同一网格坐标的解作为下一层厚的初值。
+# 需要按顺序逐个求解层厚，因此开启时不做层厚级并行 (核心全部留给网格级)；
+# 关闭时层厚并行求解，各层厚互相独立。只有一个层厚进程 (如单核) 时总是顺带热启动。
+CROSS_LT_WARM_START = False
+
+# 并行核心预算：层厚级与网格级共享同一预算 (1 = 完全串行)
+# 例如 18 核: 3 个层厚进程 x 每个 6 个网格 worker
+# 网格级并行时只用上一层厚的解热启动 (不用相邻网格点)，前沿与串行运行可能略有差异
+N_WORKERS = os.cpu_count() or 1
+
+def split_core_budget(n_workers, n_layers, chain_layers=CROSS_LT_WARM_START):
+    """
+    把总核心数拆成 (层厚级并行数, 每个层厚的网格级并行数)
+    :param chain_layers: 是否跨层厚热启动 (启用时层厚按顺序求解，不做层厚级并行)
+    """
+    lt_workers = 1 if chain_layers else max(1, min(n_layers, n_workers))
+    grid_workers = max(1, n_workers // lt_workers)
+    return lt_workers, grid_workers
+
+def solve_layer(lt, grid_workers=1, warm_start_from=None, resume=False):
+    """
+    求解单个层厚的帕累托前沿 (Step 1-3)。
+    作为顶层函数定义，以便层厚级进程池直接调用。
+
+    :param warm_start_from: 上一层厚的 {网格坐标: x}，作为同位置网格点的热启动
+    :param resume: True 时从该层厚的断点继续 (已完成的层厚直接读取结果)
+    :return: (整理好列顺序的 DataFrame, 本层厚的 {网格坐标: x})
+    """
+    print(f"\n\n>>> 正在处理层厚: {lt} um ...")
+
+    # ---------------------------------------------------------
+    # Step 1: 组建特种部队 (Layer 3)
+    # ---------------------------------------------------------
+    # 实例化混合求解器，注入当前层厚参数
+    solve_cache = SolveCache(SOLVE_CACHE_PATH) if SOLVE_CACHE_PATH else None
+    telemetry = TraceRecorder(os.path.join(TELEMETRY_DIR, f"trace_LT{lt}.jsonl"), label=f"LT{lt}") \
+        if TELEMETRY_DIR else None
+    if SOLVER_BACKEND == 'interval_bnb':
+        solver = IntervalBBSolver(lt_val = lt, solve_cache = solve_cache, telemetry = telemetry)
+    else:
+        solver = HybridSolver(lt_val = lt, vectorized = VECTORIZED_DE, solve_cache = solve_cache, telemetry = telemetry)
+
+    # ---------------------------------------------------------
+    # Step 2: 派遣总指挥 (Layer 2)
+    # ---------------------------------------------------------
+    # 实例化 GAMS 风格控制器，注入求解器和目标配置
+    controller = AugmeconRGamsStyle(
+        solver_handler = solver,
+        objective_config = OBJECTIVE_CONFIG,
+        grid_points = GRID_POINTS,
+        n_workers = grid_workers,
+        bypass = AUGMECON_BYPASS,
+        warm_start_from = warm_start_from,
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"augmecon_lt{lt}.pkl") if CHECKPOINT_DIR else None,
+        resume = resume,
+        adaptive = ADAPTIVE_GRID,
+        solve_budget = SOLVE_BUDGET,
+        track_quality = True,
+        archive_eps = ARCHIVE_EPS,
+        topsis_weights = post_process.TOPSIS_WEIGHTS,  # 实时显示当前最佳折衷解
+        keep_history = STREAM_DIR is None,  # 流式落盘时只在内存中保留前沿 (跨层厚热启动也只剩最后两片网格)
+        telemetry = telemetry
+    )
+
+    # ---------------------------------------------------------
+    # Step 3: 执行任务 (Run)
+    # ---------------------------------------------------------
+    # 这一步会自动执行 Payoff Table 计算 -> 网格生成 -> 循环求解
+    # 流式模式：每个网格点一求解完就写盘、更新实时前沿、打印进度
+    live_front = LiveFront(OBJECTIVE_CONFIG, eps=ARCHIVE_EPS)
+    consumers = [live_front, ProgressReporter(front=live_front)]
+    if STREAM_DIR:
+        consumers.append(SolutionWriter(os.path.join(STREAM_DIR, f"LT{lt}")))
+    consume(controller.stream(), *consumers)
+    df_res = controller.front()
+    if telemetry is not None:
+        telemetry.report()
+        telemetry.close()
+
+    if not df_res.empty:
+        # 标记当前层厚
+        df_res['LT_um'] = lt #因为 solver 层厚是固定的，但 controller.run() 的结果里不一定带 LT。
+
+        # 整理列顺序 (让 Excel 好看一点)
+        cols_order = ['LT_um', 'P_W', 'V_mm_s', 'H_um', 
+                      'Cost', 'Carbon', 'Efficiency', 
+                      'RD', 'ED', 'is_feasible', 'TOPSIS_Score']
+        
+        # 只保留存在的列
+        cols_to_keep = [c for c in cols_order if c in df_res.columns]  # c 只是程序员随便起的一个变量名，本身没有任何特殊含义。在这里代表column
+        df_res = df_res[cols_to_keep]
+
+    stats = solver.cache_stats()
+    print(f"   -> 指标缓存命中率: {stats['hit_rate']:.1%} ({stats['hits']}/{stats['hits'] + stats['misses']})")
+    stats = solver.cache_stats('gradients')
+    print(f"   -> 梯度缓存命中率: {stats['hit_rate']:.1%} ({stats['hits']}/{stats['hits'] + stats['misses']})")
+    if solve_cache is not None:
+        stats = solve_cache.stats()
+        print(f"   -> 求解缓存命中率: {stats['hit_rate']:.1%} ({stats['hits']}/{stats['hits'] + stats['misses']})")
+    return df_res, controller.cell_solutions
+
+def run_pipeline(resume=False):
     print(f"{'='*60}")
     print(f"🚀 启动 H-DE-AUGMECON-R 优化流程")
     print(f"🎯 优化目标: {list(OBJECTIVE_CONFIG.keys())}")
     print(f"⚙️  网格密度: {GRID_POINTS}")
+    if resume:
+        print(f"♻️  断点续算模式: 从 {CHECKPOINT_DIR}/ 继续")
     print(f"{'='*60}")
 
     all_layer_results = []
 
-    # 遍历不同的工艺层厚
-    for lt in [80, 100, 120]:
-        print(f"\n\n>>> 正在处理层厚: {lt} um ...")
-
-        # ---------------------------------------------------------
-        # Step 1: 组建特种部队 (Layer 3)
-        # ---------------------------------------------------------
-        # 实例化混合求解器，注入当前层厚参数
-        solver = HybridSolver(lt_val = lt)
-
-        # ---------------------------------------------------------
-        # Step 2: 派遣总指挥 (Layer 2)
-        # ---------------------------------------------------------
-        # 实例化 GAMS 风格控制器，注入求解器和目标配置
-        controller = AugmeconRGamsStyle(
-            solver_handler = solver,
-            objective_config = OBJECTIVE_CONFIG,
-            grid_points = GRID_POINTS
-        )
-
-        # ---------------------------------------------------------
-        # Step 3: 执行任务 (Run)
-        # ---------------------------------------------------------
-        try:
-            # 这一步会自动执行 Payoff Table 计算 -> 网格生成 -> 循环求解
-            df_res = controller.run()
+    # 层厚级并行：各层厚互相独立，分到不同进程；剩余核心留给每个层厚内部的网格级并行
+    lt_workers, grid_workers = split_core_budget(N_WORKERS, len(LT_LEVELS))
+    print(f"🧵 并行预算: {N_WORKERS} 核 -> {lt_workers} 个层厚进程 x {grid_workers} 个网格 worker")
+    if CROSS_LT_WARM_START or lt_workers == 1:
+        print(f"🔗 跨层厚热启动: 开启 (层厚按顺序求解)")
+    else:
+        print(f"🔗 跨层厚热启动: 关闭 (层厚并行求解，互相独立)")
 
-            if not df_res.empty:
-                # 标记当前层厚
-                df_res['LT_um'] = lt #因为 solver 层厚是固定的，但 controller.run() 的结果里不一定带 LT。
+    if lt_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=lt_workers)
+        futures = {lt: pool.submit(solve_layer, lt, grid_workers, None, resume) for lt in LT_LEVELS}
+    else:
+        pool, futures = None, {}
 
-                # 整理列顺序 (让 Excel 好看一点)
-                cols_order = ['LT_um', 'P_W', 'V_mm_s', 'H_um', 
-                              'Cost', 'Carbon', 'Efficiency', 
-                              'RD', 'ED', 'is_feasible']
-                
-                # 只保留存在的列
-                cols_to_keep = [c for c in cols_order if c in df_res.columns]  # c 只是程序员随便起的一个变量名，本身没有任何特殊含义。在这里代表column
-                df_res = df_res[cols_to_keep]
+    # 遍历不同的工艺层厚 (按固定顺序汇总，保证与串行运行输出一致)
+    # 顺序求解时上一层厚的解作为下一层厚的热启动；层厚级并行时各层厚互相独立 (不热启动)
+    prev_cell_solutions = None
+    for lt in LT_LEVELS:
+        try:
+            if pool:
+                df_res, _ = futures[lt].result()
+            else:
+                df_res, prev_cell_solutions = solve_layer(lt, grid_workers, prev_cell_solutions, resume)
 
+            if not df_res.empty:
                 all_layer_results.append(df_res)                                # append() 函数用于向列表的末尾添加新元素
                 print(f"✅ 层厚 {lt} um 完成，找到 {len(df_res)} 个帕累托解。")
             else:
@@ -82,6 +222,9 @@ def run_pipeline():
             import traceback
             traceback.print_exc()
 
+    if pool:
+        pool.shutdown()
+
     # ---------------------------------------------------------
     # Step 4: 汇总与后处理 (Layer 4)
     # ---------------------------------------------------------
@@ -93,8 +236,7 @@ def run_pipeline():
         final_df = pd.concat(all_layer_results, ignore_index=True)    #pd.concat(...) 把列表里的所有 DataFrame，像“竖着叠表格”一样拼成一个大表   ignore_index=True ：自动重新编号 index
 
         # 保存原始数据
-        output_file = "raw_pareto_results.xlsx"
-        final_df.to_excel(output_file, index=False)    #把这个大表 final_df 保存成一个 Excel 文件。 index=False：将index删掉，没用
+        output_file = save_results(final_df, RESULTS_FILE, excel=EXPORT_EXCEL)
         print(f"📄 结果已保存至: {os.path.abspath(output_file)}")
 
 
@@ -105,11 +247,18 @@ def run_pipeline():
         print("\n📊 统计信息:")
 
         print(final_df.groupby('LT_um')[['Cost', 'Carbon']].describe())
+
+        # 前沿质量 (所有层厚共用同一归一化与参考点，数值可直接横向比较)
+        print("\n📐 前沿质量指标:")
+        print(front_quality(final_df, OBJECTIVE_CONFIG).to_string(index=False))
     else:
         print("\n❌ 整个流程未找到任何有效解，请检查约束条件或物理模型。")
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="H-DE-AUGMECON-R 优化流程")
+    parser.add_argument('--resume', action='store_true', help="从 checkpoints/ 中的断点继续上次中断的运行")
+    args = parser.parse_args()
+    run_pipeline(resume=args.resume)
 
 
 
@@ -0,0 +1,282 @@
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import tempfile
+import importlib
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 热点内核微基准 (Micro-Benchmarks for Hot Kernels)
+# ============================================================
+# 每个内核在 10 ~ 10^7 个点的规模上扫描，报告：
+#   ns/point      : 最佳重复的单点耗时 (timeit，自动选择循环次数)
+#   peak_bytes    : 单次调用期间 tracemalloc 记录的峰值新增分配 (numpy 数组也会计入)
+#   retained_bytes: 调用结束后仍未释放的分配 (内核自身保存的结果，如 Topsis 实例状态，也计入)
+# 估计耗时或内存超出预算的规模自动跳过。
+#
+# 用法:
+#   python microbench.py                                  # 当前工作区
+#   python microbench.py --kernels predict_performance_batch --max-n 10000000
+#   python microbench.py --compare HEAD~3 WORKTREE        # 两个 git 版本对比 (WORKTREE = 未提交的工作区)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+
+SIZES = [10 ** k for k in range(1, 8)]
+BOUNDS = [(385, 460), (700, 1150), (90, 115)]
+LT = 100
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lo = np.array([b[0] for b in BOUNDS], dtype=float)
+    hi = np.array([b[1] for b in BOUNDS], dtype=float)
+    return lo + rng.random((n, 3)) * (hi - lo)
+
+# ============================================================
+# 内核定义：setup(n) 准备输入 (不计时)，返回处理 n 个点的无参函数
+# ============================================================
+def _predict_performance(n):
+    physics_model = importlib.import_module('physics_model')
+    X = _points(n)
+    def run():
+        for x in X:
+            physics_model.predict_performance(x, LT)
+    return run
+
+def _predict_performance_batch(n):
+    physics_model = importlib.import_module('physics_model')
+    X = _points(n)
+    return lambda: physics_model.predict_performance_batch(X, LT)
+
+def _get_all_metrics(n):
+    solver = importlib.import_module('hybrid_solver').HybridSolver(LT, cache_size=0)  # 关闭缓存，只测内核
+    X = _points(n)
+    def run():
+        for x in X:
+            solver._get_all_metrics(x)
+    return run
+
+def _capture_objectives():
+    """
+    relaxed_objective 是 HybridSolver._solve 内部的闭包：把 _run_de 临时换成“只记录参数”的函数，
+    走一遍 _solve 即可拿到与真实求解完全相同的逐点/批量罚函数。
+    """
+    solver = importlib.import_module('hybrid_solver').HybridSolver(LT, cache_size=0)
+    center = [np.mean(b) for b in BOUNDS]
+    metrics = solver._get_all_metrics(center)
+    constraints = {'Carbon': metrics['Carbon'], 'Efficiency': metrics['Efficiency']}
+    augmentation = {'Carbon': 1e-3, 'Efficiency': 1e-3}
+    captured = {}
+    def record(objective, objective_batch, *args, **kwargs):
+        captured['scalar'], captured['batch'] = objective, objective_batch
+        return None
+    solver._run_de = record
+    solver._solve('Cost', constraints, 0, augmentation, None)
+    return captured['scalar'], captured['batch']
+
+def _relaxed_objective(n):
+    objective, _ = _capture_objectives()
+    X = _points(n)
+    def run():
+        for x in X:
+            objective(x)
+    return run
+
+def _relaxed_objective_batch(n):
+    _, objective_batch = _capture_objectives()
+    XT = np.ascontiguousarray(_points(n).T)   # scipy 向量化 DE 传入的形状为 (3, S)
+    return lambda: objective_batch(XT)
+
+def _rd_frame(n):
+    X = _points(n)
+    return pd.DataFrame({'P_W': X[:, 0], 'V_mm_s': X[:, 1], 'H_um': X[:, 2], 'LT_um': float(LT)})
+
+def _calculate_rd_apply(n):
+    post_process = importlib.import_module('post_process')
+    df = _rd_frame(n)
+    return lambda: df.apply(post_process.calculate_rd_manual, axis=1)
+
+def _predict_rd(n):
+    post_process = importlib.import_module('post_process')
+    df = _rd_frame(n)
+    return lambda: post_process.predict_rd(df)
+
+def _topsis_steps(n):
+    Topsis = importlib.import_module('topsis').Topsis
+    rng = np.random.default_rng(0)
+    t = Topsis(1.0 + rng.random((n, 3)), [0.4, 0.2, 0.4], [0, 0, 1])
+    def run():
+        t.step_2()
+        t.step_3()
+        t.step_4()
+        t.step_5()
+        t.step_6()
+    return run
+
+# 名称 -> (setup, 缺省最大规模)；逐点 Python 循环的内核默认只扫到 10^5
+KERNELS = {
+    'predict_performance':       (_predict_performance, 10 ** 5),
+    'predict_performance_batch': (_predict_performance_batch, 10 ** 7),
+    'get_all_metrics':           (_get_all_metrics, 10 ** 5),
+    'relaxed_objective':         (_relaxed_objective, 10 ** 5),
+    'relaxed_objective_batch':   (_relaxed_objective_batch, 10 ** 7),
+    'calculate_rd_apply':        (_calculate_rd_apply, 10 ** 5),
+    'predict_rd':                (_predict_rd, 10 ** 7),
+    'topsis_steps':              (_topsis_steps, 10 ** 7),
+}
+
+# ============================================================
+# 测量
+# ============================================================
+def time_call(fn, min_time=0.2, repeat=3):
+    """返回单次调用的最佳耗时 (秒)：先试跑一次决定循环次数，再取 repeat 次重复中的最小值"""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first >= min_time:
+        return first
+    number = max(1, int(np.ceil(min_time / max(first, 1e-9))))
+    return min(timeit.Timer(fn).repeat(repeat=repeat, number=number)) / number
+
+def memory_call(fn):
+    """单次调用的 (峰值新增分配, 调用后残留分配)，单位字节"""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base, current - base
+
+def bench_kernel(name, sizes, max_seconds=5.0, max_mb=2000.0, min_time=0.2):
+    """
+    对一个内核做规模扫描。按上一规模线性外推，估计耗时超过 max_seconds 或峰值内存超过 max_mb 的规模跳过。
+    :return: 每个规模一行的 dict 列表
+    """
+    setup, max_n = KERNELS[name]
+    rows, last = [], None
+    for n in sizes:
+        if n > max_n:
+            break
+        if last is not None:
+            scale = n / last['n']
+            if last['seconds'] * scale > max_seconds or last['peak_bytes'] * scale > max_mb * 2 ** 20:
+                rows.append({'kernel': name, 'n': n, 'status': 'skipped (budget)'})
+                break
+        fn = setup(n)
+        seconds = time_call(fn, min_time=min_time)
+        peak, retained = memory_call(fn)
+        last = {'kernel': name, 'n': n, 'status': 'ok', 'seconds': seconds,
+                'ns_per_point': seconds / n * 1e9, 'peak_bytes': peak,
+                'peak_bytes_per_point': peak / n, 'retained_bytes': retained}
+        rows.append(last)
+        del fn
+    return rows
+
+def run_suite(kernels, sizes, **kwargs):
+    rows = []
+    for name in kernels:
+        print(f"▶️  {name} ...", flush=True)
+        try:
+            rows.extend(bench_kernel(name, sizes, **kwargs))
+        except (ImportError, AttributeError, TypeError, KeyError) as e:
+            # 旧版本中不存在的接口：记为 missing，不影响其他内核
+            rows.append({'kernel': name, 'status': f"missing ({type(e).__name__}: {e})"})
+    return rows
+
+def print_table(rows):
+    df = pd.DataFrame([r for r in rows if r.get('status') == 'ok'])
+    if df.empty:
+        return
+    df['peak_MB'] = df['peak_bytes'] / 2 ** 20
+    print(df[['kernel', 'n', 'ns_per_point', 'peak_MB', 'peak_bytes_per_point', 'retained_bytes']]
+          .to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    for r in rows:
+        if r.get('status') != 'ok':
+            print(f"   {r['kernel']} n={r.get('n', '-')}: {r['status']}")
+
+# ============================================================
+# 两个 git 版本的对比
+# ============================================================
+def _checkout(rev, tmp):
+    """把 rev 的 new_model 目录导出到临时目录 (不改动当前工作区)；WORKTREE 直接用当前目录"""
+    if rev == 'WORKTREE':
+        return HERE
+    dest = os.path.join(tmp, rev.replace('/', '_').replace('~', '_').replace('^', '_'))
+    os.makedirs(dest, exist_ok=True)
+    archive = subprocess.run(['git', 'archive', rev, 'new_model'], cwd=ROOT, capture_output=True, check=True)
+    subprocess.run(['tar', '-x', '-C', dest], input=archive.stdout, check=True)
+    return os.path.join(dest, 'new_model')
+
+def compare_revisions(rev_a, rev_b, argv):
+    """
+    在两个版本上分别运行同一套 (当前版本的) 微基准，每个版本一个子进程 (模块互不干扰)，
+    输出每个 (内核, 规模) 的 ns/point 与加速比 = A / B。
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rev in (rev_a, rev_b):
+            target = _checkout(rev, tmp)
+            out = os.path.join(tmp, 'result.json')
+            print(f"\n===== {rev} =====")
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--target', target, '--output', out] + argv,
+                           cwd=target, check=True)
+            with open(out) as f:
+                results[rev] = json.load(f)['results']
+
+    def frame(rows):
+        df = pd.DataFrame([r for r in rows if r.get('status') == 'ok'])
+        return df.set_index(['kernel', 'n'])[['ns_per_point', 'peak_bytes']] if not df.empty else pd.DataFrame()
+
+    table = frame(results[rev_a]).join(frame(results[rev_b]), how='outer', lsuffix=f' [{rev_a}]', rsuffix=f' [{rev_b}]')
+    table['speedup'] = table[f'ns_per_point [{rev_a}]'] / table[f'ns_per_point [{rev_b}]']
+    print(f"\n📊 {rev_a} vs {rev_b} (speedup > 1 表示 {rev_b} 更快):")
+    print(table.to_string(float_format=lambda v: f"{v:.4g}"))
+    return table, results
+
+def main():
+    parser = argparse.ArgumentParser(description="热点内核微基准")
+    parser.add_argument('--kernels', nargs='+', default=list(KERNELS), choices=list(KERNELS))
+    parser.add_argument('--max-n', type=int, default=10 ** 7, help="最大规模 (10 的幂，从 10 开始扫描)")
+    parser.add_argument('--max-seconds', type=float, default=5.0, help="单次调用的估计耗时上限")
+    parser.add_argument('--max-mb', type=float, default=2000.0, help="单次调用的估计峰值内存上限 (MB)")
+    parser.add_argument('--compare', nargs=2, metavar=('REV_A', 'REV_B'), help="对比两个 git 版本 (WORKTREE = 当前工作区)")
+    parser.add_argument('--target', default=HERE, help=argparse.SUPPRESS)
+    parser.add_argument('--output', default=None, help="结果 JSON 路径 (缺省 benchmarks/micro_<时间>.json)")
+    args, _ = parser.parse_known_args()
+
+    passthrough = ['--kernels', *args.kernels, '--max-n', str(args.max_n),
+                   '--max-seconds', str(args.max_seconds), '--max-mb', str(args.max_mb)]
+    if args.compare:
+        table, results = compare_revisions(*args.compare, passthrough)
+        out = args.output or os.path.join(BENCH_DIR, f"micro_compare_{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, 'w') as f:
+            json.dump({'revisions': list(args.compare), 'results': results}, f, indent=1)
+        print(f"\n📄 结果已保存至: {out}")
+        return
+
+    # 被测代码从 target 导入 (对比模式下为导出的旧版本目录)
+    sys.path.insert(0, args.target)
+    sizes = [n for n in SIZES if n <= args.max_n]
+    rows = run_suite(args.kernels, sizes, max_seconds=args.max_seconds, max_mb=args.max_mb)
+    print_table(rows)
+
+    out = args.output or os.path.join(BENCH_DIR, f"micro_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump({'target': args.target, 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'numpy': np.__version__, 'results': rows}, f, indent=1)
+    print(f"\n📄 结果已保存至: {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import numpy as np
+
+# ============================================================
+# 帕累托存档 (Pareto Archive)
+# ============================================================
+# 约定：内部统一按“越小越好”比较，最大化目标取负。
+# ε-支配 (加性容差)：若已有点 a 满足 a <= f + eps (逐目标)，则 f 不带来有意义的改进，直接丢弃。
+# eps = None/0 时退化为精确弱支配：被支配点与重复点都会被去掉。
+
+_KUNG_LEAF = 64      # 递归到这个规模以下直接两两比较
+_CHUNK = 1 << 22     # 向量化比较时单块最多的 (点对 x 目标) 元素数，控制内存
+
+def _as_eps(eps, m):
+    """把标量/列表形式的容差统一成长度 m 的数组"""
+    if eps is None:
+        return np.zeros(m)
+    return np.broadcast_to(np.asarray(eps, dtype=float), (m,)).copy()
+
+def _dominated_by_any(B, T):
+    """B 中每个点是否被 T 中某个点弱支配 (T <= B)，按块向量化"""
+    out = np.zeros(len(B), dtype=bool)
+    if len(T) == 0:
+        return out
+    step = max(1, _CHUNK // (len(T) * B.shape[1]))
+    for s in range(0, len(B), step):
+        blk = B[s:s + step]
+        out[s:s + step] = np.any(np.all(T[None, :, :] <= blk[:, None, :], axis=2), axis=1)
+    return out
+
+def _kung_front(F, idx):
+    """
+    Kung 分治：idx 已按字典序升序排列，返回其中非支配点的下标 (保持顺序)。
+    字典序保证后半部分的点不可能支配前半部分，只需用前半前沿过滤后半前沿。
+    """
+    n = len(idx)
+    if n <= _KUNG_LEAF:
+        P = F[idx]
+        D = np.all(P[:, None, :] <= P[None, :, :], axis=2)   # D[i, j]: i 弱支配 j
+        return idx[~np.any(np.triu(D, k=1), axis=0)]
+    half = n // 2
+    top = _kung_front(F, idx[:half])
+    bottom = _kung_front(F, idx[half:])
+    return np.concatenate([top, bottom[~_dominated_by_any(F[bottom], F[top])]])
+
+def nondominated_mask(F, eps=None):
+    """
+    批量非支配过滤 (最小化意义)。
+    :param F: (n, m) 目标矩阵
+    :param eps: ε-支配容差 (标量或长度 m)，None 为精确过滤
+    :return: 长度 n 的布尔数组，True 表示保留；重复点只保留第一个 (字典序最小者)
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+    order = np.lexsort(F.T[::-1])
+    if F.shape[1] == 2:
+        # 二维：字典序扫描，y 严格小于之前所有点的 y 才是非支配点，O(n log n)
+        y = F[order, 1]
+        prev_min = np.r_[np.inf, np.minimum.accumulate(y)[:-1]]
+        front = order[y < prev_min]
+    else:
+        front = _kung_front(F, order)
+
+    e = _as_eps(eps, F.shape[1])
+    if np.any(e > 0):
+        # ε 稀疏化：按字典序依次接受，与已接受点 ε-重合的点丢弃 (与 ParetoArchive 按同样顺序逐点插入的结果一致)
+        kept = []
+        for i in front:
+            if not kept or not np.any(np.all(F[kept] <= F[i] + e, axis=1)):
+                kept.append(i)
+        front = np.array(kept, dtype=int)
+
+    mask[front] = True
+    return mask
+
+def pareto_filter(df, objective_config, eps=None, by=None):
+    """
+    DataFrame 版本的批量过滤，供后处理直接使用。
+    :param objective_config: {'Cost': {'type': 'min'}, ...}，决定参与比较的列与方向
+    :param eps: ε 容差，{目标名: 容差} 或标量
+    :param by: 分组列 (如 'LT_um')，各组分别过滤；None 为整体过滤
+    """
+    names = list(objective_config.keys())
+    if df.empty:
+        return df
+    F = df[names].to_numpy(dtype=float).copy()
+    for j, name in enumerate(names):
+        if objective_config[name]['type'] == 'max':
+            F[:, j] = -F[:, j]
+    if isinstance(eps, dict):
+        eps = [eps.get(name, 0.0) for name in names]
+
+    mask = np.zeros(len(df), dtype=bool)
+    groups = df.groupby(by).indices.values() if by is not None else [np.arange(len(df))]
+    for idx in groups:
+        mask[idx] = nondominated_mask(F[idx], eps)
+    return df[mask]
+
+
+class _NDNode:
+    """ND-tree 节点：叶子存点编号，内部节点存子节点；ideal/nadir 为子树内点的精确包围盒"""
+    __slots__ = ('ids', 'children', 'ideal', 'nadir')
+
+    def __init__(self, ids=None):
+        self.ids = ids if ids is not None else []
+        self.children = []
+        self.ideal = None
+        self.nadir = None
+
+    def is_leaf(self):
+        return not self.children
+
+
+class ParetoArchive:
+    """
+    在线帕累托存档 (ND-tree, Jaszkiewicz & Lust 2018 的简化实现)。
+    - 每个节点维护子树的 ideal/nadir 包围盒：
+      nadir 已 ε-支配新点 -> 整棵子树都能拒绝它；新点支配 ideal -> 整棵子树一次删除；
+      新点与包围盒无关 -> 整棵子树跳过。只有与新点“纠缠”的节点才需要逐点比较。
+    - 插入时沿中心最近的子节点下降，叶子超过 leaf_size 时按跨度最大的目标切分。
+    存档中始终只包含互不 ε-支配的点，items() 按插入顺序返回对应的记录。
+    """
+
+    def __init__(self, senses, eps=None, leaf_size=20, n_children=None):
+        """
+        :param senses: 每个目标的方向 ['min', 'min', 'max']
+        :param eps: ε-支配容差 (原始单位，标量或每个目标一个值)，None 为精确支配
+        :param leaf_size: 叶子最多存放的点数
+        :param n_children: 叶子分裂时的子节点数 (缺省为目标数 + 1)
+        """
+        self.signs = np.array([-1.0 if s == 'max' else 1.0 for s in senses])
+        self.eps = _as_eps(eps, len(self.signs))
+        self.leaf_size = leaf_size
+        self.n_children = n_children or len(self.signs) + 1
+        self._root = _NDNode()
+        self._points = {}   # id -> (最小化形式的目标向量, 记录)，dict 保持插入顺序
+        self._next_id = 0
+        self.last_id = None        # 最近一次被接受的点编号
+        self.last_removed = []     # 最近一次插入时被挤出存档的 [(编号, 记录)]
+
+    def __len__(self):
+        return len(self._points)
+
+    def add(self, f, item=None):
+        """
+        插入一个点。
+        :param f: 原始方向的目标向量
+        :param item: 随点保存的记录 (如求解结果 dict)
+        :return: True 表示被接受 (同时删除了它支配的旧点)，False 表示被存档 ε-支配而丢弃
+        """
+        z = np.asarray(f, dtype=float) * self.signs
+        self.last_removed = []
+        if self._covered(self._root, z + self.eps):
+            return False
+        self._remove_dominated(self._root, z)
+        pid = self.last_id = self._next_id
+        self._next_id += 1
+        self._points[pid] = (z, item)
+        self._insert(self._root, pid, z)
+        return True
+
+    def extend(self, F, items=None):
+        """逐点插入，返回被接受的点数"""
+        items = items if items is not None else [None] * len(F)
+        return sum(self.add(f, item) for f, item in zip(F, items))
+
+    def get(self, pid):
+        """按编号取回记录 (编号见 last_id / last_removed)"""
+        return self._points[pid][1]
+
+    def objectives(self):
+        """存档中的目标矩阵 (原始方向，插入顺序)"""
+        if not self._points:
+            return np.empty((0, len(self.signs)))
+        return np.array([z for z, _ in self._points.values()]) * self.signs
+
+    def items(self):
+        """存档中的记录 (插入顺序)"""
+        return [item for _, item in self._points.values()]
+
+    # ---------------- ND-tree 内部操作 ----------------
+    def _leaf_points(self, node):
+        return np.array([self._points[i][0] for i in node.ids])
+
+    def _covered(self, node, ze):
+        """子树中是否存在点 a <= ze (ze = 新点 + eps)"""
+        if node.ideal is None or not np.all(node.ideal <= ze):
+            return False
+        if np.all(node.nadir <= ze):
+            return True
+        if node.is_leaf():
+            return bool(np.any(np.all(self._leaf_points(node) <= ze, axis=1)))
+        return any(self._covered(c, ze) for c in node.children)
+
+    def _remove_dominated(self, node, z):
+        """删除子树中被 z 支配的点 (调用前已确认 z 未被覆盖，因此 z <= a 即严格支配)"""
+        if node.ideal is None or not np.all(z <= node.nadir):
+            return
+        if np.all(z <= node.ideal):
+            self._drop_subtree(node)
+            return
+        if node.is_leaf():
+            P = self._leaf_points(node)
+            dominated = np.all(z <= P, axis=1)
+            if np.any(dominated):
+                for i in np.asarray(node.ids)[dominated]:
+                    self._discard(int(i))
+                node.ids = [i for i, d in zip(node.ids, dominated) if not d]
+                self._refresh_bounds(node)
+            return
+        for c in node.children:
+            self._remove_dominated(c, z)
+        node.children = [c for c in node.children if c.ideal is not None]
+        if len(node.children) == 1:   # 只剩一个子节点时上提，避免树退化成链
+            only = node.children[0]
+            node.ids, node.children = only.ids, only.children
+        self._refresh_bounds(node)
+
+    def _drop_subtree(self, node):
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            for i in n.ids:
+                self._discard(i)
+            stack.extend(n.children)
+        node.ids, node.children = [], []
+        node.ideal = node.nadir = None
+
+    def _discard(self, pid):
+        self.last_removed.append((pid, self._points.pop(pid)[1]))
+
+    def _refresh_bounds(self, node):
+        if node.is_leaf():
+            if node.ids:
+                P = self._leaf_points(node)
+                node.ideal, node.nadir = P.min(axis=0), P.max(axis=0)
+            else:
+                node.ideal = node.nadir = None
+        else:
+            node.ideal = np.min([c.ideal for c in node.children], axis=0)
+            node.nadir = np.max([c.nadir for c in node.children], axis=0)
+
+    def _insert(self, node, pid, z):
+        while True:
+            if node.ideal is None:
+                node.ideal, node.nadir = z.copy(), z.copy()
+            else:
+                node.ideal = np.minimum(node.ideal, z)
+                node.nadir = np.maximum(node.nadir, z)
+            if node.is_leaf():
+                node.ids.append(pid)
+                if len(node.ids) > self.leaf_size:
+                    self._split(node)
+                return
+            centers = np.array([(c.ideal + c.nadir) / 2 for c in node.children])
+            node = node.children[int(np.argmin(np.sum((centers - z)**2, axis=1)))]
+
+    def _split(self, node):
+        """沿跨度最大的目标把叶子等分成 n_children 个子叶子"""
+        P = self._leaf_points(node)
+        dim = int(np.argmax(node.nadir - node.ideal))
+        order = np.argsort(P[:, dim], kind='stable')
+        ids = np.asarray(node.ids)
+        for chunk in np.array_split(order, self.n_children):
+            if len(chunk) == 0:
+                continue
+            child = _NDNode([int(i) for i in ids[chunk]])
+            child.ideal, child.nadir = P[chunk].min(axis=0), P[chunk].max(axis=0)
+            node.children.append(child)
+        node.ids = []
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+import random                      # 二维阶梯前沿 (treap) 的随机优先级
+from scipy.spatial import cKDTree  # 最近邻距离 (GD / IGD / spacing / spread)
+
+# ============================================================
+# 帕累托前沿质量指标 (Pareto Front Quality Metrics)
+# ============================================================
+# 约定：F 为 (n, m) 目标矩阵，全部按“越小越好”处理；
+# 最大化目标 (如 Efficiency) 先用 to_minimization 取负。
+
+def to_minimization(F, senses):
+    """
+    把目标矩阵统一成最小化形式。
+    :param senses: 每列的方向 ['min', 'min', 'max']
+    """
+    F = np.array(F, dtype=float, copy=True)
+    for j, sense in enumerate(senses):
+        if sense == 'max':
+            F[:, j] = -F[:, j]
+    return F
+
+def hypervolume(F, ref_point):
+    """
+    精确超体积 (Hypervolume)，最小化意义下被 F 支配且不超过 ref_point 的体积。
+    - m = 2: 排序后累加矩形面积，O(n log n)
+    - m = 3: 沿第三维扫描，同时维护二维阶梯前沿及其面积，O(n log n) (期望)。
+      阶梯前沿存放在平衡二叉搜索树 (_Staircase，treap) 中，查找/插入/删除都是 O(log n)；
+      每个点只被插入/删除一次，面积增量只在变化的区段上计算
+    重复点、被支配点、越过参考点的点自动忽略。
+    """
+    F = np.asarray(F, dtype=float)
+    ref = np.asarray(ref_point, dtype=float)
+    if F.size == 0:
+        return 0.0
+    F = F[np.all(F < ref, axis=1)]
+    if len(F) == 0:
+        return 0.0
+
+    m = F.shape[1]
+    if m == 2:
+        return _hv2d(F, ref)
+    if m != 3:
+        raise ValueError(f"hypervolume supports 2 or 3 objectives, got {m}")
+
+    order = np.lexsort((F[:, 1], F[:, 0], F[:, 2]))  # 按 z 升序扫描
+    F = F[order]
+    rx, ry, rz = ref
+
+    stairs = _Staircase(rx, ry)
+    area = 0.0
+    volume = 0.0
+    for i in range(len(F)):
+        px, py, pz = F[i]
+        area += stairs.insert(px, py)
+        z_next = F[i + 1, 2] if i + 1 < len(F) else rz
+        volume += area * (z_next - pz)
+    return float(volume)
+
+def _hv2d(F, ref):
+    order = np.lexsort((F[:, 1], F[:, 0]))
+    area, best_y = 0.0, ref[1]
+    for x, y in F[order]:
+        if y < best_y:
+            area += (ref[0] - x) * (best_y - y)
+            best_y = y
+    return float(area)
+
+# treap 节点：[x, y, 优先级, 左子树, 右子树]
+_X, _Y, _PRIO, _LEFT, _RIGHT = range(5)
+
+def _split(node, x):
+    """按 x 拆分 treap：返回 (键 < x 的子树, 键 >= x 的子树)"""
+    if node is None:
+        return None, None
+    if node[_X] < x:
+        node[_RIGHT], right = _split(node[_RIGHT], x)
+        return node, right
+    left, node[_LEFT] = _split(node[_LEFT], x)
+    return left, node
+
+def _merge(a, b):
+    """合并两棵 treap (a 的键全部小于 b 的键)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a[_PRIO] > b[_PRIO]:
+        a[_RIGHT] = _merge(a[_RIGHT], b)
+        return a
+    b[_LEFT] = _merge(a, b[_LEFT])
+    return b
+
+def _first(node):
+    """最小键节点"""
+    while node[_LEFT] is not None:
+        node = node[_LEFT]
+    return node
+
+def _last(node):
+    """最大键节点"""
+    while node[_RIGHT] is not None:
+        node = node[_RIGHT]
+    return node
+
+def _drop_first(node):
+    """删除最小键节点，返回新的子树"""
+    if node[_LEFT] is None:
+        return node[_RIGHT]
+    node[_LEFT] = _drop_first(node[_LEFT])
+    return node
+
+class _Staircase:
+    """
+    二维阶梯前沿 (x 严格升序，y 严格降序)，按 x 存放在 treap 中，
+    查找前驱/后继、插入、删除均为期望 O(log n)。
+    """
+
+    def __init__(self, rx, ry, seed=0):
+        self.rx, self.ry = rx, ry
+        self.root = None
+        self._rng = random.Random(seed)
+
+    def insert(self, px, py):
+        """
+        把点 (px, py) 插入阶梯前沿，返回被支配面积的增量。
+        """
+        left, right = _split(self.root, px)
+        # 左邻居 (x < px 中 y 最小者) 若 y <= py，则新点被支配
+        prev = _last(left) if left is not None else None
+        nxt = _first(right) if right is not None else None
+        if (prev is not None and prev[_Y] <= py) or (nxt is not None and nxt[_X] == px and nxt[_Y] <= py):
+            self.root = _merge(left, right)
+            return 0.0
+
+        # 新点之前在 [px, 右边界) 上的旧高度：从左邻居的 y 开始
+        y_prev = prev[_Y] if prev is not None else self.ry
+        x_prev = px
+        gained = 0.0
+        # 删除被新点支配的点 (x >= px 且 y >= py，在树中是 right 开头的一段)
+        while nxt is not None and nxt[_Y] >= py:
+            gained += (nxt[_X] - x_prev) * (y_prev - py)
+            x_prev, y_prev = nxt[_X], nxt[_Y]
+            right = _drop_first(right)
+            nxt = _first(right) if right is not None else None
+        x_right = nxt[_X] if nxt is not None else self.rx
+        gained += (x_right - x_prev) * (y_prev - py)
+
+        node = [px, py, self._rng.random(), None, None]
+        self.root = _merge(_merge(left, node), right)
+        return gained
+
+def generational_distance(F, ref_front):
+    """GD: 近似前沿每个点到参考前沿的最近距离的平均值 (越小越收敛)"""
+    F, R = np.asarray(F, dtype=float), np.asarray(ref_front, dtype=float)
+    if len(F) == 0 or len(R) == 0:
+        return np.nan
+    dist, _ = cKDTree(R).query(F)
+    return float(np.mean(dist))
+
+def inverted_generational_distance(F, ref_front):
+    """IGD: 参考前沿每个点到近似前沿的最近距离的平均值 (同时反映收敛性与覆盖度)"""
+    return generational_distance(ref_front, F)
+
+def _nearest_other(F):
+    """每个点到其他点的最近欧氏距离"""
+    dist, _ = cKDTree(F).query(F, k=2)
+    return dist[:, 1]
+
+def spacing(F):
+    """
+    Schott 间距指标：相邻解最近距离的标准差 (0 = 完全均匀)。
+    这里使用欧氏距离以便用 KD 树加速。
+    """
+    F = np.asarray(F, dtype=float)
+    if len(F) < 2:
+        return 0.0
+    d = _nearest_other(F)
+    return float(np.sqrt(np.sum((d - d.mean())**2) / (len(F) - 1)))
+
+def spread(F, ref_front=None):
+    """
+    广义分布度 Δ (Zhou et al.)，适用于任意目标数：
+    Δ = (Σ_k d(e_k, F) + Σ_i |d_i - d̄|) / (Σ_k d(e_k, F) + n * d̄)
+    e_k 为参考前沿 (缺省为 F 本身) 在第 k 个目标上的极值点。0 = 理想分布。
+    """
+    F = np.asarray(F, dtype=float)
+    if len(F) < 2:
+        return 0.0
+    R = F if ref_front is None else np.asarray(ref_front, dtype=float)
+    extremes = R[np.argmin(R, axis=0)]
+    d_ext = np.sum(cKDTree(F).query(extremes)[0])
+    d = _nearest_other(F)
+    d_mean = d.mean()
+    denom = d_ext + len(F) * d_mean
+    return float((d_ext + np.sum(np.abs(d - d_mean))) / denom) if denom > 0 else 0.0
+
+def front_quality(df, objective_config, ref_point=None, ref_front=None, by='LT_um', normalize=True):
+    """
+    按层厚 (或其他分组列) 汇总前沿质量指标。
+
+    :param df: 含目标列的结果表 (如 raw_pareto_results)
+    :param objective_config: {'Cost': {'type': 'min'}, ...}，决定列与方向
+    :param ref_point: 超体积参考点 (原始单位)；缺省取全部数据的最差值外扩 1%
+    :param ref_front: 参考前沿 DataFrame (同样的目标列)，提供时计算 GD / IGD
+    :param normalize: True 时先按全部数据的 [ideal, ref] 归一化，使各目标量纲可比
+    :return: DataFrame，每组一行: n_points, hypervolume, gd, igd, spacing, spread
+    """
+    names = list(objective_config.keys())
+    senses = [objective_config[n]['type'] for n in names]
+    F_all = to_minimization(df[names].to_numpy(dtype=float), senses)
+    R_all = None if ref_front is None else to_minimization(ref_front[names].to_numpy(dtype=float), senses)
+
+    stacked = F_all if R_all is None else np.vstack([F_all, R_all])
+    ideal = stacked.min(axis=0)
+    if ref_point is None:
+        worst = stacked.max(axis=0)
+        ref = worst + 0.01 * np.maximum(worst - ideal, 1e-12)
+    else:
+        ref = to_minimization(np.atleast_2d(ref_point), senses)[0]
+    scale = np.where(ref - ideal > 1e-12, ref - ideal, 1.0) if normalize else np.ones(len(names))
+
+    def norm(A):
+        return (A - ideal) / scale
+
+    groups = df.groupby(by).indices.items() if by in df.columns else [('all', np.arange(len(df)))]
+    rows = []
+    for key, idx in groups:
+        F = norm(F_all[idx])
+        R = None
+        if R_all is not None:
+            R = norm(R_all[ref_front[by].to_numpy() == key]) if by in ref_front.columns else norm(R_all)
+        rows.append({
+            by: key,
+            'n_points': len(F),
+            'hypervolume': hypervolume(F, norm(ref)),
+            'gd': generational_distance(F, R) if R is not None else np.nan,
+            'igd': inverted_generational_distance(F, R) if R is not None else np.nan,
+            'spacing': spacing(F),
+            'spread': spread(F, R),
+        })
+    return pd.DataFrame(rows)
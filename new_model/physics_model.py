@@ -1,31 +1,121 @@
 import numpy as np
+import hashlib
+import json
 import config as cfg
+from response_surface import get_surface   # 回归方程 (系数表 -> 编译好的多项式)
 
 # ==========================================
-# 1. 回归模型系数 (保持不变)
+# 1. 回归模型 (响应面引擎)
 # ==========================================
-REG_COEFFS = {
-    'Intercept': 136.59848,
-    # --- 一次项 ---
-    'P': 0.094923,
-    'V': -0.028654,
-    'H': -0.201185,
-    'LT': -0.108546,
-    'ED': -0.524864,
-    # --- 二次项 ---
-    'P^2': -0.000051,
-    'V^2': 0.00000883923,
-    'H^2': 0.000575,
-    'ED^2': 0.002459,
-    # --- 交互项 ---
-    'P*V': -0.000012,
-    'P*H': -0.000123,
-    'P*ED': -0.000122,
-    'V*H': 0.000013,
-    'V*ED': 0.000096,
-    'H*ED': 0.000450
-}
+# 系数统一存放在 response_surfaces.csv，由 response_surface 编译成函数，
+# 标量/数组/Pyomo 共用同一份多项式，不再在各处手抄。
+RD_SURFACE = get_surface('RD')
+REG_COEFFS = RD_SURFACE.coefficients   # 兼容旧接口与模型指纹
 
+# ==========================================
+# 2. 常数折叠 (Constant Folding)
+# ==========================================
+# 期望材料成本/碳排放、时间成本系数等与决策变量 x 无关，
+# 只依赖 config，因此在导入时一次性算好，避免每次评估都重新遍历 SCENARIOS。
+_CONST = {}
+
+def refresh_constants():
+    """
+    按当前 config 重新折叠所有常数。
+    (仅在运行时修改了 cfg 的参数后才需要手动调用)
+    """
+    _CONST.clear()
+    _CONST.update({
+        # 3.1 材料成本期望: sum(prob * 密度 * (1+损耗) * 单价)
+        'mat_cost': sum(s['prob'] * cfg.RHO * (1 + s['loss_rate']) * s['price']
+                        for s in cfg.SCENARIOS),
+        # 4.1 材料碳排放期望: sum(prob * 密度 * (1+损耗) * EF_POWDER)
+        'mat_carbon': sum(s['prob'] * cfg.RHO * (1 + s['loss_rate']) * cfg.EF_POWDER
+                          for s in cfg.SCENARIOS),
+        'c_time': cfg.C_TIME_TOTAL,
+        'p_base': cfg.P_BASE,
+        'ef_elec': cfg.EF_ELEC,
+        'post_map': dict(cfg.POST_COST_MAP),
+    })
+
+refresh_constants()
+
+def model_fingerprint():
+    """
+    物理模型输入的指纹 (sha256)：config.py 中的全部大写常数 + REG_COEFFS。
+    任何参数被修改，指纹都会变化 —— 用作持久化求解缓存的失效依据。
+    """
+    consts = {name: getattr(cfg, name) for name in sorted(dir(cfg)) if name.isupper()}
+    payload = json.dumps({'config': consts, 'reg_coeffs': REG_COEFFS}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _post_cost_base(lt_val_um):
+    """后处理单价查表，支持标量或逐行 LT 数组 (查不到时默认 0.020)。"""
+    post_map = _CONST['post_map']
+    if np.ndim(lt_val_um) == 0:
+        return post_map.get(lt_val_um, 0.020)
+    lt_arr = np.asarray(lt_val_um, dtype=float)
+    base = np.full(lt_arr.shape, 0.020)
+    for lt_key, price in post_map.items():
+        base[lt_arr == lt_key] = price
+    return base
+
+def _evaluate(P, V, H, lt_val_um, base_post_cost):
+    """
+    物理模型内核：只用 + - * /，因此对 float 标量和 numpy 数组都成立。
+    返回 Cost, Carbon, RD, ED, vol_rate (mm^3/s)
+    """
+    c = _CONST
+
+    vol_rate = V * H * lt_val_um * 1e-6  # mm^3/s
+    inv_rate = 1.0 / vol_rate            # s/mm^3
+    ED = P * inv_rate                    # J/mm^3
+
+    RD = RD_SURFACE(P=P, V=V, H=H, LT=lt_val_um, ED=ED)
+
+    Cost = (c['c_time'] * inv_rate) + c['mat_cost'] + base_post_cost * (1 + 0.0001 * V) + (0.01 * P)
+    Carbon = (P + c['p_base']) * c['ef_elec'] * inv_rate + c['mat_carbon']
+
+    return Cost, Carbon, RD, ED, vol_rate
+
+def _evaluate_gradients(P, V, H, lt_val_um, base_post_cost):
+    """
+    解析梯度内核 (同样对标量和数组通用)。
+    链式法则: InvRate = 1/(V*H*LT*1e-6), ED = P*InvRate
+        dED/dP = InvRate, dED/dV = -ED/V, dED/dH = -ED/H
+    返回 {指标名: (d/dP, d/dV, d/dH)}
+    """
+    c = _CONST
+
+    vol_rate = V * H * lt_val_um * 1e-6
+    inv_rate = 1.0 / vol_rate
+    ED = P * inv_rate
+
+    # 响应面对各因子的偏导 (把 ED 视作独立因子)
+    g = RD_SURFACE.gradient(P=P, V=V, H=H, LT=lt_val_um, ED=ED)
+    dRD_dED = g.get('ED', 0.0)
+    # RD 对 P/V/H 的显式偏导 + 经由 ED 的链式项
+    dRD_dP = g.get('P', 0.0) + dRD_dED * inv_rate
+    dRD_dV = g.get('V', 0.0) - dRD_dED * ED / V
+    dRD_dH = g.get('H', 0.0) - dRD_dED * ED / H
+
+    # Cost = C_TIME * InvRate + 常数 + base_post * (1 + 1e-4 V) + 0.01 P
+    time_cost = c['c_time'] * inv_rate
+    # Carbon = (P + P_BASE) * EF_ELEC * InvRate + 常数
+    proc_carbon = (P + c['p_base']) * c['ef_elec'] * inv_rate
+    zero = 0.0 * P
+
+    return {
+        'Cost': (zero + 0.01, -time_cost / V + base_post_cost * 0.0001, -time_cost / H),
+        'Carbon': (c['ef_elec'] * inv_rate, -proc_carbon / V, -proc_carbon / H),
+        'RD': (dRD_dP, dRD_dV, dRD_dH),
+        'ED': (inv_rate, -ED / V, -ED / H),
+        'Efficiency': (zero, vol_rate / V, vol_rate / H),
+    }
+
+# ==========================================
+# 3. 对外接口
+# ==========================================
 def predict_performance(x, lt_val_um):
     """
     输入: 
@@ -35,75 +125,45 @@ def predict_performance(x, lt_val_um):
         Cost (float): 总成本
         Carbon (float): 总碳排放
         RD (float): 相对致密度 (%)
+        ED (float): 能量密度 (J/mm^3)
     """
     P, V, H = x  # 解包变量
 
-    # 1. 基础物理量计算
-    # InvRate = 1 / (V * H * LT) * 1e6 (单位换算)
-    # 注意: V(mm/s), H(um), LT(um). V*H*LT 单位是 mm/s * um * um
-    # 我们需要体积速率 mm^3/s -> V * (H/1000) * (LT/1000)
-    # 你的原代码中 InvRate = 1 / (V * H * LT * 1e-6)
-    
-    vol_rate = V * H * lt_val_um * 1e-6 # mm^3/s
-    inv_rate = 1.0 / vol_rate           # s/mm^3 (打印 1 mm^3 需要的秒数)
-
-    # Energy Density (ED) = P / (V * H * LT)
-    # 原单位 J/mm^3 = W / (mm^3/s)
-    ED = P * inv_rate
-
-    # 2. 计算致密度 (RD) - 使用回归系数
-    # 这是一个长公式，直接翻译原来的 Pyomo 表达式
-    rc = REG_COEFFS
-    RD = (rc['Intercept'] +
-          rc['P'] * P +
-          rc['V'] * V +
-          rc['H'] * H +
-          rc['LT'] * lt_val_um +
-          rc['ED'] * ED +
-          
-          rc['P^2'] * (P ** 2) +
-          rc['V^2'] * (V ** 2) +
-          rc['H^2'] * (H ** 2) +
-          rc['ED^2'] * (ED ** 2) +
-          
-          rc['P*V'] * (P * V) +
-          rc['P*H'] * (P * H) +
-          rc['P*ED'] * (P * ED) +
-          rc['V*H'] * (V * H) +
-          rc['V*ED'] * (V * ED) +
-          rc['H*ED'] * (H * ED))
-
-    # 3. 计算成本 (Cost)
-    # (参考原代码逻辑)
-    
-    # 3.1 材料成本期望 (Expected Material Cost)
-    expected_mat_cost = 0
-    for s in cfg.SCENARIOS:
-        # 材料费 = 密度 * (1+损耗) * 单价
-        mat_cost = cfg.RHO * (1 + s['loss_rate']) * s['price']
-        expected_mat_cost += s['prob'] * mat_cost
-    
-    # 3.2 后处理成本
-    # 动态查表: cfg.POST_COST_MAP[lt_val_um] * (1 + 0.0001 * V)
-    base_post_cost = cfg.POST_COST_MAP.get(lt_val_um, 0.020) # 默认取0.020防报错
-    post_cost_dynamic = base_post_cost * (1 + 0.0001 * V)
-    
-    # 总成本 = 时间成本 + 材料成本 + 后处理 + 功率微小惩罚
-    # 时间成本 = C_TIME_TOTAL * inv_rate
-    Cost = (cfg.C_TIME_TOTAL * inv_rate) + expected_mat_cost + post_cost_dynamic + (0.01 * P)
+    # 体积速率 V(mm/s) * H(um) * LT(um) * 1e-6 -> mm^3/s, ED = P / vol_rate
+    # Cost = 时间成本 + 材料成本期望 + 动态后处理成本 + 功率微小惩罚
+    # Carbon = (P_laser + P_base) * EF_ELEC * Time + 材料碳排放期望
+    Cost, Carbon, RD, ED, _ = _evaluate(P, V, H, lt_val_um, _post_cost_base(lt_val_um))
     # 注意: 原代码里是 maximize(-Cost)，这里我们直接返回正的 Cost，方便后面最小化
+    return Cost, Carbon, RD, ED
 
-    # 4. 计算碳排放 (Carbon)
-    # 4.1 材料碳排放期望
-    expected_mat_carbon = 0
-    for s in cfg.SCENARIOS:
-        mat_c = cfg.RHO * (1 + s['loss_rate']) * cfg.EF_POWDER
-        expected_mat_carbon += s['prob'] * mat_c
-        
-    # 4.2 电力碳排放
-    # (P_laser + P_base) * EF_ELEC * Time
-    process_carbon = (P + cfg.P_BASE) * cfg.EF_ELEC * inv_rate
-    
-    Carbon = process_carbon + expected_mat_carbon
-
-    return Cost, Carbon, RD, ED
\ No newline at end of file
+def predict_performance_batch(X, lt_val_um):
+    """
+    批量版 predict_performance (向量化，无逐点 Python 循环)。
+
+    输入:
+        X: (N, 3) 数组，每行一个 [P, V, H]
+        lt_val_um: 标量层厚，或长度为 N 的逐行层厚数组
+    输出:
+        Cost, Carbon, RD, ED, Efficiency: 各为长度 N 的 numpy 数组
+        (Efficiency 即体积成形速率 mm^3/s)
+    """
+    X = np.asarray(X, dtype=float).reshape(-1, 3)
+    lt = lt_val_um if np.ndim(lt_val_um) == 0 else np.asarray(lt_val_um, dtype=float)
+    Cost, Carbon, RD, ED, efficiency = _evaluate(X[:, 0], X[:, 1], X[:, 2], lt, _post_cost_base(lt))
+    return Cost, Carbon, RD, ED, efficiency
+
+def performance_gradients(x, lt_val_um):
+    """
+    predict_performance 的解析梯度，可直接作为 SLSQP 的 jac= 使用。
+
+    输入:
+        x: [P, V, H]，或 (N, 3) 数组 (批量)
+        lt_val_um: 标量层厚 (批量时也可以是逐行数组)
+    输出:
+        dict: {'Cost', 'Carbon', 'RD', 'ED', 'Efficiency'} -> 梯度 [d/dP, d/dV, d/dH]
+              (单点时形状 (3,)，批量时形状 (N, 3))
+    """
+    x = np.asarray(x, dtype=float)
+    lt = lt_val_um if np.ndim(lt_val_um) == 0 else np.asarray(lt_val_um, dtype=float)
+    grads = _evaluate_gradients(x[..., 0], x[..., 1], x[..., 2], lt, _post_cost_base(lt))
+    return {name: np.stack(g, axis=-1) for name, g in grads.items()}
@@ -1,50 +1,51 @@
 import pandas as pd                           # for data handling
 import numpy as np                            # for numerical arrays
-import matplotlib.pyplot as plt               # for plotting
-from mpl_toolkits.mplot3d import Axes3D       # for 3D plotting
 import os                                     # for file/path checks
-import ast                                    # for safe string parsing
+
+from pareto_archive import pareto_filter      # 非支配过滤 (只对帕累托解做 TOPSIS)
+from response_surface import get_surface      # 回归方程 (系数表 -> 编译好的多项式)
+from result_io import load_results, save_results, find_results, normalize_columns  # 列式结果文件
+from figures import render_figures, figure_jobs, render_pareto_3d, render_weight_map  # 无界面并行绘图 (Agg)
 
 # import topsis module
 try:
-    from topsis import Topsis
+    from topsis import topsis, stack_fronts, simplex_weights, topsis_weight_sweep
 except ImportError:
     print("[Error] topsis.py module not found. Please ensure it is in the same directory.")
     exit()
 
 # ==========================================
-# 1. 回归模型系数
+# 1. 回归模型 (与 physics_model 共用 response_surfaces.csv)
 # ==========================================
-REG_COEFFS = {
-    'Intercept': 136.59848,
-    'P':0.094923, 'V':-0.028654, 'H':-0.201185, 'LT':-0.108546, 'ED':-0.524864,
-    'P^2': -0.000051, 'V^2': 0.00000883923, 'H^2': 0.000575, 'ED^2': 0.002459,
-    'P*V': -0.000012, 'P*H': -0.000123, 'P*ED': -0.000122,
-    'V*H': 0.000013, 'V*ED': 0.000096, 'H*ED': 0.000450
-}
+RD_SURFACE = get_surface('RD')
+
+def predict_rd(df):
+    """
+    整列向量化计算致密度 (兼容 P_W/P 等两种列名)，物理截断到 100%。
+    V*H*LT 为 0 的行返回 0。
+    """
+    def col(*names):
+        name = next((n for n in names if n in df.columns), None)
+        return df[name].to_numpy(dtype=float) if name else np.zeros(len(df))
+
+    P, V, H, LT = col('P_W', 'P'), col('V_mm_s', 'V'), col('H_um', 'H'), col('LT_um', 'LT')
+    denom = V * H * LT
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ED = P / (denom * 1e-6)
+        rd = np.minimum(RD_SURFACE(P=P, V=V, H=H, LT=LT, ED=ED), 100.0)
+    return np.where(denom == 0, 0.0, rd)
 
 def calculate_rd_manual(row):
-    try:
-        # 兼容处理：如果没有 P_W，尝试找 P
-        P = row.get('P_W', row.get('P', 0))
-        V = row.get('V_mm_s', row.get('V', 0))
-        H = row.get('H_um', row.get('H', 0))
-        LT = row.get('LT_um', row.get('LT', 0))
-    except Exception:
-        return 0
-
-    if V * H * LT == 0: return 0
-    ED = P / (V * H * LT * 1e-6)
-
-    c = REG_COEFFS
-    rd_val = (
-        c['Intercept'] +
-        c['P']*P + c['V']*V + c['H']*H + c['LT']*LT + c['ED']*ED +
-        c['P^2']*(P**2) + c['V^2']*(V**2) + c['H^2']*(H**2) + c['ED^2']*(ED**2) +
-        c['P*V']*(P*V) + c['P*H']*(P*H) + c['P*ED']*(P*ED) +
-        c['V*H']*(V*H) + c['V*ED']*(V*ED) + c['H*ED']*(H*ED)
-    )
-    return min(rd_val, 100.0)
+    """单行版本 (保留旧接口)：直接标量求值，与 predict_rd 逐位一致 (不为单行构造 DataFrame)"""
+    def get(*names):
+        return float(next((row[n] for n in names if n in row), 0.0))
+
+    P, V, H, LT = get('P_W', 'P'), get('V_mm_s', 'V'), get('H_um', 'H'), get('LT_um', 'LT')
+    denom = V * H * LT
+    if denom == 0:
+        return 0.0
+    ED = P / (denom * 1e-6)
+    return min(float(RD_SURFACE(P=P, V=V, H=H, LT=LT, ED=ED)), 100.0)
 
 # ==========================================
 # [关键修改] 数据预处理：统一列名
@@ -53,29 +54,13 @@ def preprocess_data(df):
     """
     智能识别列名，解决 Cost vs Obj_Cost 的问题
     """
-    print("\n[Debug] Excel 文件中的列名:", df.columns.tolist())
-    
-    # 1. 尝试拆分 'x' 列 (如果存在)
-    if 'x' in df.columns and 'P_W' not in df.columns:
+    print("\n[Debug] 结果文件中的列名:", df.columns.tolist())
+
+    # 1. 打包参数列 'x' 拆成类型化的 P_W / V_mm_s / H_um (列式文件中已是独立列，这里只兼容旧 Excel)
+    if 'x' in df.columns:
         print("[Info] 发现打包参数列 'x'，正在拆分...")
-        def parse_x(val):
-            if isinstance(val, str):
-                try:
-                    val = val.replace('\n', ' ').replace('  ', ' ')
-                    if ',' not in val:
-                         val = val.replace('[', '').replace(']', '').split()
-                         return [float(v) for v in val]
-                    return ast.literal_eval(val)
-                except: return [0, 0, 0]
-            elif isinstance(val, (list, np.ndarray)):
-                return val
-            return [0, 0, 0]
-
-        parsed_x = df['x'].apply(parse_x)
-        df['P_W'] = parsed_x.apply(lambda l: l[0] if len(l)>0 else 0)
-        df['V_mm_s'] = parsed_x.apply(lambda l: l[1] if len(l)>1 else 0)
-        df['H_um'] = parsed_x.apply(lambda l: l[2] if len(l)>2 else 0)
-    
+    df = normalize_columns(df)
+
     # 2. [核心修复] 统一目标函数列名
     # 如果 Excel 里叫 'Cost'，我们就把它复制一份叫 'Obj_Cost'
     rename_map = {
@@ -94,7 +79,21 @@ def preprocess_data(df):
 # ==========================================
 # 2. 对接标准 TOPSIS 算法
 # ==========================================
-def run_topsis_standard(df):
+# 默认决策设置：权重 Cost=0.4, Carbon=0.2, Efficiency=0.4；方向 Min, Min, Max
+TOPSIS_COLS = ['Obj_Cost', 'Obj_Carbon', 'Obj_Efficiency']
+TOPSIS_WEIGHTS = [0.4, 0.2, 0.4]
+TOPSIS_CRITERIA = [False, False, True]
+
+# 结果表主格式为列式文件 (Parquet / .npz)；True 时额外导出同名 .xlsx 供查看
+EXPORT_EXCEL = False
+
+def run_topsis_standard(df, by=None):
+    """
+    :param by: 分组列 (如 'LT_um'，或 ['LT_um', 'run'] 同时区分多次运行)。
+               每组作为一个独立前沿归一化/打分，所有组堆叠成 (F, M, N) 张量一次算完；
+               None = 全部解作为同一个前沿 (原行为)
+    :return: 与 df 行对齐的 TOPSIS 得分 (0~1，越大越好)
+    """
     print("   -> 正在准备 TOPSIS 数据...")
     required_cols = ['Obj_Cost', 'Obj_Carbon', 'Obj_Efficiency']
     
@@ -107,68 +106,112 @@ def run_topsis_standard(df):
 
     eval_matrix = df[required_cols].to_numpy(dtype=float)
     # 权重: Cost=0.4, Carbon=0.2, Efficiency=0.4
-    weights = [0.4, 0.2, 0.4]
+    weights = TOPSIS_WEIGHTS
     # 方向: Min, Min, Max (False=Min, True=Max)
-    criteria = [False, False, True]
+    criteria = TOPSIS_CRITERIA
+
+    groups = [np.arange(len(df))] if by is None else list(df.groupby(by, sort=False).indices.values())
 
     try:
-        t = Topsis(eval_matrix, weights, criteria)
-        t.step_2()
-        t.step_3()
-        t.step_4()
-        t.step_5()
-        t.step_6()
-        return t.worst_similarity
+        scores, _ = topsis(stack_fronts([eval_matrix[idx] for idx in groups]), weights, criteria)
+        out = np.zeros(len(df))
+        for k, idx in enumerate(groups):
+            out[idx] = scores[k, :len(idx)]
+        return out
     except Exception as e:
         print(f"❌ TOPSIS 计算出错: {e}")
         return np.zeros(len(df))
 
 # ==========================================
-# 3. 绘图与主流程
+# 2.5 权重稳定性扫描 (Weight-Space Sensitivity)
 # ==========================================
-def plot_3d(df, best_sols):
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d')
+def run_weight_sweep(df, pick_by='LT_um', by=None, resolution=450, base_weights=TOPSIS_WEIGHTS):
+    """
+    在整个权重单纯形上 (resolution=450 时约 10 万组权重) 一次性计算 TOPSIS 最优解，
+    统计每个帕累托解“排第一”的权重区域，用于评估默认权重下最佳参数的稳健性。
 
-    colors = {80: '#1f77b4', 100: '#2ca02c', 120: '#d62728'}
-    markers = {80: 'o', 100: '^', 120: 's'}
+    :param pick_by: 在哪一列的每个分组内挑最佳解 (与 main 中按层厚挑选一致)
+    :param by: TOPSIS 归一化范围，同 run_topsis_standard (None = 所有解一起归一化)
+    :return: (汇总表, 权重网格 W, {分组: 每个权重下的最佳行位置})
+             汇总表每行一个“至少在某些权重下排第一”的解:
+             win_share = 其获胜区域占单纯形的比例，w_*_lo/hi/mean = 获胜区域内各权重的范围与重心，
+             is_base_best = 默认权重下是否为最佳，stability_radius = 默认权重到最近“换冠军”权重的距离
+    """
+    W = simplex_weights(len(TOPSIS_COLS), resolution)
+    eval_matrix = df[TOPSIS_COLS].to_numpy(dtype=float)
+    score_groups = [np.arange(len(df))] if by is None else list(df.groupby(by, sort=False).indices.values())
+    pick_codes, pick_keys = pd.factorize(df[pick_by])
 
-    for lt in [80, 100, 120]:
-        sub = df[df['LT_um'] == lt]
-        if sub.empty: continue
-        # 这里使用统一后的 Obj_ 前缀
-        ax.scatter(sub['Obj_Cost'], sub['Obj_Efficiency'], sub['Obj_Carbon'],
-                   c=colors.get(lt, 'b'), marker=markers.get(lt, 'o'), 
-                   label=rf'LT {lt} $\mu m$', s=40, alpha=0.6)
-
-    if not best_sols.empty:
-        ax.scatter(best_sols['Obj_Cost'], best_sols['Obj_Efficiency'], best_sols['Obj_Carbon'],
-                   c='gold', s=200, marker='*', edgecolors='black', label='Best Solution', zorder=10)
-        
-    ax.set_xlabel('Cost (CNY)')
-    ax.set_ylabel('Efficiency ($mm^3/s$)')
-    ax.set_zlabel('Carbon ($kg CO_2$)')
-    ax.legend()
+    labels = np.full((len(score_groups), max(len(idx) for idx in score_groups)), -1)
+    for f, idx in enumerate(score_groups):
+        labels[f, :len(idx)] = pick_codes[idx]
+    winners = topsis_weight_sweep(stack_fronts([eval_matrix[idx] for idx in score_groups]),
+                                  W, TOPSIS_CRITERIA, groups=labels)      # (F, K, G)
 
-    if not os.path.exists('results'): os.makedirs('results')
-    try:
-        plt.savefig('results/pareto_front_3d.png', dpi=300)
-        print("✅ 3D 图已保存至 results/pareto_front_3d.png")
-    except Exception as e:
-        print(f"⚠️ 保存图片失败 (可能是权限问题): {e}")
-    # plt.show() # 如需弹窗显示请取消注释
+    base = np.asarray(base_weights, dtype=float) / np.sum(base_weights)
+    base_k = int(np.argmin(np.sum((W - base)**2, axis=1)))  # 网格上离默认权重最近的点
+
+    rows, win_rows = [], {}
+    for g, key in enumerate(pick_keys):
+        f = next(f for f, idx in enumerate(score_groups) if np.any(pick_codes[idx] == g))
+        local = winners[f, :, g]
+        pos = np.where(local >= 0, score_groups[f][np.maximum(local, 0)], -1)  # df 中的行位置
+        win_rows[key] = pos
+        for r in np.unique(pos[pos >= 0]):
+            region = pos == r
+            Wr = W[region]
+            other = W[~region]
+            radius = np.min(np.linalg.norm(other - base, axis=1)) if pos[base_k] == r and len(other) else np.nan
+            row = {pick_by: key, 'row': df.index[r],
+                   'P_W': df['P_W'].iloc[r], 'V_mm_s': df['V_mm_s'].iloc[r], 'H_um': df['H_um'].iloc[r],
+                   'win_share': region.mean()}
+            for j, col in enumerate(TOPSIS_COLS):
+                name = col.replace('Obj_', 'w_')
+                row[f'{name}_lo'], row[f'{name}_hi'], row[f'{name}_mean'] = Wr[:, j].min(), Wr[:, j].max(), Wr[:, j].mean()
+            row['is_base_best'] = pos[base_k] == r
+            row['stability_radius'] = radius
+            rows.append(row)
+
+    table = pd.DataFrame(rows).sort_values([pick_by, 'win_share'], ascending=[True, False], ignore_index=True)
+    return table, W, win_rows
+
+def plot_weight_map(W, win_rows, base_weights=TOPSIS_WEIGHTS, path='results/topsis_weight_map.png'):
+    """三元权重稳定性图 (单张图直接渲染；批量出图见 figures.figure_jobs)"""
+    render_figures([(path, render_weight_map, {'W': W, 'win_rows': win_rows, 'base_weights': list(base_weights)})],
+                   n_workers=1)
+    print(f"✅ 权重稳定性三元图已保存至 {path}")
+
+# ==========================================
+# 3. 绘图与主流程
+# ==========================================
+# 并行出图的进程数 (None = CPU 核数)；输入数据未变化的图直接跳过
+PLOT_WORKERS = None
+
+def plot_3d(df, best_sols):
+    """单独渲染三维帕累托图 (稠密前沿自动稀疏化)"""
+    jobs = [job for job in figure_jobs(df, best_sols) if job[1] is render_pareto_3d]
+    render_figures(jobs, n_workers=1)
+    print(f"✅ 3D 图已保存至 {jobs[0][0]}")
+
+def plot_all(df, best_sols, weight_map=None):
+    """
+    后处理图表集：3D 前沿、各层厚二维投影、TOPSIS 得分图、权重稳定性三元图，
+    Agg 后端在工作进程中并行渲染，输入未变化的图跳过。
+    """
+    status = render_figures(figure_jobs(df, best_sols, weight_map=weight_map), n_workers=PLOT_WORKERS)
+    for path, state in status.items():
+        print(f"   -> {path}: {'已重新渲染' if state == 'rendered' else '数据未变化，跳过'}")
 
 def main():
     # 自动寻找文件
-    files = ["raw_pareto_results.xlsx", "results/raw_pareto_results.xlsx"]
-    file_path = next((f for f in files if os.path.exists(f)), None)
+    file_path = find_results("raw_pareto_results", "results/raw_pareto_results")
 
     if not file_path:
-        print("[Error] 未找到 raw_pareto_results.xlsx 文件。请先运行主程序生成该文件。")
+        print("[Error] 未找到 raw_pareto_results 结果文件。请先运行主程序生成该文件。")
         return  
     
     print(f"[Info] 读取数据: {file_path}")
-    df_opt = pd.read_excel(file_path)
+    df_opt = load_results(file_path)
 
     # --- [Step 1] 预处理：修复列名 ---
     df_opt = preprocess_data(df_opt)
@@ -181,7 +224,7 @@ def main():
 
     # --- [Step 2] 计算致密度 ---
     print("[Info] 正在计算致密度 (RD)...")
-    df_opt['RD_Predicted'] = df_opt.apply(calculate_rd_manual, axis=1)
+    df_opt['RD_Predicted'] = predict_rd(df_opt)
 
     # 筛选标准: RD >= 99.5%
     df_valid = df_opt[df_opt['RD_Predicted'] >= 99].copy()
@@ -191,6 +234,12 @@ def main():
        print("警告：没有解满足 99.5%。")
        return
     
+    # --- [Step 2.5] 非支配过滤：旧结果文件可能含被支配/重复的解，TOPSIS 与画图只看帕累托解 ---
+    objective_config = {'Obj_Cost': {'type': 'min'}, 'Obj_Carbon': {'type': 'min'}, 'Obj_Efficiency': {'type': 'max'}}
+    n_before = len(df_valid)
+    df_valid = pareto_filter(df_valid, objective_config, by='LT_um').copy()
+    print(f"   -> 非支配解数量: {len(df_valid)} (过滤掉 {n_before - len(df_valid)} 个被支配/重复解)")
+
     # --- [Step 3] 运行 TOPSIS ---
     df_valid['Score'] = run_topsis_standard(df_valid)
 
@@ -209,16 +258,26 @@ def main():
             print(f"[LT={lt}um] P={best['P_W']:.1f}W, V={best['V_mm_s']:.1f}mm/s, H={best['H_um']:.1f}um")
             print(f"   -> RD={best['RD_Predicted']:.2f}%, Cost={best['Obj_Cost']:.2f}, Score={best['Score']:.4f}")
 
+    # --- [Step 5] 权重稳定性：默认权重下的最佳解在多大的权重区域内仍排第一 ---
+    print("\n[Info] 正在扫描 TOPSIS 权重单纯形...")
+    stability, W, win_rows = run_weight_sweep(df_valid)
+    print(f"   -> 共 {len(W)} 组权重")
+    print(stability[['LT_um', 'P_W', 'V_mm_s', 'H_um', 'win_share', 'is_base_best', 'stability_radius']]
+          .to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
     # 保存最终结果
     if not os.path.exists('results'): os.makedirs('results')
     # 挑选一些易读的列进行保存
     cols_to_save = ['LT_um', 'P_W', 'V_mm_s', 'H_um', 'Obj_Cost', 'Obj_Carbon', 'Obj_Efficiency', 'RD_Predicted', 'Score']
     final_cols = [c for c in cols_to_save if c in df_valid.columns]
     
-    df_valid[final_cols].to_excel("results/final_processed_results.xlsx", index=False)
-    print(f"\n✅ 结果已保存至: results/final_processed_results.xlsx")
+    out = save_results(df_valid[final_cols], "results/final_processed_results", excel=EXPORT_EXCEL)
+    print(f"\n✅ 结果已保存至: {out}")
+    out = save_results(stability, "results/topsis_weight_stability", excel=EXPORT_EXCEL)
+    print(f"✅ 权重稳定性表已保存至: {out}")
 
-    plot_3d(df_valid, best_sols)
+    print("\n[Info] 正在渲染图表...")
+    plot_all(df_valid, best_sols, weight_map=(W, win_rows, TOPSIS_WEIGHTS))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
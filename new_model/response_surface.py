@@ -0,0 +1,141 @@
+import csv
+import os
+import numpy as np
+
+# ============================================================
+# 响应面引擎 (Response-Surface Engine)
+# ============================================================
+# 回归方程统一从系数表读取 (格式同 Design-Expert "Final Equation in Terms of Actual Factors" 导出)：
+#     response,term,coefficient
+#     RD,Intercept,136.59848
+#     RD,P^2,-0.000051
+#     RD,P*ED,-0.000122
+# 每个响应在加载时编译一次成 Python 函数 (系数内联、平方写成乘法)，
+# 同一份代码对 float 标量、numpy 数组、Pyomo 变量/表达式都成立。
+# 新增响应 (粗糙度、硬度 ...) 只需在表里追加行，不再手写多项式。
+
+# 本模块只有一份：根目录脚本通过 `from new_model.response_surface import get_surface` 使用
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_surfaces.csv')
+
+def parse_term(term):
+    """
+    'Intercept' -> ()；'P' -> (('P', 1),)；'P^2' -> (('P', 2),)；'P*ED' -> (('P', 1), ('ED', 1))
+    """
+    term = term.strip()
+    if term.lower() in ('intercept', 'constant', '1'):
+        return ()
+    powers = {}
+    for part in term.replace(' ', '').split('*'):
+        name, _, exp = part.partition('^')
+        if not name.isidentifier():
+            raise ValueError(f"Unsupported term '{term}'")
+        powers[name] = powers.get(name, 0) + (int(exp) if exp else 1)
+    return tuple(powers.items())
+
+def _monomial_code(powers):
+    parts = []
+    for name, p in powers:
+        parts.extend([name] * p if p <= 2 else [f"{name} ** {p}"])
+    return ' * '.join(parts)
+
+class ResponseSurface:
+    """
+    多项式响应面 y = Σ c_k * Π x_f^{e_kf}。
+    - surface(P=..., V=..., ...): 标量/数组/Pyomo 通用的编译函数
+    - gradient(...): {因子: ∂y/∂因子}，同样编译好
+    - design_matrix(X) / predict(X): 按 factors 列顺序的批量线性代数评估
+    - pyomo_expression(...): 为 Pyomo 模型构建表达式
+    """
+
+    def __init__(self, name, coefficients):
+        """
+        :param name: 响应名 (如 'RD')
+        :param coefficients: {项: 系数}，项的写法见 parse_term
+        """
+        self.name = name
+        self.coefficients = {t: float(c) for t, c in coefficients.items()}
+        self.terms = [parse_term(t) for t in self.coefficients]
+        self.factors = []
+        for powers in self.terms:
+            for f, _ in powers:
+                if f not in self.factors:
+                    self.factors.append(f)
+
+        coef = np.array(list(self.coefficients.values()))
+        self.exponents = np.zeros((len(self.terms), len(self.factors)), dtype=int)
+        for k, powers in enumerate(self.terms):
+            for f, p in powers:
+                self.exponents[k, self.factors.index(f)] = p
+        self.coef = coef
+
+        self._fn = self._compile_value()
+        self._grad_fn = self._compile_gradient()
+
+    def _compile_value(self):
+        pieces = []
+        for c, powers in zip(self.coef, self.terms):
+            c = float(c)
+            pieces.append(repr(c) if not powers else f"{c!r} * ({_monomial_code(powers)})")
+        return self._build(' + '.join(pieces) or '0.0')
+
+    def _compile_gradient(self):
+        partials = []
+        for f in self.factors:
+            pieces = []
+            for c, powers in zip(self.coef, self.terms):
+                d = dict(powers)
+                if f not in d:
+                    continue
+                p = d[f]
+                c = float(c) * p
+                rest = [(g, q - 1 if g == f else q) for g, q in powers if not (g == f and q == 1)]
+                pieces.append(repr(c) if not rest else f"{c!r} * ({_monomial_code(rest)})")
+            partials.append(' + '.join(pieces) or '0.0 * ' + f)
+        return self._build('(' + ', '.join(partials) + (',)' if len(partials) == 1 else ')'))
+
+    def _build(self, body):
+        src = f"def _f({', '.join(self.factors)}):\n    return {body}\n"
+        namespace = {}
+        exec(compile(src, f"<response_surface {self.name}>", 'exec'), namespace)
+        return namespace['_f']
+
+    def __call__(self, **values):
+        return self._fn(**values)
+
+    def gradient(self, **values):
+        """{因子: ∂y/∂因子}，与 __call__ 相同的输入"""
+        return dict(zip(self.factors, self._grad_fn(**values)))
+
+    def design_matrix(self, X):
+        """(N, F) 因子矩阵 (列顺序同 self.factors) -> (N, K) 设计矩阵"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return np.prod(X[:, None, :] ** self.exponents[None, :, :], axis=2)
+
+    def predict(self, X):
+        """批量评估: design_matrix(X) @ coef"""
+        return self.design_matrix(X) @ self.coef
+
+    def pyomo_expression(self, **values):
+        """
+        用 Pyomo 变量/表达式 (或常数) 代入，返回多项式表达式，
+        例如 surface.pyomo_expression(P=m.P, V=m.V, H=m.H, LT=lt, ED=m.ED)
+        """
+        return self._fn(**values)
+
+def load_surfaces(path=None):
+    """读取系数表，返回 {响应名: ResponseSurface} (保持表中顺序)"""
+    path = path or DEFAULT_TABLE
+    rows = {}
+    with open(path, newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            rows.setdefault(row['response'].strip(), {})[row['term'].strip()] = float(row['coefficient'])
+    return {name: ResponseSurface(name, coeffs) for name, coeffs in rows.items()}
+
+_SURFACES = {}
+
+def get_surface(name, path=None):
+    """按响应名取已编译的响应面 (每个系数表只加载一次)"""
+    key = path or DEFAULT_TABLE
+    if key not in _SURFACES:
+        _SURFACES[key] = load_surfaces(key)
+    return _SURFACES[key][name]
@@ -0,0 +1,182 @@
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# 列式结果存储 (Columnar Result Storage)
+# ============================================================
+# 阶段之间 (求解 -> 后处理) 用列式二进制文件传递结果：
+#   - 安装了 pyarrow 时用 Parquet (也可显式指定 .feather)
+#   - 否则用 numpy .npz (零额外依赖，每列一个类型化数组)
+# Excel 只作为给人看的可选导出；读取时仍兼容旧的 .xlsx 结果文件。
+# 流式写入 (ResultWriter) 把结果分块写成目录下的 part-xxxxx 文件，load_results 可直接读取整个目录。
+
+COLUMNAR_EXTS = ('.parquet', '.feather', '.npz')
+PARAM_COLS = ('P_W', 'V_mm_s', 'H_um')   # 工艺参数列，始终存为 float64
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def default_ext():
+    """首选格式：有 pyarrow 用 Parquet，否则 .npz"""
+    return '.parquet' if _has_pyarrow() else '.npz'
+
+def _parse_vector(val):
+    """旧 Excel 里被字符串化的 x ('[400. 900. 100.]' 或 '[400, 900, 100]') -> float 列表"""
+    if isinstance(val, str):
+        return [float(t) for t in re.split(r'[\s,\[\]]+', val) if t]
+    if isinstance(val, (list, tuple, np.ndarray)):
+        return list(np.asarray(val, dtype=float))
+    return []
+
+def normalize_columns(df):
+    """
+    统一成类型化的列：
+    - 打包的 x 列 (每行一个 [P, V, H]) 拆成 float64 的 P_W / V_mm_s / H_um 并删除 x；
+    - 工艺参数列转成 float64。
+    """
+    df = df.copy()
+    if 'x' in df.columns:
+        vecs = [_parse_vector(v) for v in df['x']]
+        for j, col in enumerate(PARAM_COLS):
+            if col not in df.columns:
+                df[col] = [v[j] if len(v) > j else np.nan for v in vecs]
+        df = df.drop(columns='x')
+    for col in PARAM_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('float64')
+    return df
+
+def _save_npz(df, path):
+    arrays = {}
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays[f'c{i}'] = values
+    np.savez(path, __columns__=np.array([str(c) for c in df.columns]), **arrays)
+
+def _load_npz(path):
+    with np.load(path, allow_pickle=False) as data:
+        cols = [str(c) for c in data['__columns__']]
+        return pd.DataFrame({col: data[f'c{i}'] for i, col in enumerate(cols)})
+
+def save_results(df, path, excel=False):
+    """
+    保存结果表。
+    :param path: 文件路径；不带扩展名时使用 default_ext()
+    :param excel: True 时额外导出同名 .xlsx (仅供查看)
+    :return: 主文件路径
+    """
+    stem, ext = os.path.splitext(path)
+    if ext not in COLUMNAR_EXTS + ('.xlsx',):
+        stem, ext = path, default_ext()
+    out = stem + ext
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+
+    df = normalize_columns(df).reset_index(drop=True)
+    if ext == '.parquet':
+        df.to_parquet(out, index=False)
+    elif ext == '.feather':
+        df.to_feather(out)
+    elif ext == '.npz':
+        _save_npz(df, out)
+    else:
+        df.to_excel(out, index=False)
+    if excel and ext != '.xlsx':
+        df.to_excel(stem + '.xlsx', index=False)
+    return out
+
+def find_results(*stems):
+    """
+    在候选路径中找第一个存在的结果文件 (列式格式优先，其次旧 .xlsx)。
+    :param stems: 不带扩展名 (或带扩展名) 的候选路径
+    :return: 路径或 None
+    """
+    for stem in stems:
+        if os.path.splitext(stem)[1] and os.path.exists(stem):
+            return stem
+        for ext in COLUMNAR_EXTS + ('.xlsx',):
+            if os.path.exists(stem + ext):
+                return stem + ext
+    return None
+
+def _read_file(path):
+    ext = os.path.splitext(path)[1]
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.feather':
+        return pd.read_feather(path)
+    if ext == '.npz':
+        return _load_npz(path)
+    return pd.read_excel(path)
+
+def load_results(path):
+    """读取结果表 (.parquet / .feather / .npz / 旧 .xlsx，或 ResultWriter 的分块目录)，并统一成类型化的列"""
+    if os.path.isdir(path):
+        parts = sorted(f for f in os.listdir(path)
+                       if f.startswith('part-') and f.endswith(COLUMNAR_EXTS) and '.tmp' not in f)
+        frames = [_read_file(os.path.join(path, f)) for f in parts]
+        return normalize_columns(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+    if not os.path.splitext(path)[1]:
+        path = find_results(path) or path
+    return normalize_columns(_read_file(path))
+
+
+class ResultWriter:
+    """
+    增量结果写入器：逐行 write()，缓冲满 flush_every 行或距上次落盘超过 flush_seconds 秒时
+    写出一个分块文件 <目录>/part-00000.npz (或 .parquet)，内存只保留当前缓冲。
+    每个分块先写临时文件再原子替换，中途被打断时已落盘的分块都是完整的。
+    """
+
+    def __init__(self, path, ext=None, flush_every=50, flush_seconds=5.0):
+        """
+        :param path: 分块目录 (不存在则创建；已有的分块会被清空)
+        :param ext: 分块格式，缺省为 default_ext()
+        """
+        self.path = path
+        self.ext = ext or default_ext()
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.n_rows = 0
+        self._buffer = []
+        self._n_parts = 0
+        self._last_flush = time.time()
+        os.makedirs(path, exist_ok=True)
+        for f in os.listdir(path):
+            if f.startswith('part-'):
+                os.remove(os.path.join(path, f))
+
+    def write(self, row):
+        """写入一行 (dict)；嵌套的 dict 值 (如 slacks) 不是列式数据，直接丢弃"""
+        self._buffer.append({k: v for k, v in row.items() if not isinstance(v, dict)})
+        self.n_rows += 1
+        if (len(self._buffer) >= self.flush_every
+                or time.time() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.time()
+        if not self._buffer:
+            return
+        part = os.path.join(self.path, f"part-{self._n_parts:05d}{self.ext}")
+        tmp = save_results(pd.DataFrame(self._buffer), part + '.tmp' + self.ext)
+        os.replace(tmp, part)
+        self._n_parts += 1
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,134 @@
+import time
+import pandas as pd
+from pareto_archive import ParetoArchive   # 在线非支配存档 (ND-tree)
+from result_io import ResultWriter         # 分块列式写入
+
+# ============================================================
+# 流式结果消费者 (Stream Consumers)
+# ============================================================
+# AugmeconRGamsStyle.stream() 每处理一个网格点产出一个事件 dict：
+#   {'event': 'solution' | 'infeasible' | 'skipped', 'lt', 'cell', 'constraints', 'result', 'reason',
+#    'n_solves', 'progress'}
+# 'skipped' 为未调用求解器的网格点 (reason: 'bypass' / 'early_exit' / 'neighbour' / 'interval' / 'covered')，
+# 因此消费者能区分被跳过的点与尚未访问的点。
+# 消费者是可调用对象 consumer(event)，可选 close()；consume() 把每个事件依次分发给所有消费者，
+# 因此写盘、存档、进度显示都在两次求解之间完成，无需等整个层厚算完。
+
+def consume(events, *consumers):
+    """
+    驱动事件流并分发给所有消费者；结束 (或出错) 时调用各消费者的 close()。
+    :return: 处理的事件数
+    """
+    n = 0
+    try:
+        for event in events:
+            n += 1
+            for consumer in consumers:
+                consumer(event)
+    finally:
+        for consumer in consumers:
+            if hasattr(consumer, 'close'):
+                consumer.close()
+    return n
+
+
+class SolutionWriter:
+    """把可行解逐行写入 ResultWriter 的分块目录 (部分结果随时可用 load_results 读取)"""
+
+    def __init__(self, path, **writer_kwargs):
+        self.writer = ResultWriter(path, **writer_kwargs)
+
+    def __call__(self, event):
+        if event['event'] != 'solution':
+            return
+        row = dict(event['result'])
+        if event['lt'] is not None:
+            row['LT_um'] = event['lt']
+        self.writer.write(row)
+
+    def close(self):
+        self.writer.close()
+
+
+class LiveFront:
+    """
+    实时帕累托前沿：按层厚 (或其他分组键) 各维护一个 ParetoArchive。
+    可以同时订阅多个层厚的事件流，随时用 front() 取出当前的非支配解。
+    """
+
+    def __init__(self, objective_config, eps=None, by='LT_um'):
+        """
+        :param eps: ε-支配容差 {目标名: 容差}，None 为精确支配
+        """
+        self.names = list(objective_config.keys())
+        self.senses = [objective_config[n]['type'] for n in self.names]
+        self.eps = [eps.get(n, 0.0) for n in self.names] if eps else None
+        self.by = by
+        self.archives = {}
+
+    def __len__(self):
+        return sum(len(a) for a in self.archives.values())
+
+    def __call__(self, event):
+        if event['event'] != 'solution':
+            return
+        res = event['result']
+        archive = self.archives.get(event['lt'])
+        if archive is None:
+            archive = self.archives[event['lt']] = ParetoArchive(self.senses, eps=self.eps)
+        archive.add([res[n] for n in self.names], res)
+
+    def front(self):
+        frames = []
+        for key, archive in self.archives.items():
+            df = pd.DataFrame(archive.items())
+            if key is not None:
+                df[self.by] = key
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class ProgressReporter:
+    """每隔 every 个求解事件或 seconds 秒打印一行进度 (网格完成比例、可行/不可行/跳过数、求解速度)"""
+
+    def __init__(self, every=10, seconds=30.0, front=None):
+        """
+        :param front: 可选的 LiveFront，一并显示当前前沿大小
+        """
+        self.every = every
+        self.seconds = seconds
+        self.front = front
+        self.n_feasible = 0
+        self.n_infeasible = 0
+        self.n_skipped = 0
+        self._start = self._last = time.time()
+        self._event = None
+
+    def __call__(self, event):
+        self._event = event
+        if event['event'] == 'skipped':
+            self.n_skipped += 1
+            return
+        if event['event'] == 'solution':
+            self.n_feasible += 1
+        else:
+            self.n_infeasible += 1
+        n = self.n_feasible + self.n_infeasible
+        if n % self.every == 0 or time.time() - self._last >= self.seconds:
+            self.report()
+
+    def report(self):
+        if self._event is None:
+            return
+        self._last = time.time()
+        elapsed = max(self._last - self._start, 1e-9)
+        n = self.n_feasible + self.n_infeasible
+        msg = (f"    [Stream] LT={self._event['lt']} grid {self._event['progress']:.0%} | "
+               f"feasible {self.n_feasible}, infeasible {self.n_infeasible}, skipped {self.n_skipped} | "
+               f"{n / elapsed:.2f} cells/s")
+        if self.front is not None:
+            msg += f" | front {len(self.front)}"
+        print(msg)
+
+    def close(self):
+        self.report()
@@ -0,0 +1,88 @@
+import sqlite3
+import hashlib
+import json
+import numpy as np
+import physics_model   # 物理模型指纹 (config + REG_COEFFS)
+
+class SolveCache:
+    """
+    持久化求解缓存 (SQLite, 内容寻址)。
+
+    键 = sha256(物理模型指纹, 层厚, 主目标, 取整后的约束, 增广权重, 种子, 热启动点, 求解器设置)。
+    只要 config.py / REG_COEFFS / 求解器参数有任何改动，键就会变化，旧结果自然失效，无需手动清理。
+    值 = 求解结果的 JSON (不可行子问题存为 null，同样可以命中)。
+    """
+
+    SCHEMA_VERSION = 1  # 结果格式变化时递增，使旧缓存整体失效
+
+    def __init__(self, path="solve_cache.sqlite", digits=8):
+        self.path = path
+        self.digits = digits  # 约束/热启动点取整的小数位数，消除浮点噪声
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._fingerprint = physics_model.model_fingerprint()
+
+    def __getstate__(self):
+        # sqlite 连接不能跨进程传递：进程池中的副本在首次使用时重新连接
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS solves (key TEXT PRIMARY KEY, result TEXT)")
+        return self._conn
+
+    def _round(self, value):
+        return round(float(value), self.digits)
+
+    def make_key(self, solver, primary_obj_name, constraint_map, seed, augmentation, warm_starts):
+        payload = {
+            'schema': self.SCHEMA_VERSION,
+            'model': self._fingerprint,
+            'lt': float(solver.lt),
+            'primary': primary_obj_name,
+            'constraints': {k: self._round(v) for k, v in sorted(constraint_map.items())},
+            'augmentation': {k: self._round(v) for k, v in sorted((augmentation or {}).items())},
+            'seed': seed,
+            'warm_starts': [[self._round(v) for v in x] for x in ([] if warm_starts is None else warm_starts)],
+            'solver': solver.settings(),
+        }
+        text = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """返回 (是否命中, 结果)；结果可能为 None (已知不可行)。"""
+        row = self.conn.execute("SELECT result FROM solves WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, self._decode(row[0])
+
+    def put(self, key, result):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO solves (key, result) VALUES (?, ?)",
+                              (key, self._encode(result)))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+    @staticmethod
+    def _encode(result):
+        if result is None:
+            return 'null'
+        return json.dumps(result, default=lambda v: v.tolist() if isinstance(v, np.ndarray) else float(v))
+
+    @staticmethod
+    def _decode(text):
+        result = json.loads(text)
+        if result is not None:
+            result['x'] = np.array(result['x'])
+        return result
@@ -0,0 +1,255 @@
+import json
+import os
+import sys
+import time
+
+try:
+    import resource   # 仅 POSIX；Windows 上没有，峰值内存记为 None
+except ImportError:
+    resource = None
+
+# ============================================================
+# 求解阶段遥测 (Solver Telemetry)
+# ============================================================
+# 钩子协议 (鸭子类型，继承 SolverHooks 即可只覆盖需要的方法)：
+#   on_phase(phase, **info)          阶段事件
+#       - 控制器阶段: 'run' / 'payoff' / 'grid' / 'refine'，info 含 status='start' | 'end'
+#       - 控制器事件: 'prefilter'  派发前筛掉一个网格点 (不调用求解器): cell, constraints,
+#                                  reason = 'neighbour' | 'interval'
+#       - 求解器阶段 (发生在某个网格点内部):
+#           'presolve'   区间预处理收缩搜索盒子: seconds, infeasible (True = 证明子问题不可行，未跑 DE)
+#           'bnb'        区间分支定界 (IntervalBBSolver): seconds, boxes, gap, certified
+#           'de'         DE 一次运行: seconds, evals, success
+#           'slsqp'      SLSQP 一次精修: seconds, iterations, success
+#           'fallback'   回退事件: reason = 'slsqp_failed' (精修失败退回 DE 起点)
+#                                         | 'cold_de' (热启动 DE 失败，冷启动 DE 重试)
+#           'warm_start' 热启动点已严格可行，跳过 DE
+#           'cache_hit'  持久化求解缓存命中，没有实际求解
+#   on_cell_start(cell, constraints)   控制器开始求解一个网格点 (支付表阶段 cell 为主目标名，细化阶段为 None)
+#   on_cell_end(cell, result, **info)  网格点求解结束 (result 为 None 表示不可行)
+# 控制器和求解器的 telemetry 属性默认为 None，此时每个钩子点只多一次 `is not None` 判断。
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存 (MB)；平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+class SolverHooks:
+    """空实现的钩子基类：子类只需覆盖关心的回调"""
+
+    def on_phase(self, phase, **info):
+        pass
+
+    def on_cell_start(self, cell, constraints):
+        pass
+
+    def on_cell_end(self, cell, result, **info):
+        pass
+
+
+class PhaseCollector(SolverHooks):
+    """
+    并行 worker 内使用：把求解器的阶段事件暂存下来，随结果一起传回主进程，
+    再由控制器按顺序重放给主进程的钩子。
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    def on_phase(self, phase, **info):
+        self.phases.append((phase, info))
+
+
+class TraceRecorder(SolverHooks):
+    """
+    把遥测写成 JSONL 轨迹，每行一条记录：
+        {'type': 'phase', 'phase', 'status', 't', ...}   控制器阶段开始/结束 (t 为相对开始的秒数)
+        {'type': 'cell', 'phase', 'cell', 'constraints', 'seconds', 'feasible',
+         'presolve_seconds', 'presolve_infeasible', 'bnb_boxes', 'bnb_uncertified',
+         'de_runs', 'de_seconds', 'de_evals', 'slsqp_runs', 'slsqp_seconds', 'slsqp_iterations',
+         'slsqp_failures', 'fallbacks', 'fallback_reasons', 'warm_starts', 'cache_hits', 'peak_rss_mb'}
+        {'type': 'prefilter', 'phase', 'cell', 'constraints', 'reason'}   派发前被筛掉的网格点
+        {'type': 'summary', ...}                         close() 时写入汇总
+    同时累计汇总量，report() 按 PyAugmecon 日志结尾的格式打印。
+    """
+
+    CELL_FIELDS = ('presolve_seconds', 'presolve_infeasible', 'bnb_boxes', 'bnb_uncertified', 'de_runs', 'de_seconds', 'de_evals', 'slsqp_runs', 'slsqp_seconds',
+                   'slsqp_iterations', 'slsqp_failures', 'fallbacks', 'warm_starts', 'cache_hits')
+
+    def __init__(self, path=None, label=None):
+        """
+        :param path: JSONL 轨迹文件 (None = 只在内存中汇总，不写文件)
+        :param label: 写进每条记录的标签 (如层厚)，便于合并多个轨迹
+        """
+        self.path = path
+        self.label = label
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._file = open(path, 'w', encoding='utf-8')
+        self._start = time.perf_counter()
+        self._phase = None          # 当前控制器阶段
+        self._phase_start = {}
+        self.phase_seconds = {}     # {阶段名: 累计耗时}
+        self.runs = []              # 每次 run 结束时的前沿信息
+        self._cell = None           # 正在求解的网格点的累计量
+        self.totals = dict.fromkeys(self.CELL_FIELDS, 0)
+        self.totals.update(cells=0, feasible=0, infeasible=0)
+        self.prefiltered = {}       # {筛查原因: 跳过的网格点数}
+        self.peak_rss_mb = None
+
+    def _write(self, record):
+        if self._file is None:
+            return
+        if self.label is not None:
+            record = {'label': self.label, **record}
+        self._file.write(json.dumps(record, default=_jsonable) + '\n')
+
+    # ---------------- 钩子 ----------------
+    def on_phase(self, phase, **info):
+        cell = self._cell
+        if cell is not None:
+            # 求解器阶段：累计到当前网格点
+            if phase == 'presolve':
+                cell['presolve_seconds'] += info.get('seconds', 0.0)
+                cell['presolve_infeasible'] += bool(info.get('infeasible'))
+            elif phase == 'bnb':
+                cell['bnb_boxes'] += info.get('boxes', 0)
+                cell['bnb_uncertified'] += not info.get('certified', True)
+            elif phase == 'de':
+                cell['de_runs'] += 1
+                cell['de_seconds'] += info.get('seconds', 0.0)
+                cell['de_evals'] += info.get('evals', 0)
+            elif phase == 'slsqp':
+                cell['slsqp_runs'] += 1
+                cell['slsqp_seconds'] += info.get('seconds', 0.0)
+                cell['slsqp_iterations'] += info.get('iterations', 0)
+                cell['slsqp_failures'] += not info.get('success', True)
+            elif phase == 'fallback':
+                cell['fallbacks'] += 1
+                cell['fallback_reasons'].append(info.get('reason'))
+            elif phase == 'warm_start':
+                cell['warm_starts'] += 1
+            elif phase == 'cache_hit':
+                cell['cache_hits'] += 1
+            return
+
+        if phase == 'prefilter':
+            reason = info.get('reason')
+            self.prefiltered[reason] = self.prefiltered.get(reason, 0) + 1
+            self._write({'type': 'prefilter', 'phase': self._phase, **info})
+            return
+
+        now = time.perf_counter()
+        status = info.get('status')
+        if status == 'start':
+            self._phase = phase
+            self._phase_start[phase] = now
+        elif status == 'end':
+            started = self._phase_start.pop(phase, None)
+            if started is not None:
+                self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + now - started
+            if phase == 'run':
+                self.runs.append(info)
+            if self._phase == phase:
+                self._phase = None
+        self._write({'type': 'phase', 'phase': phase, 't': round(now - self._start, 6), **info})
+        if status == 'end' and self._file is not None:
+            self._file.flush()
+
+    def on_cell_start(self, cell, constraints):
+        self._cell = dict.fromkeys(self.CELL_FIELDS, 0)
+        self._cell.update(cell=cell, constraints=constraints, fallback_reasons=[],
+                          t0=time.perf_counter())
+
+    def on_cell_end(self, cell, result, **info):
+        rec = self._cell
+        self._cell = None
+        if rec is None:
+            return
+        seconds = info.get('seconds')
+        if seconds is None:
+            seconds = time.perf_counter() - rec.pop('t0')
+        else:
+            rec.pop('t0')
+        rss = info.get('peak_rss_mb')
+        if rss is None:
+            rss = peak_rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+
+        for key in self.CELL_FIELDS:
+            self.totals[key] += rec[key]
+        self.totals['cells'] += 1
+        self.totals['feasible' if result is not None else 'infeasible'] += 1
+        self._write({'type': 'cell', 'phase': self._phase, 'cell': rec.pop('cell'),
+                     'constraints': rec.pop('constraints'), 'seconds': seconds,
+                     'feasible': result is not None, **rec, 'peak_rss_mb': rss})
+
+    # ---------------- 汇总 ----------------
+    def summary(self):
+        """汇总 dict (运行时间、求解数、各阶段耗时/评估数/回退次数、峰值内存、前沿大小)"""
+        t = self.totals
+        out = {'runtime': time.perf_counter() - self._start, 'models_solved': t['cells'],
+               'infeasibilities': t['infeasible'], 'solutions': t['feasible'],
+               **{k: t[k] for k in self.CELL_FIELDS},
+               'prefiltered': dict(self.prefiltered),
+               'phase_seconds': dict(self.phase_seconds), 'peak_rss_mb': self.peak_rss_mb}
+        if self.runs:
+            out['pareto_solutions'] = sum(r.get('pareto', 0) for r in self.runs)
+            hvs = [r['hypervolume'] for r in self.runs if r.get('hypervolume') is not None]
+            if hvs:
+                out['hypervolume'] = hvs[-1] if len(hvs) == 1 else hvs
+        return out
+
+    def report(self):
+        """按 PyAugmecon 日志结尾的格式打印汇总"""
+        s = self.summary()
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        lines = [f"Runtime: {s['runtime']:.2f} seconds",
+                 f"Models solved: {s['models_solved']}",
+                 f"Infeasibilities: {s['infeasibilities']}",
+                 f"Solutions: {s['solutions']}"]
+        if 'pareto_solutions' in s:
+            lines.append(f"Unique Pareto solutions: {s['pareto_solutions']}")
+        if 'hypervolume' in s:
+            lines.append(f"Hypervolume indicator: {s['hypervolume']}")
+        if s['prefiltered']:
+            lines.append(f"Prefiltered: {sum(s['prefiltered'].values())} cells ("
+                         + ", ".join(f"{k} {v}" for k, v in s['prefiltered'].items()) + ")")
+        lines += [f"Presolve: {s['presolve_infeasible']} proven infeasible, {s['presolve_seconds']:.2f} seconds",
+                  f"B&B: {s['bnb_boxes']} boxes, {s['bnb_uncertified']} uncertified",
+                  f"DE: {s['de_runs']} runs, {s['de_evals']} evaluations, {s['de_seconds']:.2f} seconds",
+                  f"SLSQP: {s['slsqp_runs']} runs, {s['slsqp_iterations']} iterations, "
+                  f"{s['slsqp_failures']} failures, {s['slsqp_seconds']:.2f} seconds",
+                  f"Fallbacks: {s['fallbacks']}, warm starts: {s['warm_starts']}, cache hits: {s['cache_hits']}"]
+        if s['phase_seconds']:
+            lines.append("Phases: " + ", ".join(f"{k} {v:.2f} s" for k, v in s['phase_seconds'].items()))
+        if s['peak_rss_mb'] is not None:
+            lines.append(f"Peak RSS: {s['peak_rss_mb']:.1f} MB")
+        header = f"==============================" + (f" {self.label}" if self.label is not None else "")
+        print("\n".join([header] + [f"[{stamp}] {line}" for line in lines]))
+
+    def close(self):
+        """写入汇总记录并关闭轨迹文件"""
+        if self._file is not None:
+            self._write({'type': 'summary', **self.summary()})
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _jsonable(obj):
+    """numpy 标量/数组转成 JSON 可序列化的 Python 对象"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
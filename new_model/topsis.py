@@ -2,12 +2,246 @@ import numpy as np
 import warnings
 
 
+# ============================================================
+# Vectorized, stateless TOPSIS core
+# ============================================================
+# evaluation: (..., M, N) tensor -- e.g. (F fronts, M alternatives, N criteria).
+# Fronts of different sizes are padded with NaN rows (see stack_fronts); padded rows
+# take no part in normalization / ideal points and get closeness NaN, rank 0.
+
+def stack_fronts(fronts):
+    """
+    Pad a list of (M_f, N) matrices into one (F, max M_f, N) tensor filled with NaN.
+    """
+    fronts = [np.asarray(f, dtype="float") for f in fronts]
+    n_cols = fronts[0].shape[1] if fronts else 0
+    out = np.full((len(fronts), max((len(f) for f in fronts), default=0), n_cols), np.nan)
+    for k, f in enumerate(fronts):
+        out[k, :len(f)] = f
+    return out
+
+
+def topsis_closeness(evaluation, weights, criteria):
+    """
+    TOPSIS for a batch of decision matrices in one broadcast pass.
+
+    :param evaluation: (..., M, N) array, NaN rows are padding
+    :param weights: (N,) or (..., N) weights, normalized to sum 1 per front
+    :param criteria: (N,) True/1 = benefit (maximize), False/0 = cost (minimize)
+    :return: (closeness, best_similarity, weighted_normalized, best_alt, worst_alt)
+             closeness = d_worst / (d_worst + d_best), shape (..., M)
+    """
+    X = np.asarray(evaluation, dtype="float")
+    valid = ~np.any(np.isnan(X), axis=-1)               # (..., M)
+    Xz = np.where(valid[..., None], X, 0.0)
+
+    w = np.asarray(weights, dtype="float")
+    w = w / np.sum(w, axis=-1, keepdims=True)
+    benefit = np.asarray(criteria, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Step 2 + 3: vector normalization per criterion, then weighting
+        norm = np.sqrt(np.sum(Xz**2, axis=-2, keepdims=True))
+        V = Xz / norm * np.expand_dims(w, -2)
+
+        # Step 4: ideal / anti-ideal over the valid rows of each front
+        v_max = np.max(np.where(valid[..., None], V, -np.inf), axis=-2, keepdims=True)
+        v_min = np.min(np.where(valid[..., None], V, np.inf), axis=-2, keepdims=True)
+        best_alt = np.where(benefit, v_max, v_min)
+        worst_alt = np.where(benefit, v_min, v_max)
+
+        # Step 5 + 6: L2 distances and relative closeness
+        d_best = np.sqrt(np.sum((V - best_alt)**2, axis=-1))
+        d_worst = np.sqrt(np.sum((V - worst_alt)**2, axis=-1))
+        closeness = d_worst / (d_worst + d_best)
+        best_similarity = d_best / (d_worst + d_best)
+
+    closeness = np.where(valid, closeness, np.nan)
+    best_similarity = np.where(valid, best_similarity, np.nan)
+    return closeness, best_similarity, V, best_alt[..., 0, :], worst_alt[..., 0, :]
+
+
+def rank_scores(scores):
+    """
+    Rank alternatives within each front: 1 = highest score, ties keep input order,
+    NaN (padding) rows get rank 0.
+    """
+    scores = np.asarray(scores, dtype="float")
+    valid = ~np.isnan(scores)
+    order = np.argsort(np.where(valid, -scores, np.inf), axis=-1, kind="stable")
+    ranks = np.empty(scores.shape, dtype=int)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[-1] + 1), axis=-1)
+    return np.where(valid, ranks, 0)
+
+
+def topsis(evaluation, weights, criteria):
+    """
+    Score and rank (F, M, N) fronts (or a single (M, N) matrix) without per-element loops.
+
+    :return: (closeness, ranks) -- both shaped like evaluation[..., 0]
+    """
+    closeness = topsis_closeness(evaluation, weights, criteria)[0]
+    return closeness, rank_scores(closeness)
+
+
+def simplex_weights(n_criteria, resolution):
+    """
+    Every weight vector with components k / resolution summing to 1,
+    i.e. C(resolution + N - 1, N - 1) rows (N = 3, resolution = 450 -> 101,926 vectors).
+    """
+    from itertools import combinations
+    bars = np.array(list(combinations(range(resolution + n_criteria - 1), n_criteria - 1)), dtype=int)
+    bars = bars.reshape(len(bars), n_criteria - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars,
+                       np.full((len(bars), 1), resolution + n_criteria - 1)])
+    return (np.diff(edges, axis=1) - 1) / resolution
+
+
+def topsis_weight_sweep(evaluation, weight_grid, criteria, groups=None, chunk=20000):
+    """
+    Winner of TOPSIS for every weight vector in weight_grid, without re-running TOPSIS per weight.
+
+    With w >= 0 the ideal points scale with w, so the squared distances are
+    d^2 = (w ** 2) @ ((R - R_ideal) ** 2).T -- one matrix product per chunk of weights.
+
+    :param evaluation: (..., M, N) array, NaN rows are padding
+    :param weight_grid: (K, N) non-negative weights (need not sum to 1)
+    :param criteria: (N,) True/1 = benefit, False/0 = cost
+    :param groups: optional (..., M) integer labels >= 0 (-1 = ignore); the winner is then
+                   picked separately inside each label (scores still normalized over the whole front)
+    :return: (..., K) winner indices, or (..., K, G) when groups is given; -1 = no valid alternative
+    """
+    X = np.asarray(evaluation, dtype="float")
+    valid = ~np.any(np.isnan(X), axis=-1)
+    Xz = np.where(valid[..., None], X, 0.0)
+    benefit = np.asarray(criteria, dtype=bool)
+    W2 = np.asarray(weight_grid, dtype="float")**2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R = Xz / np.sqrt(np.sum(Xz**2, axis=-2, keepdims=True))
+        r_max = np.max(np.where(valid[..., None], R, -np.inf), axis=-2, keepdims=True)
+        r_min = np.min(np.where(valid[..., None], R, np.inf), axis=-2, keepdims=True)
+    Db = (R - np.where(benefit, r_max, r_min))**2   # (..., M, N)
+    Dw = (R - np.where(benefit, r_min, r_max))**2
+
+    if groups is None:
+        labels = [np.where(valid, 0, -1)]
+    else:
+        groups = np.asarray(groups, dtype=int)
+        labels = [np.where(valid & (groups == g), 0, -1) for g in range(int(groups.max()) + 1)]
+
+    out = np.full(X.shape[:-2] + (len(W2), len(labels)), -1, dtype=int)
+    for s in range(0, len(W2), chunk):
+        w2 = W2[s:s + chunk]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_best = np.sqrt(np.einsum('kn,...mn->...km', w2, Db))
+            d_worst = np.sqrt(np.einsum('kn,...mn->...km', w2, Dw))
+            closeness = d_worst / (d_worst + d_best)
+        closeness = np.where(np.isnan(closeness), -np.inf, closeness)
+        for g, lab in enumerate(labels):
+            member = (lab == 0)[..., None, :]                 # (..., 1, M)
+            c = np.where(member, closeness, -np.inf)
+            win = np.argmax(c, axis=-1)
+            has = np.any(member, axis=-1) & np.isfinite(np.max(c, axis=-1))
+            out[..., s:s + chunk, g] = np.where(has, win, -1)
+    return out if groups is not None else out[..., 0]
+
+
+class IncrementalTopsis():
+    """
+    Streaming TOPSIS ranker for solutions that arrive one at a time.
+
+    State updates are O(N) per point: running per-criterion sums of squares (compensated)
+    and the raw max/min of each criterion. Because x -> x / norm * w is monotone, the ideal
+    and anti-ideal points follow directly from the raw max/min, so nothing is re-scanned
+    on insertion; only removing a current extreme marks max/min for a lazy rescan.
+    scores() re-scores all kept alternatives in one vectorized pass (every score moves
+    whenever the normalization does). With exact=True the column norms are recomputed
+    exactly as topsis_closeness does, so scores are bit-identical to the batch result.
+    """
+
+    def __init__(self, weights, criteria):
+        self.weights = np.asarray(weights, dtype="float") / np.sum(weights)
+        self.benefit = np.asarray(criteria, dtype=bool)
+        n = len(self.weights)
+        self._rows = {}                 # key -> row, insertion order = batch row order
+        self._sumsq = np.zeros(n)
+        self._comp = np.zeros(n)        # Neumaier compensation of the running sums
+        self._max = np.full(n, -np.inf)
+        self._min = np.full(n, np.inf)
+        self._stale = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _accumulate(self, values):
+        t = self._sumsq + values
+        big = np.abs(self._sumsq) >= np.abs(values)
+        self._comp += np.where(big, (self._sumsq - t) + values, (values - t) + self._sumsq)
+        self._sumsq = t
+
+    def add(self, key, row):
+        """Add alternative `key` with criterion values `row`"""
+        row = np.asarray(row, dtype="float")
+        if key in self._rows:
+            self.remove(key)
+        self._rows[key] = row
+        self._accumulate(row**2)
+        self._max = np.maximum(self._max, row)
+        self._min = np.minimum(self._min, row)
+
+    def remove(self, key):
+        """Drop alternative `key` (e.g. when the Pareto archive discards it)"""
+        row = self._rows.pop(key)
+        self._accumulate(-row**2)
+        if np.any(row >= self._max) or np.any(row <= self._min):
+            self._stale = True
+
+    def scores(self, exact=False):
+        """
+        :return: (keys, closeness) for the current alternatives, keys in insertion order
+        """
+        keys = list(self._rows)
+        if not keys:
+            return keys, np.empty(0)
+        X = np.array([self._rows[k] for k in keys])
+        if self._stale:
+            self._max, self._min = X.max(axis=0), X.min(axis=0)
+            self._stale = False
+        sumsq = np.sum(X**2, axis=0) if exact else self._sumsq + self._comp
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            norm = np.sqrt(sumsq)
+            V = X / norm * self.weights
+            v_max = self._max / norm * self.weights
+            v_min = self._min / norm * self.weights
+            best_alt = np.where(self.benefit, v_max, v_min)
+            worst_alt = np.where(self.benefit, v_min, v_max)
+            d_best = np.sqrt(np.sum((V - best_alt)**2, axis=-1))
+            d_worst = np.sqrt(np.sum((V - worst_alt)**2, axis=-1))
+            closeness = d_worst / (d_worst + d_best)
+        return keys, closeness
+
+    def ranking(self, exact=False):
+        """Keys ordered best first (same tie rule as rank_scores)"""
+        keys, closeness = self.scores(exact)
+        order = np.argsort(np.where(np.isnan(closeness), np.inf, -closeness), kind="stable")
+        return [keys[i] for i in order]
+
+    def best(self, exact=False):
+        """(key, closeness) of the current best compromise, or (None, nan) when empty"""
+        keys, closeness = self.scores(exact)
+        if not keys or np.all(np.isnan(closeness)):
+            return None, np.nan
+        i = int(np.nanargmax(closeness))
+        return keys[i], float(closeness[i])
+
+
 class Topsis():
-    evaluation_matrix = np.array([])  # Matrix
-    weighted_normalized = np.array([])  # Weight matrix
-    normalized_decision = np.array([])  # Normalisation matrix
-    M = 0  # Number of rows
-    N = 0  # Number of columns
+    """
+    Step-by-step wrapper kept for the original API (step_2 ... step_6, calc).
+    All steps run on the vectorized core; state lives on the instance.
+    """
 
     '''
 	Create an evaluation matrix consisting of m alternatives and n criteria,
@@ -37,15 +271,9 @@ class Topsis():
 
     def step_2(self):
         # normalized scores
-        self.normalized_decision = np.copy(self.evaluation_matrix)
-        sqrd_sum = np.zeros(self.column_size)
-        for i in range(self.row_size):
-            for j in range(self.column_size):
-                sqrd_sum[j] += self.evaluation_matrix[i, j]**2
-        for i in range(self.row_size):
-            for j in range(self.column_size):
-                self.normalized_decision[i,
-                                         j] = self.evaluation_matrix[i, j]/(sqrd_sum[j]**0.5)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.normalized_decision = self.evaluation_matrix / \
+                np.sqrt(np.sum(self.evaluation_matrix**2, axis=0))
 
     '''
 	# Step 3
@@ -53,11 +281,7 @@ class Topsis():
 	'''
 
     def step_3(self):
-        from pdb import set_trace
-        self.weighted_normalized = np.copy(self.normalized_decision)
-        for i in range(self.row_size):
-            for j in range(self.column_size):
-                self.weighted_normalized[i, j] *= self.weight_matrix[j]
+        self.weighted_normalized = self.normalized_decision * self.weight_matrix
 
     '''
 	# Step 4
@@ -65,17 +289,11 @@ class Topsis():
 	'''
 
     def step_4(self):
-        self.worst_alternatives = np.zeros(self.column_size)
-        self.best_alternatives = np.zeros(self.column_size)
-        for i in range(self.column_size):
-            if self.criteria[i]:
-                self.worst_alternatives[i] = min(
-                    self.weighted_normalized[:, i])
-                self.best_alternatives[i] = max(self.weighted_normalized[:, i])
-            else:
-                self.worst_alternatives[i] = max(
-                    self.weighted_normalized[:, i])
-                self.best_alternatives[i] = min(self.weighted_normalized[:, i])
+        benefit = self.criteria.astype(bool)
+        v_max = np.max(self.weighted_normalized, axis=0)
+        v_min = np.min(self.weighted_normalized, axis=0)
+        self.worst_alternatives = np.where(benefit, v_min, v_max)
+        self.best_alternatives = np.where(benefit, v_max, v_min)
 
     '''
 	# Step 5
@@ -88,23 +306,10 @@ class Topsis():
 	'''
 
     def step_5(self):
-        self.worst_distance = np.zeros(self.row_size)
-        self.best_distance = np.zeros(self.row_size)
-
-        self.worst_distance_mat = np.copy(self.weighted_normalized)
-        self.best_distance_mat = np.copy(self.weighted_normalized)
-
-        for i in range(self.row_size):
-            for j in range(self.column_size):
-                self.worst_distance_mat[i][j] = (self.weighted_normalized[i][j]-self.worst_alternatives[j])**2
-                self.best_distance_mat[i][j] = (self.weighted_normalized[i][j]-self.best_alternatives[j])**2
-                
-                self.worst_distance[i] += self.worst_distance_mat[i][j]
-                self.best_distance[i] += self.best_distance_mat[i][j]
-
-        for i in range(self.row_size):
-            self.worst_distance[i] = self.worst_distance[i]**0.5
-            self.best_distance[i] = self.best_distance[i]**0.5
+        self.worst_distance_mat = (self.weighted_normalized - self.worst_alternatives)**2
+        self.best_distance_mat = (self.weighted_normalized - self.best_alternatives)**2
+        self.worst_distance = np.sqrt(np.sum(self.worst_distance_mat, axis=1))
+        self.best_distance = np.sqrt(np.sum(self.best_distance_mat, axis=1))
 
     '''
 	# Step 6
@@ -112,18 +317,11 @@ class Topsis():
 	'''
 
     def step_6(self):
-        np.seterr(all='ignore')
-        self.worst_similarity = np.zeros(self.row_size)
-        self.best_similarity = np.zeros(self.row_size)
-
-        for i in range(self.row_size):
-            # calculate the similarity to the worst condition
-            self.worst_similarity[i] = self.worst_distance[i] / \
-                (self.worst_distance[i]+self.best_distance[i])
-
-            # calculate the similarity to the best condition
-            self.best_similarity[i] = self.best_distance[i] / \
-                (self.worst_distance[i]+self.best_distance[i])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total = self.worst_distance + self.best_distance
+            # similarity to the worst condition (the TOPSIS score) / to the best condition
+            self.worst_similarity = self.worst_distance / total
+            self.best_similarity = self.best_distance / total
     
     def ranking(self, data):
         return [i+1 for i in data.argsort()]
@@ -1,79 +1,49 @@
 import pandas as pd                           # for data handling in order to store results and exchange to excel
 import numpy as np                            # in order to handle numerical arrays
-import matplotlib.pyplot as plt               # for plotting
-from mpl_toolkits.mplot3d import Axes3D       # for 3D plotting
 import os                                     #做文件/路径判断，比如 os.path.exists()
+from new_model.response_surface import get_surface  # 回归方程 (new_model 中唯一的响应面引擎)
+from new_model.result_io import load_results, save_results, find_results  # 列式结果文件 (兼容旧 .xlsx)
+from new_model.figures import render_figures, figure_jobs  # 无界面 (Agg) 并行绘图，输入未变化的图跳过
 
 
 # import topsis module
 try:
-    from topsis import Topsis
+    from topsis import topsis, stack_fronts
 except ImportError:
     print("[Error] topsis.py module not found. Please ensure it is in the same directory.")
     exit()
 
 
 # ==========================================
-# 1. 回归模型系数
+# 1. 回归模型 (系数表 new_model/response_surfaces.csv，由 response_surface 编译)
 # ==========================================
-REG_COEFFS = {                                #regression coefficients for energy density calculation
-    'Intercept': 136.59848,                   # 截距 (常数项)
-    # --- 一次项 ---
-    'P':0.094923,                             # 对应Power的系数
-    'V':-0.028654,                            # 对应Speed的系数
-    'H':-0.201185,                            # 对应Hatch的系数
-    'LT':-0.108546,                           # 对应Layer Thickness的系数
-    'ED':-0.524864,                           # 对应 Energy Density
-
-    # --- 二次项 ---
-    'P^2':  -0.000051,
-    'V^2':  0.00000883923,
-    'H^2':  0.000575,
-    'ED^2': 0.002459,
-
-    # --- 交互项 ---
-    'P*V':   -0.000012,
-    'P*H':   -0.000123,
-    'P*ED':  -0.000122,
-    'V*H':   0.000013,
-    'V*ED':  0.000096,
-    'H*ED':  0.000450
-}
+RD_SURFACE = get_surface('RD')
+
+def predict_rd(df):
+    # 整列向量化：ED = P / (V * H * LT) * 10^6，代入多项式 (Eq.2)，物理截断 RD <= 100%
+    P, V, H, LT = (df[c].to_numpy(dtype=float) for c in ('P_W', 'V_mm_s', 'H_um', 'LT_um'))
+    denom = V * H * LT
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ED = P / (denom * 1e-6)
+        rd = np.minimum(RD_SURFACE(P=P, V=V, H=H, LT=LT, ED=ED), 100.0)
+    return np.where(denom == 0, 0.0, rd)   # 防止除 0 (正常物理参数不会是 0)
 
 def calculate_rd_manual(row):
-    # 1. 获取变量 (从优化结果的列名 P_W 等提取)
-    P = row['P_W']
-    V = row['V_mm_s']
-    H = row['H_um']
-    LT = row['LT_um']
-
-    # 2. 计算 Energy Density (ED)
-    # 公式: ED = P / (V * H * LT) * 10^6
-    # 单位换算: V(mm/s), H(um=10^-3 mm), LT(um=10^-3 mm)
-    if V * H * LT == 0: return 0  #是防止除 0 崩溃（虽然正常物理参数不会是 0）
-    ED = P / (V * H * LT * 1e-6)
-
-    # 3. 提取系数 (为了写公式方便)
-    c = REG_COEFFS                #为了写公式方便，给字典起一个短名字 c
-
-    # 4. 代入多项式公式 (Eq.2)
-    # 这里的结构与 Design-Expert 里的公式一致
-    rd_val = (
-        c['Intercept'] +
-        c['P']*P + c['V']*V + c['H']*H + c['LT']*LT + c['ED']*ED +
-        c['P^2']*(P**2) + c['V^2']*(V**2) + c['H^2']*(H**2) + c['ED^2']*(ED**2) +
-        c['P*V']*(P*V) + c['P*H']*(P*H) + c['P*ED']*(P*ED) +
-        c['V*H']*(V*H) + c['V*ED']*(V*ED) + c['H*ED']*(H*ED)
-    )
-
-    # 物理截断：RD 最大 100% （如果回归稍微 overshoot（比如算出 100.2），就把它截断成 100）
-    return min(rd_val, 100.0)
+    # 单行版本 (保留旧接口)：直接标量求值，与 predict_rd 逐位一致 (不为单行构造 DataFrame)
+    P, V, H, LT = (float(row[c]) for c in ('P_W', 'V_mm_s', 'H_um', 'LT_um'))
+    denom = V * H * LT
+    if denom == 0:
+        return 0.0
+    ED = P / (denom * 1e-6)
+    return min(float(RD_SURFACE(P=P, V=V, H=H, LT=LT, ED=ED)), 100.0)
 
 
 # ==========================================
 # 2. 对接标准 TOPSIS 算法 (直接使用 topsis.py 模块)
 # ==========================================
-def run_topsis_standard(df):
+def run_topsis_standard(df, by=None):
+    # by: 分组列 (如 'LT_um' 或 ['LT_um', 'run'])，每组单独作为一个前沿打分，
+    #     所有组堆叠成 (F, M, N) 张量一次算完；None = 全部解作为同一个前沿
     print("   -> 正在准备 TOPSIS 数据...")
 
     # 1. 构建评价矩阵 (只包含目标函数列)
@@ -83,28 +53,25 @@ def run_topsis_standard(df):
     weights = [0.4, 0.2, 0.4]  # 权重总和没有硬性要求，可以是任意正数
 
     # 3. 准备方向标准 (Criteria)
-    # 根据 topsis.py 的逻辑 (step_4):
+    # 根据 topsis.py 的逻辑:
     # If criteria[i] is True/1 -> Maximize (越大越好)
     # If criteria[i] is False/0 -> Minimize (越小越好)
     # 我们的目标: Cost(Min), Carbon(Min), Efficiency(Max)
     criteria = [False, False, True]
 
-    # 4. 创建 Topsis 对象
+    # 4. 按组堆叠成 (F, M, N) 张量 (不同组行数不同，用 NaN 补齐)
+    groups = [np.arange(len(df))] if by is None else list(df.groupby(by, sort=False).indices.values())
+
     try :
-        t = Topsis(eval_matrix, weights, criteria)
-
-        # 5. 执行计算步骤
-        # 我们不直接调用 t.calc()，因为它会打印大量中间步骤，刷屏太乱。
-        # 我们手动调用核心步骤即可：
-        t.step_2() # 归一化
-        t.step_3() # 加权
-        t.step_4() # 确定理想解/负理想解
-        t.step_5() # 计算距离
-        t.step_6() # 计算相似度 (worst_similarity)
-
-        # 6. 获取结果
-        # worst_similarity 就是 TOPSIS 得分 (接近1为最优)
-        return t.worst_similarity
+        # 5. 一次向量化计算所有组：归一化 -> 加权 -> 理想解/负理想解 -> 距离 -> 相对贴近度
+        # 不打印中间步骤；closeness 就是 TOPSIS 得分 (接近1为最优)
+        scores, _ = topsis(stack_fronts([eval_matrix[idx] for idx in groups]), weights, criteria)
+
+        # 6. 按原行顺序取回得分
+        out = np.zeros(len(df))
+        for k, idx in enumerate(groups):
+            out[idx] = scores[k, :len(idx)]
+        return out
     
     except Exception as e:
         print(f"❌ TOPSIS 计算出错: {e}")
@@ -115,53 +82,28 @@ def run_topsis_standard(df):
 # 3. 绘图与主流程（三维帕托图 + 最优解高亮）
 # ==========================================
 def plot_3d(df, best_sols):         # df：所有通过 RD 筛选、参加 TOPSIS 的解（很多点）, best_sols：TOPSIS 最优解（少量点）
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d') #111：表示“1 行 1 列中的第 1 个子图”，也就是只有一个大图  projection='3d'：告诉 Matplotlib 使用 3D 坐标轴（来自 Axes3D）。
-
-    colors = {80: '#1f77b4', 100: '#2ca02c', 120: '#d62728'}  # 80 μm → 蓝色 100 μm → 绿色 120 μm → 红色
-    markers = {80: 'o', 100: '^', 120: 's'}                          #80 μm → 圆点 o 100 μm → 三角形 ^ 120 μm → 方形 s
-
-
-    for lt in [80, 100, 120]:
-        sub = df[df['LT_um'] == lt]
-        if sub.empty: continue
-        ax.scatter(sub['Obj_Cost'], sub['Obj_Efficiency'], sub['Obj_Carbon'],
-                   c=colors[lt], marker=markers[lt], label=rf'LT {lt} $\mu m$', s=40, alpha=0.6)
-        
-
-    if not best_sols.empty:
-        ax.scatter(best_sols['Obj_Cost'], best_sols['Obj_Efficiency'], best_sols['Obj_Carbon'],
-                   c='gold', s=200, marker='*', edgecolors='black', label='Best Solution', zorder=10)
-        
-    ax.set_xlabel('Cost (CNY)')
-    ax.set_ylabel('Efficiency ($mm^3/s$)')
-    ax.set_zlabel('Carbon ($kg CO_2$)')
-    ax.legend()      # 显示图例 Best Solution and LT labels
-
-
-    if not os.path.exists('results'): os.makedirs('results')
-    plt.savefig('results/pareto_front_3d.png', dpi=300)
-    print("✅ 3D 图已保存至 results/pareto_front_3d.png")
-    plt.show()
+    # 三维帕累托图 + 各层厚二维投影 + TOPSIS 得分图，Agg 后端直接写文件 (不再弹窗 plt.show())
+    status = render_figures(figure_jobs(df, best_sols))
+    for path, state in status.items():
+        print(f"✅ {path} ({'已保存' if state == 'rendered' else '数据未变化，跳过'})")
 
 def main():
     # 1. 读取数据
-    files = ["raw_pareto_results.xlsx", "results/raw_pareto_results.xlsx"]
-    file_path = next((f for f in files if os.path.exists(f)), None)
+    file_path = find_results("raw_pareto_results", "results/raw_pareto_results")
 
     # 如果找不到，就报错退出
     if not file_path:
-        print("[Error] 未找到 raw_pareto_results.xlsx 文件。请先运行主程序生成该文件。")
+        print("[Error] 未找到 raw_pareto_results 结果文件。请先运行主程序生成该文件。")
         return  
     
     #读入 Pareto 结果
     print(f"[Info] 读取数据: {file_path}")
-    df_opt = pd.read_excel(file_path)
+    df_opt = load_results(file_path)
 
     # 2. 计算 RD 并筛选
     print("[Info] 正在计算致密度 (RD)...")
     df_opt['ED_Calculated'] = df_opt['P_W'] / (df_opt['V_mm_s'] * df_opt['H_um'] * df_opt['LT_um'] * 1e-6)
-    df_opt['RD_Predicted'] = df_opt.apply(calculate_rd_manual, axis=1)
+    df_opt['RD_Predicted'] = predict_rd(df_opt)
      
 
     #筛选标准: RD >= 95%
@@ -194,8 +136,8 @@ def main():
         
         # 保存
         if not os.path.exists('results'): os.makedirs('results')
-        df_valid.to_excel("results/final_processed_results.xlsx", index=False)
-        print(f"\n✅ 结果已保存至: results/final_processed_results.xlsx")
+        out = save_results(df_valid, "results/final_processed_results", excel=False)
+        print(f"\n✅ 结果已保存至: {out}")
 
         plot_3d(df_valid, best_sols)
     else:
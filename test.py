@@ -1,29 +1,8 @@
 from pyomo.environ import *
 import config as cfg
+from new_model.response_surface import get_surface
 
-REG_COEFFS = {                                #regression coefficients for energy density calculation
-    'Intercept': 136.59848,                   # 截距 (常数项)
-    # --- 一次项 ---
-    'P':0.094923,                             # 对应Power的系数
-    'V':-0.028654,                            # 对应Speed的系数
-    'H':-0.201185,                            # 对应Hatch的系数
-    'LT':-0.108546,                           # 对应Layer Thickness的系数
-    'ED':-0.524864,                           # 对应 Energy Density
-
-    # --- 二次项 ---
-    'P^2':  -0.000051,
-    'V^2':  0.00000883923,
-    'H^2':  0.000575,
-    'ED^2': 0.002459,
-
-    # --- 交互项 ---
-    'P*V':   -0.000012,
-    'P*H':   -0.000123,
-    'P*ED':  -0.000122,
-    'V*H':   0.000013,
-    'V*ED':  0.000096,
-    'H*ED':  0.000450
-}
+RD_SURFACE = get_surface('RD')  # 致密度回归方程 (系数表 new_model/response_surfaces.csv)
 
 def create_lpbf_model(lt_val_um): # 输入参数是（layer thickness）lt_val_um: 层厚 (单位: um)，例如 80, 100, 120
  # 1.Initialize the model
@@ -68,28 +47,8 @@ def create_lpbf_model(lt_val_um): # 输入参数是（layer thickness）lt_val_u
  # 也就是 P = ED * (V * H_mm * LT_mm) = ED * BuildRate
  m.con_calc_ed = Constraint(expr= m.P == m.ED * m.BuildRate)
 
- # 提取回归系数
- c = REG_COEFFS
-
- # 构建多项式各项 (注意: 公式中的 H 和 LT 单位是 um)
- # 线性项
- term_linear = (c['P']*m.P + c['V']*m.V + c['H']*m.H + c['LT']*lt_val_um + c['ED']*m.ED)
-
- # 二次项
- term_quad = (c['P^2']*(m.P**2) + c['V^2']*(m.V**2) + c['H^2']*(m.H**2) + c['ED^2']*(m.ED**2))
-
- # 交互项
- term_inter = (
-      c['P*V']*(m.P*m.V) + 
-      c['P*H']*(m.P*m.H) + 
-      c['P*ED']*(m.P*m.ED) +
-      c['V*H']*(m.V*m.H) + 
-      c['V*ED']*(m.V*m.ED) + 
-      c['H*ED']*(m.H*m.ED)
- )
-
- # RD 预测表达式
- m.RD_Expr = Expression(expr= c['Intercept'] + term_linear + term_quad + term_inter)
+ # RD 预测表达式：响应面引擎直接生成 Pyomo 多项式 (注意: 公式中的 H 和 LT 单位是 um)
+ m.RD_Expr = Expression(expr= RD_SURFACE.pyomo_expression(P=m.P, V=m.V, H=m.H, LT=lt_val_um, ED=m.ED))
  
  # 【硬约束】：要求 RD 必须 >= 99.5
  m.con_quality = Constraint(expr= m.RD_Expr >= 99.5)
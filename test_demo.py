@@ -3,10 +3,13 @@ import pandas as pd
 from scipy.optimize import minimize
 import time
 import warnings
+from new_model.response_surface import get_surface  # 回归方程 (系数表 new_model/response_surfaces.csv)
 
 # 忽略不必要的数学警告
 warnings.filterwarnings("ignore")
 
+RD_SURFACE = get_surface('RD')
+
 class LPBFConfig:
     """
     配置类：存储所有物理常数、价格参数和碳排放因子。
@@ -60,23 +63,25 @@ class ProcessModel:
         LT_mm = LT * 1e-3
         ED = P / (V * H_mm * LT_mm)
         
-        # --- 【关键】这里填入你 Design-Expert 的回归系数 ---
-        # 你的公式中有二次项和交叉项，这里必须完整复现
-        # 示例系数（请务必用论文里的真实系数替换！）
-        # RD = Intercept + c1*P + c2*V + ... + c_sq*P^2 + ...
-        
-        # 假设公式结构如下 (请根据 manuscript2025714.docx 修正系数):
-        RD = (
-            136.59848 
-            + 0.094923 * P 
-            - 0.028654 * V 
-            - 0.201185 * H 
-            - 0.108546 * LT 
-            - 0.524864 * ED  # ED本身是非线性的
-            # + ... (把剩下的平方项和交叉项补全)
-        )
+        # Design-Expert 回归方程 (含二次项与交叉项)，由响应面引擎从系数表编译
+        RD = RD_SURFACE(P=P, V=V, H=H, LT=LT, ED=ED)
         return RD
 
+    def density_gradient(self, x, LT):
+        """
+        predict_density 的解析梯度 [dRD/dP, dRD/dV, dRD/dH]
+        ED = P / (V * H_mm * LT_mm) => dED/dP = ED/P, dED/dV = -ED/V, dED/dH = -ED/H
+        """
+        P, V, H = x
+        ED = P / (V * (H * 1e-3) * (LT * 1e-3))
+        g = RD_SURFACE.gradient(P=P, V=V, H=H, LT=LT, ED=ED)
+        # 显式偏导 + 经由 ED 的链式项
+        return np.array([
+            g['P'] + g['ED'] * ED / P,
+            g['V'] - g['ED'] * ED / V,
+            g['H'] - g['ED'] * ED / H
+        ])
+
     def calculate_objectives(self, x, LT):
         """
         计算三个目标函数值
@@ -122,6 +127,26 @@ class ProcessModel:
         
         return np.array([f_carbon, f_cost, f_eff])
 
+    def objectives_jacobian(self, x, LT):
+        """
+        calculate_objectives 的解析雅可比矩阵 (3x3)
+        行: [Carbon, Cost, Efficiency]，列: [d/dP, d/dV, d/dH]
+        """
+        P, V, H = x
+        build_rate = V * (H * 1e-3) * (LT * 1e-3)
+        time_h = (1000.0 / build_rate) / 3600.0
+        energy_kwh = (P / 1000.0) * time_h
+
+        # time_h 与 energy_kwh 都与 V、H 成反比
+        d_time = np.array([0.0, -time_h / V, -time_h / H])
+        d_energy = np.array([time_h / 1000.0, -energy_kwh / V, -energy_kwh / H])
+
+        d_carbon = d_energy * self.cfg.EF_elec
+        d_cost = d_energy * self.cfg.price_power + d_time * (self.cfg.C_hour + 10.0)
+        d_eff = np.array([0.0, build_rate / V, build_rate / H])
+
+        return np.array([d_carbon, d_cost, d_eff])
+
 class AugmeconRSolver:
     """
     算法核心类：实现 AUGMECON-R 算法逻辑。
@@ -137,30 +162,46 @@ class AugmeconRSolver:
         self.payoff_min = None
         self.payoff_max = None
         self.ranges = None
+
+        # 求解统计 (供 benchmark.py 使用)：SLSQP 调用次数 / 目标函数评估次数 / 失败次数
+        self.n_solves = 0
+        self.nfev = 0
+        self.n_infeasible = 0
+
+    def _count(self, res):
+        self.n_solves += 1
+        self.nfev += res.nfev
+        if not res.success:
+            self.n_infeasible += 1
+        return res
         
     def _optimize_single_obj(self, LT, obj_index):
         """
         单目标优化辅助函数（用于构建 Payoff Table）
         obj_index: 0=Carbon(Min), 1=Cost(Min), 2=Eff(Max)
         """
+        sign = -1.0 if obj_index == 2 else 1.0  # 效率要最大化，转最小化
         def objective(x):
             objs = self.model.calculate_objectives(x, LT)
-            if obj_index == 2: # 效率要最大化，转最小化
-                return -objs[2]
-            return objs[obj_index]
+            return sign * objs[obj_index]
+
+        def objective_jac(x):
+            return sign * self.model.objectives_jacobian(x, LT)[obj_index]
         
         # 约束：致密度 >= 99.5
-        cons = [{'type': 'ineq', 'fun': lambda x: self.model.predict_density(x, LT) - 99.5}]
+        cons = [{'type': 'ineq', 'fun': lambda x: self.model.predict_density(x, LT) - 99.5,
+                 'jac': lambda x: self.model.density_gradient(x, LT)}]
         
         res = minimize(
             objective, 
             x0=[400, 900, 100], # 初始猜测
+            jac=objective_jac,  # 解析梯度
             bounds=self.cfg.bounds,
             constraints=cons,
             method='SLSQP',
             options={'ftol': 1e-4}
         )
-        return res
+        return self._count(res)
 
     def build_payoff_table(self):
         """
@@ -244,6 +285,11 @@ class AugmeconRSolver:
                         reward = eps * (s_cost/self.ranges[1] + s_eff/self.ranges[2])
                         return f_carbon - reward
 
+                    def augmented_objective_jac(aug_vars):
+                        d_carbon = self.model.objectives_jacobian(aug_vars[:3], LT)[0]
+                        eps = 1e-3
+                        return np.concatenate([d_carbon, [-eps / self.ranges[1], -eps / self.ranges[2]]])
+
                     # === 定义约束 ===
                     # 变量边界: P, V, H, s_cost, s_eff
                     # s 变量必须 >= 0
@@ -252,16 +298,22 @@ class AugmeconRSolver:
                     cons = [
                         # 1. 成本约束 (等式): Cost + s_cost = e_cost
                         {'type': 'eq', 'fun': lambda x: 
-                         self.model.calculate_objectives(x[:3], LT)[1] + x[3] - e_cost},
+                         self.model.calculate_objectives(x[:3], LT)[1] + x[3] - e_cost,
+                         'jac': lambda x:
+                         np.concatenate([self.model.objectives_jacobian(x[:3], LT)[1], [1.0, 0.0]])},
                         
                         # 2. 效率约束 (等式): Eff - s_eff = e_eff
                         # 注意：Eff是越大越好，所以是 Eff - s = 下限
                         {'type': 'eq', 'fun': lambda x: 
-                         self.model.calculate_objectives(x[:3], LT)[2] - x[4] - e_eff},
+                         self.model.calculate_objectives(x[:3], LT)[2] - x[4] - e_eff,
+                         'jac': lambda x:
+                         np.concatenate([self.model.objectives_jacobian(x[:3], LT)[2], [0.0, -1.0]])},
                         
                         # 3. 致密度约束 (不等式): Density >= 99.5
                         {'type': 'ineq', 'fun': lambda x: 
-                         self.model.predict_density(x[:3], LT) - 99.5}
+                         self.model.predict_density(x[:3], LT) - 99.5,
+                         'jac': lambda x:
+                         np.concatenate([self.model.density_gradient(x[:3], LT), [0.0, 0.0]])}
                     ]
                     
                     # === 求解 ===
@@ -269,10 +321,11 @@ class AugmeconRSolver:
                     x0 = [420, 900, 100, 1.0, 1.0]
                     
                     res = minimize(
-                        augmented_objective, x0, 
+                        augmented_objective, x0, jac=augmented_objective_jac,
                         method='SLSQP', bounds=aug_bounds, constraints=cons,
                         options={'disp': False}
                     )
+                    self._count(res)
                     
                     if res.success:
                         # 记录有效解
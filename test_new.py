@@ -1,30 +1,11 @@
 import numpy as np
 import config as cfg
+from new_model.response_surface import get_surface
 
 # ==========================================
-# 1. 回归模型系数 (保持不变)
+# 1. 回归模型 (系数表 new_model/response_surfaces.csv)
 # ==========================================
-REG_COEFFS = {
-    'Intercept': 136.59848,
-    # --- 一次项 ---
-    'P': 0.094923,
-    'V': -0.028654,
-    'H': -0.201185,
-    'LT': -0.108546,
-    'ED': -0.524864,
-    # --- 二次项 ---
-    'P^2': -0.000051,
-    'V^2': 0.00000883923,
-    'H^2': 0.000575,
-    'ED^2': 0.002459,
-    # --- 交互项 ---
-    'P*V': -0.000012,
-    'P*H': -0.000123,
-    'P*ED': -0.000122,
-    'V*H': 0.000013,
-    'V*ED': 0.000096,
-    'H*ED': 0.000450
-}
+RD_SURFACE = get_surface('RD')
 
 def predict_performance(x, lt_val_um):
     """
@@ -51,27 +32,8 @@ def predict_performance(x, lt_val_um):
     # 原单位 J/mm^3 = W / (mm^3/s)
     ED = P * inv_rate
 
-    # 2. 计算致密度 (RD) - 使用回归系数
-    # 这是一个长公式，直接翻译原来的 Pyomo 表达式
-    rc = REG_COEFFS
-    RD = (rc['Intercept'] +
-          rc['P'] * P +
-          rc['V'] * V +
-          rc['H'] * H +
-          rc['LT'] * lt_val_um +
-          rc['ED'] * ED +
-          
-          rc['P^2'] * (P ** 2) +
-          rc['V^2'] * (V ** 2) +
-          rc['H^2'] * (H ** 2) +
-          rc['ED^2'] * (ED ** 2) +
-          
-          rc['P*V'] * (P * V) +
-          rc['P*H'] * (P * H) +
-          rc['P*ED'] * (P * ED) +
-          rc['V*H'] * (V * H) +
-          rc['V*ED'] * (V * ED) +
-          rc['H*ED'] * (H * ED))
+    # 2. 计算致密度 (RD) - 响应面引擎 (标量/数组通用)
+    RD = RD_SURFACE(P=P, V=V, H=H, LT=lt_val_um, ED=ED)
 
     # 3. 计算成本 (Cost)
     # (参考原代码逻辑)